@@ -0,0 +1,398 @@
+"""بنچمارک بار آفلاین جریان‌های مکالمه: مصاحبه کامل و آزمون آیین‌نامه با N کاربر هم‌زمان.
+
+    python benchmarks/conversation_flows.py --users 200 --questions 20 --regulation-questions 30
+    python benchmarks/conversation_flows.py --compare benchmarks/results/conversation_flows_20261017-120000.json
+
+ConversationHandler واقعی ساخته شده با build_application با آپدیت‌های مصنوعی اجرا می‌شود. تلگرام با یک
+request درون‌پروسه‌ای جایگزین می‌شود که به همه متدهای Bot API پاسخ ساختگی می‌دهد و PostgreSQL به طور پیش‌فرض با
+یک دیتابیس درون‌حافظه‌ای که فقط کوئری‌های این جریان‌ها را می‌شناسد. با --database-url از یک PostgreSQL محلی
+استفاده می‌شود؛ آن دیتابیس باید یک‌بارمصرف باشد چون سوالات مصنوعی در آن درج می‌شوند.
+
+خروجی شامل توان عملیاتی، p50/p99 زمان هر آپدیت و هر جریان، تعداد کوئری‌های دیتابیس و درخواست‌های تلگرام
+به ازای هر جریان است و در یک فایل JSON ذخیره می‌شود تا اجراها با --compare مقایسه شوند.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import datetime
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("ADMIN_ID", "1")
+os.environ.setdefault("ARCHIVE_PASSWORD", "benchmark")
+os.environ.setdefault("PERSISTENCE_BACKEND", "none")
+# اعلان‌های ادمین نباید پشت محدودیت نرخ واقعی تلگرام در صف بمانند
+os.environ.setdefault("NOTIFY_PER_CHAT_INTERVAL", "0")
+os.environ.setdefault("NOTIFY_GLOBAL_RATE", "1000000")
+os.environ.setdefault("NOTIFY_DRAIN_TIMEOUT", "5")
+
+from telegram import Update  # noqa: E402
+from telegram.request import BaseRequest  # noqa: E402
+
+from quizbot import app, config, db  # noqa: E402
+from quizbot.handlers.regulation_test import get_regulation_test_size  # noqa: E402
+from quizbot.metrics import metrics  # noqa: E402
+from quizbot.questions import (add_interview_question_to_db, bulk_add_regulation_questions_to_db,  # noqa: E402
+                               question_cache)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+INTERVIEW_CATEGORY = "شخصی"
+REGULATION_TEST_TYPE = "کلی"
+
+
+# --- تلگرام ساختگی ---
+class FakeTelegramRequest(BaseRequest):
+    """به جای ارسال HTTP، برای هر متد Bot API پاسخ ساختگی برمی‌گرداند و تعداد فراخوانی‌ها را می‌شمارد."""
+
+    def __init__(self, latency=0.0):
+        self._latency = latency
+        self._message_ids = iter(range(1, 1 << 62))
+        self.calls = collections.Counter()
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        self.calls[endpoint] += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        params = request_data.parameters if request_data else {}
+        if endpoint == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Benchmark', 'username': 'benchmark_bot'}
+        elif endpoint in ('sendMessage', 'editMessageText', 'editMessageReplyMarkup', 'sendDocument'):
+            chat_id = params.get('chat_id', 0)
+            result = {'message_id': params.get('message_id') or next(self._message_ids), 'date': int(time.time()),
+                      'chat': {'id': chat_id, 'type': 'private'}, 'text': params.get('text', '')}
+        else:
+            result = True
+        return 200, json.dumps({'ok': True, 'result': result}).encode('utf-8')
+
+
+# --- دیتابیس درون‌حافظه‌ای ---
+class FakeCursor:
+    def __init__(self, database):
+        self._database = database
+        self._rows = []
+        self.itersize = 500
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def execute(self, query, params=()):
+        self._rows = self._database.execute(query if isinstance(query, str) else query.decode('utf-8'), params)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self._database = database
+
+    def cursor(self, name=None):
+        return FakeCursor(self._database)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeDatabase:
+    """جایگزین استخر اتصال که فقط کوئری‌های جریان مصاحبه و آزمون را پاسخ می‌دهد؛ بقیه کوئری‌ها نتیجه خالی دارند."""
+
+    def __init__(self, interview_questions, regulation_questions, latency=0.0):
+        self._latency = latency
+        self._lock = threading.Lock()
+        self._interview_rows = [(i, INTERVIEW_CATEGORY, None, f"سوال مصاحبه مصنوعی {i}")
+                                for i in range(1, interview_questions + 1)]
+        self._regulation_rows = [(i, REGULATION_TEST_TYPE, f"سوال آیین‌نامه مصنوعی {i}",
+                                  [f"گزینه {j + 1}" for j in range(4)], i % 4, 1.0)
+                                 for i in range(1, regulation_questions + 1)]
+        self._pending = {}
+        self._attempts = {}
+
+    @contextlib.contextmanager
+    def connection(self):
+        yield FakeConnection(self)
+
+    def stats(self):
+        return {'max_size': 0, 'in_use': 0, 'idle': 0, 'opened': 0, 'acquired': 0, 'timeouts': 0,
+                'avg_wait_ms': 0.0, 'max_wait_ms': 0.0}
+
+    def close(self):
+        pass
+
+    def execute(self, query, params):
+        if self._latency:
+            # در نخ executor اجرا می‌شود، مثل زمان رفت و برگشت واقعی تا دیتابیس
+            time.sleep(self._latency)
+        sql = " ".join(query.split())
+        with self._lock:
+            if re.search(r"FROM interview_questions WHERE is_active ORDER BY id", sql):
+                return list(self._interview_rows)
+            if re.search(r"FROM interview_questions WHERE category", sql):
+                return [(q_id, text) for q_id, category, subcategory, text in self._interview_rows
+                        if category == params[0] and subcategory == (params[1] if len(params) > 1 else None)]
+            if re.search(r"FROM regulation_questions (WHERE test_type = %s )?ORDER BY id", sql):
+                return [row for row in self._regulation_rows if not params or row[1] == params[0]]
+            # شناسه کاربر گاهی رشته و گاهی عدد فرستاده می‌شود؛ PostgreSQL هر دو را یکسان می‌بیند
+            if sql.startswith("SELECT timestamp FROM user_attempts"):
+                timestamp = self._attempts.get((str(params[0]), params[1]))
+                return [(timestamp,)] if timestamp else []
+            if sql.startswith("INSERT INTO user_attempts"):
+                self._attempts[(str(params[0]), params[1])] = params[2]
+            elif sql.startswith("DELETE FROM user_attempts"):
+                self._attempts.pop((str(params[0]), params[1]), None)
+            elif sql.startswith("INSERT INTO pending_submissions"):
+                self._pending[params[0]] = params[1]
+            return []
+
+
+async def seed_database(interview_questions, regulation_questions):
+    """سوالات مصنوعی را در PostgreSQL واقعی درج می‌کند (فقط برای --database-url)."""
+    for i in range(1, interview_questions + 1):
+        await add_interview_question_to_db(INTERVIEW_CATEGORY, None, f"سوال مصاحبه مصنوعی بنچمارک {i}")
+    await bulk_add_regulation_questions_to_db(
+        [(REGULATION_TEST_TYPE, f"سوال آیین‌نامه مصنوعی بنچمارک {i}", [f"گزینه {j + 1}" for j in range(4)], i % 4)
+         for i in range(1, regulation_questions + 1)])
+
+
+# --- آپدیت‌های مصنوعی ---
+class SyntheticUser:
+    def __init__(self, application, user_id):
+        self._application = application
+        self._user = {'id': user_id, 'is_bot': False, 'first_name': f"کاربر {user_id}", 'username': f"user{user_id}"}
+        self._chat = {'id': user_id, 'type': 'private'}
+        self._update_ids = iter(range(user_id * 10_000, (user_id + 1) * 10_000))
+        self.latencies = []
+
+    def _message(self, text):
+        message = {'message_id': 1, 'date': int(time.time()), 'chat': self._chat, 'from': self._user, 'text': text}
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return message
+
+    async def _process(self, data):
+        update = Update.de_json({'update_id': next(self._update_ids), **data}, self._application.bot)
+        started = time.perf_counter()
+        await self._application.process_update(update)
+        self.latencies.append(time.perf_counter() - started)
+
+    async def send_text(self, text):
+        await self._process({'message': self._message(text)})
+
+    async def press(self, callback_data):
+        await self._process({'callback_query': {
+            'id': str(random.getrandbits(48)), 'from': self._user, 'chat_instance': 'benchmark',
+            'data': callback_data, 'message': {**self._message("..."), 'from': {'id': 1, 'is_bot': True,
+                                                                              'first_name': 'Benchmark'}},
+        }})
+
+
+async def interview_flow(user):
+    questions = await question_cache.interview_questions(INTERVIEW_CATEGORY)
+    await user.send_text("/start")
+    await user.press('interview')
+    await user.press('personal')
+    for i in range(len(questions)):
+        await user.send_text(f"پاسخ مصنوعی به سوال {i + 1}")
+    await user.press('confirm_yes')
+
+
+async def regulation_flow(user):
+    bank = await question_cache.regulation_bank(REGULATION_TEST_TYPE)
+    await user.send_text("/start")
+    await user.press('regulations_test')
+    await user.press(f'start_test_{REGULATION_TEST_TYPE}')
+    for _ in range(get_regulation_test_size(REGULATION_TEST_TYPE, len(bank))):
+        # گزینه ۵ «نمی‌دانم» است
+        await user.press(f'rt_answer_{random.randrange(5)}')
+
+
+FLOWS = {'interview': interview_flow, 'regulation': regulation_flow}
+
+
+# --- اجرا و گزارش ---
+def percentile(values, q):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def metric_total(name):
+    return sum(metrics.totals(name).values())
+
+
+async def run_flow(application, request, name, users, concurrency, user_id_base):
+    flow = FLOWS[name]
+    semaphore = asyncio.Semaphore(concurrency)
+    flow_latencies = []
+
+    async def run_user(user_id):
+        async with semaphore:
+            user = SyntheticUser(application, user_id)
+            started = time.perf_counter()
+            await flow(user)
+            flow_latencies.append(time.perf_counter() - started)
+            return user.latencies
+
+    db_before = metric_total('bot_db_query_duration_seconds')
+    errors_before = metric_total('bot_handler_errors_total')
+    api_before = sum(request.calls.values())
+    started = time.perf_counter()
+    per_user = await asyncio.gather(*(run_user(user_id_base + i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+    update_latencies = [latency for latencies in per_user for latency in latencies]
+
+    return {
+        'flows': users,
+        'updates': len(update_latencies),
+        'elapsed_s': elapsed,
+        'flows_per_s': users / elapsed,
+        'updates_per_s': len(update_latencies) / elapsed,
+        'update_p50_ms': percentile(update_latencies, 50) * 1000,
+        'update_p99_ms': percentile(update_latencies, 99) * 1000,
+        'flow_p50_ms': percentile(flow_latencies, 50) * 1000,
+        'flow_p99_ms': percentile(flow_latencies, 99) * 1000,
+        'db_queries_per_flow': (metric_total('bot_db_query_duration_seconds') - db_before) / users,
+        # اعلان‌های ادمین در پس‌زمینه ارسال می‌شوند و ممکن است به جریان بعدی هم برسند
+        'telegram_calls_per_flow': (sum(request.calls.values()) - api_before) / users,
+        'handler_errors': metric_total('bot_handler_errors_total') - errors_before,
+    }
+
+
+async def run_benchmark(args):
+    request = FakeTelegramRequest(latency=args.api_latency_ms / 1000)
+    application = app.build_application(request=request)
+    results = {}
+    async with application:
+        await app.post_init(application)
+        if args.database_url:
+            await seed_database(args.questions, args.regulation_questions)
+            await question_cache.warm()
+        # شناسه‌های تازه تا محدودیت ۲۴ ساعته آزمون‌های اجرای قبلی روی دیتابیس واقعی اثر نگذارد
+        user_id_base = random.randrange(10 ** 9, 2 * 10 ** 9)
+        for i, name in enumerate(args.flows):
+            for _ in range(args.warmup):
+                await FLOWS[name](SyntheticUser(application, user_id_base - 1 - i))
+            results[name] = await run_flow(application, request, name, args.users, args.concurrency,
+                                           user_id_base + i * args.users)
+        await app.post_stop(application)
+    await app.post_shutdown(application)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+COLUMNS = (('flows_per_s', "flows/s"), ('updates_per_s', "updates/s"), ('update_p50_ms', "p50 ms"),
+           ('update_p99_ms', "p99 ms"), ('flow_p99_ms', "flow p99 ms"), ('db_queries_per_flow', "db/flow"),
+           ('telegram_calls_per_flow', "api/flow"), ('handler_errors', "errors"))
+
+
+def print_results(results, baseline=None):
+    print(f"{'flow':<12}" + "".join(f"{title:>14}" for _, title in COLUMNS))
+    for name, stats in results.items():
+        print(f"{name:<12}" + "".join(f"{stats[key]:>14.2f}" for key, _ in COLUMNS))
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for key, _ in COLUMNS:
+                if previous.get(key):
+                    deltas.append(f"{(stats[key] - previous[key]) / previous[key] * 100:>+13.1f}%")
+                else:
+                    deltas.append(f"{'-':>14}")
+            print(f"{'  vs base':<12}" + "".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100, help="تعداد کاربران هم‌زمان در هر جریان")
+    parser.add_argument('--concurrency', type=int, default=None, help="سقف جریان‌های هم‌زمان (پیش‌فرض: همه کاربران)")
+    parser.add_argument('--flows', nargs='+', choices=sorted(FLOWS), default=sorted(FLOWS))
+    parser.add_argument('--questions', type=int, default=10, help="تعداد سوالات مصاحبه")
+    parser.add_argument('--regulation-questions', type=int, default=20, help="تعداد سوالات بانک آیین‌نامه")
+    parser.add_argument('--warmup', type=int, default=1, help="تعداد اجرای گرم‌کردن هر جریان پیش از اندازه‌گیری")
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help="تاخیر شبیه‌سازی شده هر کوئری دیتابیس ساختگی")
+    parser.add_argument('--api-latency-ms', type=float, default=0.0, help="تاخیر شبیه‌سازی شده هر درخواست تلگرام")
+    parser.add_argument('--database-url', help="PostgreSQL محلی و یک‌بارمصرف به جای دیتابیس ساختگی")
+    parser.add_argument('--output', help="مسیر فایل نتایج (پیش‌فرض: benchmarks/results/conversation_flows_<زمان>.json)")
+    parser.add_argument('--compare', help="فایل نتایج یک اجرای قبلی برای مقایسه")
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or args.users
+
+    if args.database_url:
+        config.DATABASE_URL = args.database_url
+        db.init_db_pool()
+        db.setup_database()
+    else:
+        db.db_pool = FakeDatabase(args.questions, args.regulation_questions, latency=args.db_latency_ms / 1000)
+        db.db_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.DB_POOL_MAX_SIZE, thread_name_prefix="db")
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        db.db_executor.shutdown(wait=True)
+        db.db_pool.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"conversation_flows_{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': int(time.time()),
+            'git_revision': git_revision(),
+            # آدرس دیتابیس ممکن است رمز عبور داشته باشد؛ فقط نوع دیتابیس ذخیره می‌شود
+            'params': {**{key: value for key, value in vars(args).items()
+                          if key not in ('output', 'compare', 'database_url')},
+                       'database': 'postgres' if args.database_url else 'fake'},
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"نتایج در {output} ذخیره شد.")
+
+
+if __name__ == '__main__':
+    main()
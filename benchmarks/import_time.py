@@ -0,0 +1,117 @@
+"""زمان ایمپورت ماژول‌های بسته quizbot در یک مفسر تازه، اندازه‌گیری شده با python -X importtime.
+
+    python benchmarks/import_time.py --repeat 10
+    python benchmarks/import_time.py --compare benchmarks/results/import_time_20261017-120000.json
+
+هر ماژول چند بار در پروسه جداگانه ایمپورت می‌شود و میانه زمان تجمعی ایمپورت خود ماژول، تعداد ماژول‌های
+بارگذاری شده و زمان کل اجرای مفسر گزارش می‌شود. هیچ متغیر محیطی لازم نیست؛ اگر ایمپورت یک ماژول به
+تنظیمات نیاز داشته باشد همین‌جا خطا می‌دهد. نتایج مثل conversation_flows.py در یک فایل JSON ذخیره می‌شوند.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+# از ماژول‌های سبک (بدون telegram و psycopg2) تا کل اپلیکیشن
+MODULES = ('quizbot', 'quizbot.config', 'quizbot.rendering', 'quizbot.questions', 'quizbot.handlers.interview',
+           'quizbot.app')
+
+
+def measure(module):
+    """یک بار ماژول را در مفسر تازه ایمپورت می‌کند و (زمان ایمپورت ms، تعداد ماژول‌ها، زمان کل ms) را برمی‌گرداند."""
+    # متغیرهای ربات حذف می‌شوند تا وابستگی ایمپورت به محیط پنهان نماند
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('BOT_TOKEN', 'ADMIN_ID', 'ARCHIVE_PASSWORD', 'DATABASE_URL')}
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               cwd=ROOT, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"ایمپورت {module} ناموفق بود:\n{completed.stderr[-2000:]}")
+    # قالب هر خط: "import time: self [us] | cumulative | imported package"
+    module_us, count = 0, 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        count += 1
+        if name.strip() == module:
+            module_us = int(cumulative)
+    return module_us / 1000, count, wall_ms
+
+
+def run_benchmark(modules, repeat):
+    results = {}
+    for module in modules:
+        samples = [measure(module) for _ in range(repeat)]
+        results[module] = {
+            'import_ms': statistics.median(sample[0] for sample in samples),
+            'modules_loaded': statistics.median(sample[1] for sample in samples),
+            'interpreter_ms': statistics.median(sample[2] for sample in samples),
+        }
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+COLUMNS = (('import_ms', "import ms"), ('modules_loaded', "modules"), ('interpreter_ms', "process ms"))
+
+
+def print_results(results, baseline=None):
+    print(f"{'module':<28}" + "".join(f"{title:>14}" for _, title in COLUMNS))
+    for name, stats in results.items():
+        print(f"{name:<28}" + "".join(f"{stats[key]:>14.2f}" for key, _ in COLUMNS))
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for key, _ in COLUMNS:
+                if previous.get(key):
+                    deltas.append(f"{(stats[key] - previous[key]) / previous[key] * 100:>+13.1f}%")
+                else:
+                    deltas.append(f"{'-':>14}")
+            print(f"{'  vs base':<28}" + "".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=list(MODULES), help="ماژول‌هایی که اندازه‌گیری می‌شوند")
+    parser.add_argument('--repeat', type=int, default=5, help="تعداد اجرای هر ماژول؛ میانه گزارش می‌شود")
+    parser.add_argument('--output', help="مسیر فایل نتایج (پیش‌فرض: benchmarks/results/import_time_<زمان>.json)")
+    parser.add_argument('--compare', help="فایل نتایج یک اجرای قبلی برای مقایسه")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.modules, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"import_time_{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': int(time.time()),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'params': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"نتایج در {output} ذخیره شد.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""مقایسه حافظه نشست‌های آزمون آیین‌نامه: ساختار قدیمی user_data در برابر RegulationTestSession.
+
+    python benchmarks/regulation_session_memory.py --users 1000 --questions 200
+
+در ساختار قدیمی هر کاربر کپی کامل سوالات (که برای هر شروع آزمون از دیتابیس خوانده می‌شد) و یک کپی دیگر
+در user_responses نگه می‌داشت. در ساختار جدید بانک سوالات یک بار ساخته و بین همه کاربران به اشتراک گذاشته می‌شود.
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from quizbot.questions import RegulationBank, RegulationQuestion, RegulationTestSession  # noqa: E402
+
+
+def make_rows(question_count):
+    # شبیه ردیف‌های برگشتی از دیتابیس؛ با هر بار خواندن رشته‌های تازه ساخته می‌شوند
+    return [(i, "کلی", "متن سوال آیین‌نامه شماره " + str(i) + " " + "ـ" * 120,
+             ["گزینه " + str(j) + " برای سوال " + str(i) + " " + "ـ" * 40 for j in range(4)], i % 4)
+            for i in range(1, question_count + 1)]
+
+
+def legacy_sessions(user_count, question_count):
+    sessions = []
+    for _ in range(user_count):
+        questions = [{"question": q, "options": opt, "answer": a} for _, _, q, opt, a in make_rows(question_count)]
+        shuffled = random.sample(questions, len(questions))
+        user_data = {'regulations_test_questions': shuffled, 'current_question_index': len(shuffled),
+                     'correct_answers': 0, 'incorrect_answers': 0, 'user_responses': []}
+        for question in shuffled:
+            selected = random.randrange(5)
+            user_data['user_responses'].append({
+                "question": question['question'], "options": list(question['options']),
+                "user_answer_index": selected, "correct_answer_index": question['answer']})
+        sessions.append(user_data)
+    return sessions
+
+
+def compact_sessions(user_count, question_count):
+    bank = RegulationBank(RegulationQuestion(*row) for row in make_rows(question_count))
+    sessions = []
+    for _ in range(user_count):
+        session = RegulationTestSession("کلی", random.sample(bank.ids, len(bank)))
+        for question_id in session.question_ids:
+            selected = random.randrange(5)
+            session.record_answer(selected, selected == bank.by_id[question_id].answer)
+        sessions.append({'regulation_session': session})
+    return bank, sessions
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    result = build(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--questions', type=int, default=200)
+    args = parser.parse_args()
+
+    legacy, legacy_bytes = measure(legacy_sessions, args.users, args.questions)
+    (bank, compact), compact_bytes = measure(compact_sessions, args.users, args.questions)
+    legacy_pickle = sum(len(pickle.dumps(user_data)) for user_data in legacy)
+    compact_pickle = sum(len(pickle.dumps(user_data)) for user_data in compact)
+
+    mb = 1024 * 1024
+    print(f"{args.users} کاربر، {args.questions} سوال در بانک")
+    print(f"{'':<22}{'حافظه (MB)':>14}{'pickle (MB)':>14}")
+    print(f"{'ساختار قدیمی':<22}{legacy_bytes / mb:>14.2f}{legacy_pickle / mb:>14.2f}")
+    print(f"{'RegulationTestSession':<22}{compact_bytes / mb:>14.2f}{compact_pickle / mb:>14.2f}")
+    print(f"نسبت حافظه: {legacy_bytes / compact_bytes:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
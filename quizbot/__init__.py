@@ -0,0 +1,11 @@
+"""ربات مصاحبه و آزمون آیین‌نامه انجمن.
+
+ماژول‌های بسته به صورت جداگانه قابل ایمپورت هستند و تنظیمات فقط هنگام اولین دسترسی به config خوانده می‌شوند؛
+برای اجرای ربات از python -m quizbot استفاده کنید.
+"""
+
+
+def main() -> None:
+    # ایمپورت telegram و هندلرها تا زمان اجرای واقعی ربات به تعویق می‌افتد
+    from .app import main as run
+    run()
@@ -0,0 +1,389 @@
+"""ساخت Application، ثبت هندلرها و اجرای ربات در حالت polling یا webhook."""
+import asyncio
+import hmac
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import (Application, CallbackQueryHandler, CommandHandler, ConversationHandler, MessageHandler,
+                          filters)
+from telegram.request import HTTPXRequest
+
+from . import config, db, notifications
+from .archive import sweep_pending_submissions
+from .db import init_db_pool, setup_database
+from .handlers.admin import stats_command
+from .handlers.archive import (archive_password_check, archive_start, export_archive_command, export_archived_user,
+                               list_archived_users, paginate_archive_search, paginate_user_interviews,
+                               prompt_archived_user_search, search_archive_command, search_archived_users,
+                               show_archive_user_options, show_user_interviews_by_category)
+from .handlers.common import cancel, error_handler, help_command, start
+from .handlers.design import (add_political_subcategory_command, add_question_text,
+                              delete_political_subcategory_command, delete_question_by_number,
+                              export_regulation_questions, get_regulation_option_1, get_regulation_option_2,
+                              get_regulation_option_3, get_regulation_option_4, get_regulation_question_text,
+                              handle_add_another, import_regulation_questions, list_political_subcategories_command,
+                              list_questions_for_delete, prompt_for_new_question, prompt_for_regulation_question_text,
+                              prompt_regulation_import, save_regulation_question, select_category_for_add,
+                              select_category_for_delete, select_regulation_type_for_add, show_design_menu)
+from .handlers.interview import (add_to_archive_handler, confirm_submission, handle_answer, ignore_archive_handler,
+                                 show_interview_options, show_political_categories, start_questions)
+from .handlers.regulation_test import (handle_regulations_test_answer, hardest_questions_command,
+                                       regulations_test_start, show_regulations_test_options)
+from .keyboards import menus
+from .metrics import conversation_states, instrument_handler, metrics, serve_metrics
+from .notifications import NotificationDispatcher
+from .persistence import PersistenceApplication, build_persistence
+from .processing import PerUserUpdateProcessor, build_update_processor
+from .questions import question_cache
+from .states import (ADDING_QUESTION_TEXT, ADDING_REGULATION_OPTION_1, ADDING_REGULATION_OPTION_2,
+                     ADDING_REGULATION_OPTION_3, ADDING_REGULATION_OPTION_4, ADDING_REGULATION_QUESTION_TEXT,
+                     ANSWERING_QUESTIONS, ARCHIVE_PASSWORD_PROMPT, ASK_ADD_ANOTHER, CONFIRM_SUBMISSION,
+                     IMPORTING_REGULATION_QUESTIONS, LISTING_ARCHIVED_USERS, LISTING_QUESTIONS_FOR_DELETE,
+                     REGULATIONS_TEST_ANSWERING, SEARCHING_ARCHIVED_USERS, SELECTING_ACTION,
+                     SELECTING_ARCHIVE_CATEGORY, SELECTING_DESIGN_ACTION, SELECTING_INTERVIEW,
+                     SELECTING_POLITICAL_CATEGORY, SELECTING_REGULATIONS_TEST_TYPE,
+                     SELECTING_REGULATION_CORRECT_ANSWER, SELECT_ADD_CAT, SELECT_ADD_POLITICAL_CAT, SELECT_DEL_CAT,
+                     SELECT_DEL_POLITICAL_CAT, SELECT_REGULATION_TYPE_FOR_ADD, SHOWING_USER_INTERVIEWS)
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """درخواست‌های Bot API را با نام متد (sendMessage، editMessageText و ...) زمان‌سنجی و شمارش می‌کند."""
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        try:
+            status_code, payload = await super().do_request(url, method, request_data, *args, **kwargs)
+        except Exception:
+            metrics.inc('bot_telegram_api_errors_total', method=endpoint)
+            raise
+        finally:
+            metrics.observe('bot_telegram_api_duration_seconds', time.perf_counter() - started, method=endpoint)
+        if status_code >= 400:
+            metrics.inc('bot_telegram_api_errors_total', method=endpoint)
+        return status_code, payload
+
+
+def runtime_collector(application):
+    """وضعیت صف آپدیت‌ها، پردازشگر همزمان، استخر دیتابیس، صف اعلان‌ها و کش سوالات را به صورت گیج برمی‌گرداند."""
+    def collect():
+        yield ('bot_update_queue_size', 'gauge', "Updates waiting in the application queue.",
+               [({}, application.update_queue.qsize())])
+        processor = application.update_processor
+        if isinstance(processor, PerUserUpdateProcessor):
+            update_stats = processor.stats()
+            yield ('bot_updates_in_flight', 'gauge', "Updates currently being processed.",
+                   [({}, update_stats['in_flight'])])
+            yield ('bot_updates_waiting_for_user', 'gauge', "Updates waiting behind earlier updates of the same user.",
+                   [({}, update_stats['waiting'])])
+            yield ('bot_update_active_users', 'gauge', "Users with updates waiting or in progress.",
+                   [({}, update_stats['active_users'])])
+            yield ('bot_updates_processed_total', 'counter', "Updates processed by the concurrent processor.",
+                   [({}, update_stats['processed'])])
+            yield ('bot_update_user_wait_seconds', 'gauge', "Time updates waited behind the same user's updates.",
+                   [({'stat': 'avg'}, update_stats['avg_user_wait_ms'] / 1000),
+                    ({'stat': 'max'}, update_stats['max_user_wait_ms'] / 1000)])
+        if db.db_pool is not None:
+            pool_stats = db.db_pool.stats()
+            yield ('bot_db_pool_connections', 'gauge', "Database pool connections by state.",
+                   [({'state': 'in_use'}, pool_stats['in_use']), ({'state': 'idle'}, pool_stats['idle'])])
+            yield ('bot_db_pool_timeouts_total', 'counter', "Database pool acquire timeouts.",
+                   [({}, pool_stats['timeouts'])])
+        if notifications.notifier is not None:
+            notify_stats = notifications.notifier.stats()
+            yield ('bot_notifications_queued', 'gauge', "Admin notifications waiting to be sent.",
+                   [({}, notify_stats['queued'])])
+            yield ('bot_notifications_total', 'counter', "Admin notifications by outcome.",
+                   [({'outcome': 'sent'}, notify_stats['sent']), ({'outcome': 'failed'}, notify_stats['failed'])])
+        cache_stats = question_cache.stats()
+        yield ('bot_question_cache_requests_total', 'counter', "Question cache lookups by result.",
+               [({'result': 'hit'}, cache_stats['hits']), ({'result': 'miss'}, cache_stats['misses'])])
+    return collect
+
+
+background_tasks = set()
+
+
+def start_background_task(coroutine, name):
+    """یک کار پس‌زمینه می‌سازد و ارجاع آن را نگه می‌دارد تا هنگام خاموشی لغو شود."""
+    task = asyncio.get_running_loop().create_task(coroutine, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+async def post_init(application: Application) -> None:
+    await question_cache.warm()
+    await menus.load()
+    await conversation_states.load(application.persistence)
+    start_background_task(sweep_pending_submissions(), name="pending-submissions-sweeper")
+    if config.METRICS_PORT:
+        start_background_task(serve_metrics(config.METRICS_LISTEN, config.METRICS_PORT), name="metrics-server")
+    notifications.notifier = NotificationDispatcher(
+        application.bot,
+        global_rate=config.NOTIFY_GLOBAL_RATE,
+        per_chat_interval=config.NOTIFY_PER_CHAT_INTERVAL,
+        digest_window=config.ADMIN_DIGEST_WINDOW,
+        max_retries=config.NOTIFY_MAX_RETRIES,
+    )
+    start_background_task(notifications.notifier.run(), name="admin-notifier")
+
+
+async def post_stop(application: Application) -> None:
+    # پیش از بسته شدن اتصال Bot، اعلان‌های باقی‌مانده ارسال می‌شوند
+    await notifications.notifier.drain(timeout=config.NOTIFY_DRAIN_TIMEOUT)
+
+
+async def post_shutdown(application: Application) -> None:
+    tasks = list(background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# --- حالت webhook با سرور ASGI داخلی ---
+def build_webhook_app(application: Application):
+    """اپلیکیشن Starlette شامل مسیر webhook تلگرام و مسیر سلامت /healthz را می‌سازد."""
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    async def telegram_webhook(request: Request) -> Response:
+        secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        # compare_digest برای رشته‌های غیر ASCII خطا می‌دهد؛ مقایسه روی بایت‌ها انجام می‌شود
+        if not hmac.compare_digest(secret.encode('utf-8'), config.WEBHOOK_SECRET_TOKEN.encode('utf-8')):
+            return Response(status_code=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return Response(status_code=400)
+        if not isinstance(data, dict):
+            return Response(status_code=400)
+        try:
+            update = Update.de_json(data, application.bot)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"آپدیت نامعتبر در webhook رد شد: {e!r}")
+            return Response(status_code=400)
+        try:
+            application.update_queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # تلگرام آپدیت‌هایی را که پاسخ موفق نگرفته‌اند بعدا دوباره ارسال می‌کند
+            logger.warning("صف آپدیت‌ها پر است؛ آپدیت ورودی رد شد.")
+            return Response(status_code=503)
+        return Response()
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({
+            'status': 'ok',
+            'update_queue': application.update_queue.qsize(),
+            'update_queue_max': application.update_queue.maxsize,
+            'db_pool': db.db_pool.stats(),
+        })
+
+    return Starlette(routes=[
+        Route(config.WEBHOOK_PATH, telegram_webhook, methods=["POST"]),
+        Route("/healthz", health, methods=["GET"]),
+    ])
+
+
+async def run_webhook(application: Application) -> None:
+    """ربات را پشت سرور uvicorn اجرا می‌کند؛ چرخه عمر مشابه run_polling است."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        app=build_webhook_app(application), host=config.WEBHOOK_LISTEN, port=config.WEBHOOK_PORT,
+        log_level="warning", use_colors=False))
+    async with application:
+        await post_init(application)
+        if not config.WEBHOOK_SKIP_SET_WEBHOOK:
+            await application.bot.set_webhook(url=config.WEBHOOK_URL.rstrip('/') + config.WEBHOOK_PATH,
+                                              secret_token=config.WEBHOOK_SECRET_TOKEN,
+                                              allowed_updates=Update.ALL_TYPES)
+        await application.start()
+        logger.info(f"سرور webhook روی {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT} در حال اجرا است...")
+        try:
+            await server.serve()
+        finally:
+            await application.stop()
+            await post_stop(application)
+    await post_shutdown(application)
+
+
+def build_application(request=None) -> Application:
+    """Application را همراه با ConversationHandler اصلی و بقیه هندلرها می‌سازد ولی اجرا نمی‌کند.
+
+    request در اجرای آفلاین (مثل بنچمارک‌ها) جایگزین ارتباط HTTP با تلگرام می‌شود؛ در این حالت Updater
+    ساخته نمی‌شود و آپدیت‌ها مستقیما به application.process_update داده می‌شوند.
+    """
+    builder = Application.builder().token(config.BOT_TOKEN).update_queue(asyncio.Queue(maxsize=config.UPDATE_QUEUE_SIZE))
+    # همان اندازه استخر اتصال پیش‌فرض ApplicationBuilder برای درخواست‌های غیر از getUpdates
+    builder.request(request or InstrumentedRequest(connection_pool_size=256))
+    if request is not None:
+        builder.updater(None)
+    elif config.BOT_MODE == 'webhook':
+        # آپدیت‌ها مستقیما توسط سرور webhook در صف قرار می‌گیرند و به Updater نیازی نیست
+        builder.updater(None)
+    else:
+        builder.post_init(post_init).post_stop(post_stop).post_shutdown(post_shutdown)
+    persistence = build_persistence()
+    if persistence:
+        # تغییرات هر دوره update_persistence در پایان همان دوره و در یک تراکنش نوشته می‌شوند
+        builder.persistence(persistence).application_class(PersistenceApplication)
+    update_processor = build_update_processor()
+    if update_processor:
+        builder.concurrent_updates(update_processor)
+    application = builder.build()
+
+    conv_handler = ConversationHandler(
+        entry_points=[CommandHandler('start', start)],
+        states={
+            SELECTING_ACTION: [
+                CallbackQueryHandler(show_interview_options, pattern='^interview$'),
+                CallbackQueryHandler(show_design_menu, pattern='^design_question$'),
+                CallbackQueryHandler(archive_start, pattern='^archive$'),
+                CallbackQueryHandler(show_regulations_test_options, pattern='^regulations_test$'),
+            ],
+            SELECTING_INTERVIEW: [
+                CallbackQueryHandler(start_questions, pattern='^(personal|job)$'),
+                CallbackQueryHandler(show_political_categories, pattern='^political$'),
+                CallbackQueryHandler(start, pattern='^back_to_main$'),
+            ],
+            SELECTING_POLITICAL_CATEGORY: [
+                CallbackQueryHandler(start_questions, pattern='^political_.*$'),
+                CallbackQueryHandler(show_interview_options, pattern='^back_to_interview_menu$')
+            ],
+            ANSWERING_QUESTIONS: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_answer)],
+            CONFIRM_SUBMISSION: [CallbackQueryHandler(confirm_submission, pattern='^confirm_.*$')],
+
+            SELECTING_DESIGN_ACTION: [
+                CallbackQueryHandler(select_category_for_add, pattern='^design_create_interview$'),
+                CallbackQueryHandler(select_category_for_delete, pattern='^design_delete_interview$'),
+                CallbackQueryHandler(select_regulation_type_for_add, pattern='^design_create_regulation$'),
+                CallbackQueryHandler(prompt_regulation_import, pattern='^design_import_regulation$'),
+                CallbackQueryHandler(export_regulation_questions, pattern='^design_export_regulation$'),
+                CallbackQueryHandler(start, pattern='^back_to_main$')
+            ],
+            IMPORTING_REGULATION_QUESTIONS: [MessageHandler(filters.Document.ALL, import_regulation_questions)],
+            SELECT_ADD_CAT: [
+                CallbackQueryHandler(prompt_for_new_question, pattern='^add_cat_'),
+                CallbackQueryHandler(show_design_menu, pattern='^back_to_design_menu$')
+            ],
+            SELECT_ADD_POLITICAL_CAT: [
+                CallbackQueryHandler(prompt_for_new_question, pattern='^add_subcat_.*$'),
+                CallbackQueryHandler(select_category_for_add, pattern='^back_to_add_menu$')
+            ],
+            ADDING_QUESTION_TEXT: [MessageHandler(filters.TEXT & ~filters.COMMAND, add_question_text)],
+            ASK_ADD_ANOTHER: [CallbackQueryHandler(handle_add_another, pattern='^add_another_(yes|no)$')],
+
+            SELECT_DEL_CAT: [
+                CallbackQueryHandler(list_questions_for_delete, pattern='^del_cat_'),
+                CallbackQueryHandler(show_design_menu, pattern='^back_to_design_menu$')
+            ],
+            SELECT_DEL_POLITICAL_CAT: [
+                CallbackQueryHandler(list_questions_for_delete, pattern='^del_subcat_.*$'),
+                CallbackQueryHandler(select_category_for_delete, pattern='^back_to_delete_menu$')
+            ],
+            LISTING_QUESTIONS_FOR_DELETE: [
+                CallbackQueryHandler(select_category_for_delete, pattern='^back_to_delete_menu$'),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, delete_question_by_number)
+            ],
+
+            ARCHIVE_PASSWORD_PROMPT: [MessageHandler(filters.TEXT & ~filters.COMMAND, archive_password_check)],
+            LISTING_ARCHIVED_USERS: [
+                CallbackQueryHandler(show_archive_user_options, pattern='^view_user_'),
+                CallbackQueryHandler(list_archived_users, pattern=r'^arcu_p_\d+$'),
+                CallbackQueryHandler(prompt_archived_user_search, pattern='^arcu_search$'),
+                CallbackQueryHandler(list_archived_users, pattern='^back_to_user_list$'),
+                CallbackQueryHandler(start, pattern='^back_to_main$'),
+            ],
+            SEARCHING_ARCHIVED_USERS: [
+                MessageHandler(filters.TEXT & ~filters.COMMAND, search_archived_users),
+                CallbackQueryHandler(list_archived_users, pattern='^back_to_user_list$'),
+            ],
+            SELECTING_ARCHIVE_CATEGORY: [
+                CallbackQueryHandler(show_user_interviews_by_category, pattern='^view_cat_'),
+                CallbackQueryHandler(export_archived_user, pattern=r'^arcx_\d+$'),
+                CallbackQueryHandler(list_archived_users, pattern='^back_to_user_list$'),
+            ],
+            SHOWING_USER_INTERVIEWS: [
+                CallbackQueryHandler(paginate_user_interviews, pattern=r'^arcp_[np]_\d+_\d+_\d+$'),
+                CallbackQueryHandler(show_archive_user_options, pattern=r'^view_user_.*'),
+                CallbackQueryHandler(list_archived_users, pattern='^back_to_user_list$'),
+            ],
+
+            SELECTING_REGULATIONS_TEST_TYPE: [
+                CallbackQueryHandler(regulations_test_start, pattern='^start_test_(کلی|جزئی)$'),
+                CallbackQueryHandler(start, pattern='^back_to_main$'),
+            ],
+            REGULATIONS_TEST_ANSWERING: [CallbackQueryHandler(handle_regulations_test_answer, pattern='^rt_answer_')],
+
+            SELECT_REGULATION_TYPE_FOR_ADD: [
+                CallbackQueryHandler(prompt_for_regulation_question_text, pattern='^add_reg_type_'),
+                CallbackQueryHandler(show_design_menu, pattern='^back_to_design_menu$')
+            ],
+            ADDING_REGULATION_QUESTION_TEXT: [
+                MessageHandler(filters.TEXT & ~filters.COMMAND, get_regulation_question_text)],
+            ADDING_REGULATION_OPTION_1: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_regulation_option_1)],
+            ADDING_REGULATION_OPTION_2: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_regulation_option_2)],
+            ADDING_REGULATION_OPTION_3: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_regulation_option_3)],
+            ADDING_REGULATION_OPTION_4: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_regulation_option_4)],
+            SELECTING_REGULATION_CORRECT_ANSWER: [
+                CallbackQueryHandler(save_regulation_question, pattern='^select_correct_ans_')]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)],
+        per_message=False,
+        name=conversation_states.name,
+        persistent=persistence is not None,
+    )
+
+    for handler in [*conv_handler.entry_points, *conv_handler.fallbacks,
+                    *(handler for handlers in conv_handler.states.values() for handler in handlers)]:
+        instrument_handler(handler, conversation=conversation_states)
+    metrics.add_collector(conversation_states.collect)
+    metrics.add_collector(runtime_collector(application))
+
+    application.add_handler(conv_handler)
+    application.add_handler(instrument_handler(CommandHandler("help", help_command)))
+    application.add_handler(instrument_handler(CommandHandler("stats", stats_command)))
+    application.add_handler(instrument_handler(CommandHandler("search", search_archive_command)))
+    application.add_handler(instrument_handler(CommandHandler("export", export_archive_command)))
+    application.add_handler(instrument_handler(CommandHandler("categories", list_political_subcategories_command)))
+    application.add_handler(instrument_handler(CommandHandler("addcategory", add_political_subcategory_command)))
+    application.add_handler(instrument_handler(CommandHandler("delcategory", delete_political_subcategory_command)))
+    application.add_handler(instrument_handler(CommandHandler("hardest", hardest_questions_command)))
+    application.add_handler(instrument_handler(CallbackQueryHandler(paginate_archive_search, pattern=r'^srch_\d+$')))
+    application.add_handler(instrument_handler(CallbackQueryHandler(add_to_archive_handler, pattern='^archive_add_')))
+    application.add_handler(instrument_handler(CallbackQueryHandler(ignore_archive_handler, pattern='^archive_ignore_')))
+    application.add_error_handler(error_handler)
+    return application
+
+
+def main() -> None:
+    config.setup_logging()
+    if not config.BOT_TOKEN or not config.ADMIN_ID or not config.ARCHIVE_PASSWORD:
+        logger.critical("یکی از متغیرهای محیطی BOT_TOKEN, ADMIN_ID, ARCHIVE_PASSWORD تعریف نشده است!")
+        return
+    if not config.DATABASE_URL:
+        logger.critical("متغیر محیطی DATABASE_URL تعریف نشده است! برنامه متوقف می‌شود.")
+        return
+    if config.BOT_MODE == 'webhook' and (not config.WEBHOOK_SECRET_TOKEN or not (config.WEBHOOK_URL or config.WEBHOOK_SKIP_SET_WEBHOOK)):
+        logger.critical("در حالت webhook متغیرهای WEBHOOK_URL و WEBHOOK_SECRET_TOKEN باید تعریف شوند!")
+        return
+
+    init_db_pool()
+    setup_database()
+    application = build_application()
+
+    logger.info("ربات در حال اجرا است...")
+    try:
+        if config.BOT_MODE == 'webhook':
+            asyncio.run(run_webhook(application))
+        else:
+            application.run_polling()
+    finally:
+        db.db_executor.shutdown(wait=True)
+        db.db_pool.close()
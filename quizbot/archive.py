@@ -0,0 +1,256 @@
+"""توابع دیتابیس بایگانی مصاحبه‌ها، جستجو و خروجی آن و پاسخ‌های در انتظار تصمیم ادمین."""
+import asyncio
+import json
+import logging
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from . import config
+from .db import ARCHIVE_SEARCH_DOCUMENT_SQL, ARCHIVE_SEARCH_VECTOR_SQL, db_query, db_transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _write_archive(cursor, user_id, user_name, interview_type, subcategory=None, user_username=None, answers=(),
+                   full_text=None):
+    # درج در بایگانی و به‌روزرسانی جداول خلاصه کاربران در یک دستور انجام می‌شود
+    cursor.execute("""
+        WITH inserted AS (
+            INSERT INTO archive (user_id, user_name, interview_type, subcategory, user_username, full_text, timestamp)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, user_id, user_name, interview_type, timestamp
+        ), summary AS (
+            INSERT INTO archived_users (user_id, user_name, interview_count, last_seen)
+            SELECT user_id, user_name, 1, timestamp FROM inserted
+            ON CONFLICT (user_id) DO UPDATE SET
+                user_name = EXCLUDED.user_name,
+                interview_count = archived_users.interview_count + 1,
+                last_seen = GREATEST(archived_users.last_seen, EXCLUDED.last_seen)
+        ), type_summary AS (
+            INSERT INTO archived_user_types (user_id, interview_type, interview_count, last_seen)
+            SELECT user_id, interview_type, 1, timestamp FROM inserted
+            ON CONFLICT (user_id, interview_type) DO UPDATE SET
+                interview_count = archived_user_types.interview_count + 1,
+                last_seen = GREATEST(archived_user_types.last_seen, EXCLUDED.last_seen)
+        )
+        SELECT id FROM inserted
+    """, (user_id, user_name, interview_type, subcategory, user_username, full_text, int(time.time())))
+    archive_id = cursor.fetchone()[0]
+    if answers:
+        psycopg2.extras.execute_values(
+            cursor, "INSERT INTO interview_answers (archive_id, position, question_id, answer_text) VALUES %s",
+            [(archive_id, position, question_id, answer_text)
+             for position, (question_id, answer_text) in enumerate(answers)])
+    cursor.execute(ARCHIVE_SEARCH_VECTOR_SQL + " WHERE id = %s", (archive_id,))
+    return archive_id
+
+
+async def add_to_archive_db(user_id, user_name, interview_type, subcategory=None, user_username=None, answers=(),
+                            full_text=None):
+    """یک مصاحبه را بایگانی می‌کند؛ پاسخ‌ها (question_id, answer_text) با یک درج دسته‌ای در interview_answers ذخیره می‌شوند.
+
+    full_text فقط برای موارد قدیمی است که پاسخ‌های ساختاریافته ندارند.
+    """
+    def write(cursor):
+        return _write_archive(cursor, user_id, user_name, interview_type, subcategory, user_username, answers,
+                              full_text)
+
+    try:
+        return await db_transaction(write, name='add_to_archive_db')
+    except psycopg2.Error as e:
+        logger.error(f"خطای دیتابیس: {e}")
+        return None
+
+
+async def get_interview_answers_from_db(archive_ids):
+    """پاسخ‌های چند مصاحبه بایگانی شده را با یک کوئری به صورت {archive_id: [(question_text, answer_text), ...]} برمی‌گرداند."""
+    if not archive_ids:
+        return {}
+    rows = await db_query("""
+        SELECT a.archive_id, q.question_text, a.answer_text
+        FROM interview_answers a
+        LEFT JOIN interview_questions q ON q.id = a.question_id
+        WHERE a.archive_id = ANY(%s)
+        ORDER BY a.archive_id, a.position
+    """, (list(archive_ids),), fetchall=True, name='get_interview_answers_from_db')
+    answers = {}
+    for archive_id, question_text, answer_text in rows or []:
+        answers.setdefault(archive_id, []).append((question_text or "(سوال حذف شده)", answer_text))
+    return answers
+
+
+async def search_archive_from_db(terms, offset=0, limit=5):
+    """مصاحبه‌های منطبق با عبارت جستجو را به ترتیب ارتباط برمی‌گرداند؛ ts_headline فقط برای همین صفحه محاسبه می‌شود.
+
+    یکسان‌سازی فقط برای تطبیق (tsvector و tsquery) است؛ خلاصه از متن اصلی ساخته می‌شود تا همان نوشته‌ای که
+    ذخیره شده نمایش داده شود و عبارت جستجو به هر دو شکل اصلی و یکسان‌سازی شده در آن علامت می‌خورد.
+    """
+    return await db_query(f"""
+        WITH search AS (SELECT websearch_to_tsquery('simple', persian_normalize(%s)) AS query,
+                               websearch_to_tsquery('simple', %s) AS raw_query)
+        SELECT m.id, m.user_id, m.user_name, m.interview_type, m.timestamp,
+               ts_headline('simple', {ARCHIVE_SEARCH_DOCUMENT_SQL.replace('archive.', 'm.')},
+                           search.raw_query || search.query,
+                           'StartSel=«, StopSel=», MaxWords=20, MinWords=8, MaxFragments=2')
+        FROM (
+            SELECT archive.*, ts_rank(archive.search_vector, search.query) AS rank
+            FROM archive, search
+            WHERE archive.search_vector @@ search.query
+            ORDER BY rank DESC, archive.id DESC
+            LIMIT %s OFFSET %s
+        ) m, search
+        ORDER BY m.rank DESC, m.id DESC
+    """, (terms, terms, limit, offset), fetchall=True, name='search_archive_from_db')
+
+
+async def get_archived_users_from_db(offset=0, limit=None):
+    """کاربران بایگانی را از جدید به قدیم (بر اساس آخرین مصاحبه) از جدول خلاصه برمی‌گرداند."""
+    return await db_query(
+        "SELECT user_id, user_name FROM archived_users ORDER BY last_seen DESC, user_id DESC OFFSET %s LIMIT %s",
+        (offset, limit), fetchall=True, name='get_archived_users_from_db')
+
+
+async def get_archived_user_from_db(user_id):
+    """مشخصات یک کاربر بایگانی (نام، تعداد مصاحبه‌ها به تفکیک نوع و زمان آخرین مصاحبه) را برمی‌گرداند."""
+    rows = await db_query("""
+        SELECT u.user_name, u.interview_count, u.last_seen, t.interview_type, t.interview_count, t.last_seen
+        FROM archived_users u
+        LEFT JOIN archived_user_types t ON t.user_id = u.user_id
+        WHERE u.user_id = %s
+    """, (user_id,), fetchall=True, name='get_archived_user_from_db')
+    if not rows:
+        return None
+    user_name, interview_count, last_seen = rows[0][:3]
+    return {
+        'name': user_name,
+        'interview_count': interview_count,
+        'last_seen': last_seen,
+        'type_counts': {row[3]: row[4] for row in rows if row[3] is not None},
+    }
+
+
+async def search_archived_users_from_db(term, limit=20):
+    # کاراکترهای ویژه LIKE در عبارت جستجو escape می‌شوند
+    pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return await db_query(
+        "SELECT user_id, user_name FROM archived_users WHERE user_name ILIKE %s "
+        "ORDER BY last_seen DESC, user_id DESC LIMIT %s",
+        (pattern, limit), fetchall=True, name='search_archived_users_from_db')
+
+
+async def get_user_interviews_page_from_db(user_id, interview_type=None, cursor=None, older=True, limit=3):
+    """یک صفحه از مصاحبه‌های کاربر را با صفحه‌بندی keyset روی (timestamp, id) برمی‌گرداند.
+
+    خروجی همیشه از جدید به قدیم مرتب است و هر عضو آن
+    (id, full_text, timestamp, user_id, user_name, user_username, interview_type, subcategory) است.
+    """
+    conditions = ["user_id = %s"]
+    params = [user_id]
+    if interview_type and interview_type != 'all':
+        conditions.append("interview_type = %s")
+        params.append(interview_type)
+    if cursor:
+        conditions.append("(timestamp, id) < (%s, %s)" if older else "(timestamp, id) > (%s, %s)")
+        params.extend(cursor)
+    order = "DESC" if older else "ASC"
+    results = await db_query(
+        f"SELECT id, full_text, timestamp, user_id, user_name, user_username, interview_type, subcategory "
+        f"FROM archive WHERE {' AND '.join(conditions)} "
+        f"ORDER BY timestamp {order}, id {order} LIMIT %s",
+        (*params, limit), fetchall=True, name='get_user_interviews_page_from_db') or []
+    return results if older else results[::-1]
+
+
+def build_archive_export_query(user_id=None, interview_type=None):
+    """کوئری خروجی بایگانی را همراه با پاسخ‌های ساختاریافته هر مصاحبه (به ترتیب سوالات) می‌سازد."""
+    conditions, params = [], []
+    if user_id is not None:
+        conditions.append("a.user_id = %s")
+        params.append(user_id)
+    if interview_type:
+        conditions.append("a.interview_type = %s")
+        params.append(interview_type)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT a.id, a.timestamp, a.user_id, a.user_name, a.user_username, a.interview_type, a.subcategory,
+               a.full_text, COALESCE(ans.answers, '[]'::json)
+        FROM archive a
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_array(COALESCE(q.question_text, '(سوال حذف شده)'), ia.answer_text)
+                            ORDER BY ia.position) AS answers
+            FROM interview_answers ia
+            LEFT JOIN interview_questions q ON q.id = ia.question_id
+            WHERE ia.archive_id = a.id
+        ) ans ON TRUE
+        {where}
+        ORDER BY a.timestamp, a.id
+    """
+    return query, tuple(params)
+
+
+# --- پاسخ‌های در انتظار تصمیم ادمین ---
+async def add_pending_submission_to_db(submission_id, payload):
+    now = int(time.time())
+    await db_query(
+        "INSERT INTO pending_submissions (id, payload, created_at, expires_at) VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET payload = EXCLUDED.payload, expires_at = EXCLUDED.expires_at",
+        (submission_id, json.dumps(payload, ensure_ascii=False), now, now + config.PENDING_SUBMISSION_TTL),
+        name='add_pending_submission_to_db')
+
+
+async def archive_pending_submission_in_db(submission_id):
+    """مورد در انتظار را برمی‌دارد و بایگانی می‌کند؛ حذف ردیف و درج‌های بایگانی در یک تراکنش انجام می‌شوند.
+
+    حذف اتمیک تضمین می‌کند که با چند نمونه ربات هم هر مورد فقط یک بار بایگانی شود و اگر درج بایگانی
+    شکست بخورد ردیف در انتظار باقی می‌ماند. شناسه بایگانی، برای موارد منقضی یا قبلا بایگانی شده False
+    و در صورت خطای دیتابیس None برمی‌گرداند.
+    """
+    def claim_and_write(cursor):
+        cursor.execute("DELETE FROM pending_submissions WHERE id = %s AND expires_at > %s RETURNING payload",
+                       (submission_id, int(time.time())))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        payload = row[0]
+        return _write_archive(
+            cursor,
+            user_id=payload['user_info']['id'],
+            user_name=payload['user_info']['name'],
+            interview_type=payload['interview_type'],
+            subcategory=payload.get('subcategory'),
+            user_username=payload['user_info'].get('username'),
+            answers=payload.get('answers', ()),
+            # موارد در انتظاری که پیش از ذخیره ساختاریافته ثبت شده‌اند فقط متن کامل دارند
+            full_text=payload.get('text'))
+
+    try:
+        return await db_transaction(claim_and_write, name='archive_pending_submission_in_db')
+    except psycopg2.Error as e:
+        logger.error(f"خطای دیتابیس: {e}")
+        return None
+
+
+async def delete_pending_submission_from_db(submission_id):
+    await db_query("DELETE FROM pending_submissions WHERE id = %s", (submission_id,),
+                   name='delete_pending_submission_from_db')
+
+
+async def delete_expired_pending_submissions_from_db():
+    result = await db_query(
+        "WITH deleted AS (DELETE FROM pending_submissions WHERE expires_at <= %s RETURNING 1) SELECT COUNT(*) FROM deleted",
+        (int(time.time()),), fetchone=True, name='delete_expired_pending_submissions_from_db')
+    return result[0] if result else 0
+
+
+async def sweep_pending_submissions():
+    """موارد منقضی شده را به صورت دوره‌ای از دیتابیس پاک می‌کند."""
+    while True:
+        await asyncio.sleep(config.PENDING_SWEEP_INTERVAL)
+        try:
+            deleted = await delete_expired_pending_submissions_from_db()
+            if deleted:
+                logger.info(f"{deleted} پاسخ منقضی شده در انتظار بایگانی پاک شد.")
+        except Exception as e:
+            logger.error(f"خطا در پاک‌سازی پاسخ‌های منقضی شده: {e}")
\ No newline at end of file
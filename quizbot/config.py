@@ -0,0 +1,138 @@
+"""تنظیمات ربات که فقط هنگام اولین دسترسی از متغیرهای محیطی (و فایل .env) خوانده می‌شوند.
+
+ایمپورت این ماژول یا هر ماژول دیگر بسته به متغیرهای محیطی نیاز ندارد؛ مثلا config.ADMIN_ID در اولین
+دسترسی خوانده و در ماژول ذخیره می‌شود. در تست‌ها و ابزارها می‌توان مقدار را مستقیما جایگزین کرد
+(config.ADMIN_ID = 1) یا با reload() همه مقادیر را دوباره از محیط خواند.
+"""
+import json
+import logging
+import os
+
+_env_loaded = False
+
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        # --- بارگذاری متغیرهای محیطی برای تست محلی ---
+        from dotenv import load_dotenv
+        load_dotenv()
+
+
+def _int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _json(name, default):
+    return json.loads(os.environ.get(name, default))
+
+
+_SETTINGS = {
+    # --- متغیرهای اصلی (آماده برای Render) ---
+    'BOT_TOKEN': lambda: os.environ.get("BOT_TOKEN"),
+    'ADMIN_ID': lambda: _int("ADMIN_ID"),
+    'ARCHIVE_PASSWORD': lambda: os.environ.get("ARCHIVE_PASSWORD"),
+    # این متغیر به صورت خودکار توسط Render پر می‌شود وقتی دیتابیس را به سرویس متصل کنید
+    'DATABASE_URL': lambda: os.environ.get("DATABASE_URL"),
+
+    # --- حالت اجرا: polling (پیش‌فرض) یا webhook ---
+    'BOT_MODE': lambda: os.environ.get("BOT_MODE", "polling").lower(),
+    'WEBHOOK_URL': lambda: os.environ.get("WEBHOOK_URL"),
+    'WEBHOOK_PATH': lambda: os.environ.get("WEBHOOK_PATH", "/telegram"),
+    'WEBHOOK_SECRET_TOKEN': lambda: os.environ.get("WEBHOOK_SECRET_TOKEN"),
+    'WEBHOOK_LISTEN': lambda: os.environ.get("WEBHOOK_LISTEN", "0.0.0.0"),
+    # Render پورت سرویس وب را در PORT قرار می‌دهد
+    'WEBHOOK_PORT': lambda: _int("PORT", 8000),
+    # برای آزمایش محلی با آپدیت‌های ضبط شده، ثبت webhook در تلگرام را غیرفعال می‌کند
+    'WEBHOOK_SKIP_SET_WEBHOOK': lambda: _flag("WEBHOOK_SKIP_SET_WEBHOOK"),
+    'UPDATE_QUEUE_SIZE': lambda: _int("UPDATE_QUEUE_SIZE", 1000),
+    # اگر بزرگ‌تر از صفر باشد آپدیت‌های کاربران مختلف هم‌زمان پردازش می‌شوند
+    'UPDATE_CONCURRENCY': lambda: _int("UPDATE_CONCURRENCY", 0),
+
+    # --- متریک‌ها ---
+    'METRICS_PORT': lambda: _int("METRICS_PORT", 0),
+    # پیش‌فرض فقط روی localhost گوش می‌دهد تا متریک‌ها از بیرون در دسترس نباشند
+    'METRICS_LISTEN': lambda: os.environ.get("METRICS_LISTEN", "127.0.0.1"),
+
+    # --- دیتابیس ---
+    'DB_POOL_MIN_SIZE': lambda: _int("DB_POOL_MIN_SIZE", 1),
+    'DB_POOL_MAX_SIZE': lambda: _int("DB_POOL_MAX_SIZE", 10),
+    'DB_POOL_ACQUIRE_TIMEOUT': lambda: _float("DB_POOL_ACQUIRE_TIMEOUT", "10"),
+    'DB_POOL_HEALTHCHECK_INTERVAL': lambda: _float("DB_POOL_HEALTHCHECK_INTERVAL", "30"),
+    'QUESTION_CACHE_TTL': lambda: _float("QUESTION_CACHE_TTL", "300"),
+    'PENDING_SUBMISSION_TTL': lambda: _int("PENDING_SUBMISSION_TTL", 7 * 24 * 60 * 60),
+    'PENDING_SWEEP_INTERVAL': lambda: _int("PENDING_SWEEP_INTERVAL", 3600),
+
+    # --- ذخیره پایدار وضعیت مکالمه‌ها: postgres، file یا none ---
+    'PERSISTENCE_BACKEND': lambda: os.environ.get("PERSISTENCE_BACKEND", "postgres").lower(),
+    'PERSISTENCE_UPDATE_INTERVAL': lambda: _float("PERSISTENCE_UPDATE_INTERVAL", "30"),
+    'PERSISTENCE_FILE': lambda: os.environ.get("PERSISTENCE_FILE", "bot_persistence.pickle"),
+
+    # --- صف اعلان‌های ادمین ---
+    'NOTIFY_GLOBAL_RATE': lambda: _int("NOTIFY_GLOBAL_RATE", 25),
+    'NOTIFY_PER_CHAT_INTERVAL': lambda: _float("NOTIFY_PER_CHAT_INTERVAL", "1.0"),
+    'ADMIN_DIGEST_WINDOW': lambda: _float("ADMIN_DIGEST_WINDOW", "0"),
+    'NOTIFY_MAX_RETRIES': lambda: _int("NOTIFY_MAX_RETRIES", 5),
+    'NOTIFY_DRAIN_TIMEOUT': lambda: _float("NOTIFY_DRAIN_TIMEOUT", "10"),
+
+    # --- بایگانی ---
+    'ARCHIVED_USERS_PAGE_SIZE': lambda: _int("ARCHIVED_USERS_PAGE_SIZE", 10),
+    'ARCHIVE_PAGE_SIZE': lambda: _int("ARCHIVE_PAGE_SIZE", 3),
+    'ARCHIVE_SEARCH_PAGE_SIZE': lambda: _int("ARCHIVE_SEARCH_PAGE_SIZE", 5),
+
+    # --- آزمون آیین‌نامه ---
+    # تعداد سوالات هر آزمون؛ صفر یعنی همه سوالات بانک. مثال: {"کلی": 30, "جزئی": 20}
+    'REGULATION_TEST_SIZE_DEFAULT': lambda: _int("REGULATION_TEST_SIZE_DEFAULT", 0),
+    'REGULATION_TEST_SIZES': lambda: _json("REGULATION_TEST_SIZES", "{}"),
+    # uniform: نمونه‌گیری یکنواخت | weighted: بر اساس ستون weight سوالات که از نرخ خطای پاسخ‌ها به‌روز می‌شود
+    'REGULATION_SAMPLING': lambda: os.environ.get("REGULATION_SAMPLING", "uniform"),
+    'REGULATION_FEEDBACK_DEFAULT': lambda: os.environ.get("REGULATION_FEEDBACK_DEFAULT", "inline"),
+    # مثال: {"کلی": "summary", "جزئی": "inline"}
+    'REGULATION_FEEDBACK_BY_TYPE': lambda: _json("REGULATION_FEEDBACK_MODES", "{}"),
+    # سوالاتی که کمتر از این تعداد پاسخ دارند در گزارش /hardest نمی‌آیند
+    'REGULATION_STATS_MIN_ATTEMPTS': lambda: _int("REGULATION_STATS_MIN_ATTEMPTS", 5),
+}
+
+
+def __getattr__(name):
+    # فقط برای نام‌هایی که هنوز در ماژول ذخیره نشده‌اند فراخوانی می‌شود
+    loader = _SETTINGS.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _load_env()
+    value = loader()
+    globals()[name] = value
+    return value
+
+
+def reload():
+    """مقادیر ذخیره شده را پاک می‌کند تا در دسترسی بعدی دوباره از محیط خوانده شوند."""
+    for name in _SETTINGS:
+        globals().pop(name, None)
+
+
+def setup_logging():
+    # --- تنظیمات لاگ رنگی ---
+    import colorlog
+
+    logger = colorlog.getLogger()
+    if logger.handlers:
+        return
+    handler = colorlog.StreamHandler()
+    handler.setFormatter(colorlog.ColoredFormatter(
+        '%(log_color)s%(asctime)s - %(levelname)s - %(message)s',
+        log_colors={'DEBUG': 'green', 'INFO': 'blue', 'WARNING': 'yellow', 'ERROR': 'red', 'CRITICAL': 'red,bg_white'},
+        reset=True, style='%'
+    ))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
@@ -0,0 +1,526 @@
+"""استخر اتصال PostgreSQL، executor اختصاصی دیتابیس و مهاجرت‌های نسخه‌دار شِما."""
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import logging
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from . import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """در زمان مقرر اتصال آزادی در استخر پیدا نشد."""
+
+
+class DatabasePool:
+    """استخر محدود اتصال‌های PostgreSQL که یک بار در main ساخته و بین همه توابع دیتابیس مشترک است."""
+
+    def __init__(self, dsn, min_size=1, max_size=10, acquire_timeout=10.0, health_check_interval=30.0):
+        self._dsn = dsn
+        self._max_size = max_size
+        self._acquire_timeout = acquire_timeout
+        self._health_check_interval = health_check_interval
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # اتصال‌های بیکار همراه با زمان آخرین استفاده
+        self._idle = collections.deque()
+        self._opened = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        for _ in range(min(min_size, max_size)):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(self._dsn)
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _is_healthy(self, conn, idle_since):
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self._health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+            if item is None:
+                return self._connect()
+            conn, idle_since = item
+            if self._is_healthy(conn, idle_since):
+                return conn
+            logger.warning("یک اتصال خراب دیتابیس از استخر حذف شد.")
+            self._discard(conn)
+
+    def _checkin(self, conn):
+        if conn.closed or conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                self._discard(conn)
+                return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    @contextlib.contextmanager
+    def connection(self):
+        """یک اتصال از استخر قرض می‌گیرد و در پایان آن را برمی‌گرداند."""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"پس از {self._acquire_timeout} ثانیه اتصال آزادی در استخر دیتابیس پیدا نشد.")
+        waited = time.monotonic() - started
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def stats(self):
+        """وضعیت فعلی استخر (در حال استفاده، بیکار و زمان انتظار) را برمی‌گرداند."""
+        with self._lock:
+            return {
+                'max_size': self._max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'opened': self._opened,
+                'acquired': self._acquired,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': (self._wait_total / self._acquired * 1000) if self._acquired else 0.0,
+                'max_wait_ms': self._wait_max * 1000,
+            }
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), collections.deque()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+db_pool = None
+db_executor = None
+
+
+def init_db_pool():
+    """استخر اتصال و executor اختصاصی دیتابیس را بر اساس متغیرهای محیطی می‌سازد."""
+    global db_pool, db_executor
+    max_size = config.DB_POOL_MAX_SIZE
+    db_pool = DatabasePool(
+        config.DATABASE_URL,
+        min_size=config.DB_POOL_MIN_SIZE,
+        max_size=max_size,
+        acquire_timeout=config.DB_POOL_ACQUIRE_TIMEOUT,
+        health_check_interval=config.DB_POOL_HEALTHCHECK_INTERVAL,
+    )
+    # هر نخ executor حداکثر یک اتصال می‌گیرد؛ بنابراین اندازه آن با سقف استخر برابر است
+    db_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_size, thread_name_prefix="db")
+    return db_pool
+
+
+# --- مهاجرت‌های نسخه‌دار شِمای دیتابیس ---
+# سند جستجوی هر مصاحبه: متن کامل قدیمی بدون تگ‌های HTML و با entityهای escape_html برگردانده به کاراکتر اصلی،
+# یا متن سوالات و پاسخ‌های ساختاریافته. &amp; آخر از همه برگردانده می‌شود تا مثلا &amp;lt; به < تبدیل نشود
+ARCHIVE_SEARCH_DOCUMENT_SQL = """
+    COALESCE(
+        replace(replace(replace(replace(
+            regexp_replace(archive.full_text, '<[^>]+>', ' ', 'g'),
+            '&lt;', '<'), '&gt;', '>'), '&quot;', '"'), '&amp;', '&'),
+        (SELECT string_agg(COALESCE(q.question_text, '') || ' ' || a.answer_text, ' ' ORDER BY a.position)
+         FROM interview_answers a
+         LEFT JOIN interview_questions q ON q.id = a.question_id
+         WHERE a.archive_id = archive.id),
+        '')
+"""
+ARCHIVE_SEARCH_VECTOR_SQL = (
+    f"UPDATE archive SET search_vector = to_tsvector('simple', persian_normalize({ARCHIVE_SEARCH_DOCUMENT_SQL}))")
+# وزن نمونه‌گیری وزن‌دار از آمار پاسخ‌ها: 0.5 به اضافه نرخ خطای هموار شده (لاپلاس)، پس بین 0.5 و 1.5 است؛
+# سوالات بدون پاسخ وزن پیش‌فرض 1 را دارند و سوالات آسان هم هیچ‌وقت از نمونه‌گیری حذف نمی‌شوند
+REGULATION_WEIGHT_BASE = 0.5
+REGULATION_WEIGHT_PRIOR_WRONG = 1
+REGULATION_WEIGHT_PRIOR_ATTEMPTS = 2
+REGULATION_WEIGHT_SQL = (
+    f"{REGULATION_WEIGHT_BASE} + (stats.attempts - stats.correct + {REGULATION_WEIGHT_PRIOR_WRONG})::real "
+    f"/ (stats.attempts + {REGULATION_WEIGHT_PRIOR_ATTEMPTS})")
+
+
+def regulation_weight(attempts, correct):
+    """همان فرمول REGULATION_WEIGHT_SQL در پایتون، برای محاسبه وزن بیرون از دیتابیس."""
+    return (REGULATION_WEIGHT_BASE
+            + (attempts - correct + REGULATION_WEIGHT_PRIOR_WRONG) / (attempts + REGULATION_WEIGHT_PRIOR_ATTEMPTS))
+
+
+# هر مهاجرت (نسخه، توضیح، دستورات) است و فقط یک بار اجرا می‌شود؛ مهاجرت‌های اجرا شده نباید تغییر کنند.
+MIGRATIONS = [
+    (1, "جداول اولیه", [
+        # تغییر AUTOINCREMENT به SERIAL PRIMARY KEY برای PostgreSQL
+        '''
+        CREATE TABLE IF NOT EXISTS interview_questions (
+            id SERIAL PRIMARY KEY,
+            category TEXT NOT NULL,
+            subcategory TEXT,
+            question_text TEXT NOT NULL UNIQUE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS archive (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            user_name TEXT NOT NULL,
+            interview_type TEXT NOT NULL,
+            full_text TEXT NOT NULL,
+            timestamp BIGINT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS regulation_questions (
+            id SERIAL PRIMARY KEY,
+            test_type TEXT NOT NULL,
+            question TEXT NOT NULL UNIQUE,
+            options JSONB NOT NULL,
+            answer INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_attempts (
+            user_id BIGINT NOT NULL,
+            test_type TEXT NOT NULL,
+            timestamp BIGINT NOT NULL,
+            PRIMARY KEY (user_id, test_type)
+        )
+        ''',
+    ]),
+    (2, "ایندکس‌های کوئری‌های پرتکرار", [
+        "CREATE INDEX IF NOT EXISTS archive_user_type_ts_idx ON archive (user_id, interview_type, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS archive_user_ts_idx ON archive (user_id, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS interview_questions_category_idx "
+        "ON interview_questions (category, subcategory, id)",
+        "CREATE INDEX IF NOT EXISTS regulation_questions_type_idx ON regulation_questions (test_type, id)",
+    ]),
+    (3, "ایندکس‌های صفحه‌بندی keyset بایگانی", [
+        "DROP INDEX IF EXISTS archive_user_type_ts_idx",
+        "DROP INDEX IF EXISTS archive_user_ts_idx",
+        "CREATE INDEX IF NOT EXISTS archive_user_type_ts_id_idx "
+        "ON archive (user_id, interview_type, timestamp DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS archive_user_ts_id_idx ON archive (user_id, timestamp DESC, id DESC)",
+    ]),
+    (4, "جدول خلاصه کاربران بایگانی", [
+        '''
+        CREATE TABLE IF NOT EXISTS archived_users (
+            user_id BIGINT PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            interview_count INTEGER NOT NULL DEFAULT 0,
+            last_seen BIGINT NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO archived_users (user_id, user_name, interview_count, last_seen)
+        SELECT DISTINCT ON (user_id) user_id, user_name,
+               COUNT(*) OVER (PARTITION BY user_id), MAX(timestamp) OVER (PARTITION BY user_id)
+        FROM archive
+        ORDER BY user_id, timestamp DESC
+        ON CONFLICT (user_id) DO NOTHING
+        ''',
+        "CREATE INDEX IF NOT EXISTS archived_users_last_seen_idx ON archived_users (last_seen DESC, user_id DESC)",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS archived_users_name_trgm_idx ON archived_users USING gin (user_name gin_trgm_ops)",
+    ]),
+    (5, "شمارش مصاحبه‌های هر کاربر به تفکیک نوع", [
+        '''
+        CREATE TABLE IF NOT EXISTS archived_user_types (
+            user_id BIGINT NOT NULL,
+            interview_type TEXT NOT NULL,
+            interview_count INTEGER NOT NULL DEFAULT 0,
+            last_seen BIGINT NOT NULL,
+            PRIMARY KEY (user_id, interview_type)
+        )
+        ''',
+        '''
+        INSERT INTO archived_user_types (user_id, interview_type, interview_count, last_seen)
+        SELECT user_id, interview_type, COUNT(*), MAX(timestamp)
+        FROM archive
+        GROUP BY user_id, interview_type
+        ON CONFLICT (user_id, interview_type) DO NOTHING
+        ''',
+    ]),
+    (6, "پاسخ‌های در انتظار تصمیم ادمین", [
+        '''
+        CREATE TABLE IF NOT EXISTS pending_submissions (
+            id TEXT PRIMARY KEY,
+            payload JSONB NOT NULL,
+            created_at BIGINT NOT NULL,
+            expires_at BIGINT NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS pending_submissions_expires_idx ON pending_submissions (expires_at)",
+    ]),
+    (7, "وزن سوالات آیین‌نامه برای نمونه‌گیری وزن‌دار", [
+        "ALTER TABLE regulation_questions ADD COLUMN IF NOT EXISTS weight REAL NOT NULL DEFAULT 1",
+    ]),
+    (8, "ذخیره پایدار وضعیت مکالمه‌ها", [
+        '''
+        CREATE TABLE IF NOT EXISTS bot_persistence (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data BYTEA NOT NULL,
+            PRIMARY KEY (kind, key)
+        )
+        ''',
+    ]),
+    (9, "ذخیره ساختاریافته پاسخ‌های مصاحبه", [
+        "ALTER TABLE interview_questions ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE",
+        "ALTER TABLE archive ALTER COLUMN full_text DROP NOT NULL",
+        "ALTER TABLE archive ADD COLUMN IF NOT EXISTS subcategory TEXT",
+        "ALTER TABLE archive ADD COLUMN IF NOT EXISTS user_username TEXT",
+        '''
+        CREATE TABLE IF NOT EXISTS interview_answers (
+            archive_id INTEGER NOT NULL REFERENCES archive (id) ON DELETE CASCADE,
+            position SMALLINT NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_text TEXT NOT NULL,
+            PRIMARY KEY (archive_id, position)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS interview_answers_question_idx ON interview_answers (question_id)",
+    ]),
+    (10, "جستجوی تمام‌متن بایگانی", [
+        # پیکربندی فارسی در PostgreSQL وجود ندارد؛ متن با این تابع یکسان‌سازی و با پیکربندی simple توکن می‌شود:
+        # حذف اعراب، تطویل و نیم‌فاصله، تبدیل ی/ک عربی و ارقام فارسی و عربی
+        '''
+        CREATE OR REPLACE FUNCTION persian_normalize(input TEXT) RETURNS TEXT
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT lower(translate(
+                regexp_replace(input, '[\\u064B-\\u065F\\u0670\\u0640\\u200C\\u200F]', '', 'g'),
+                'يكۀةأإآ۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩',
+                'یکههااا01234567890123456789'))
+        $$
+        ''',
+        "ALTER TABLE archive ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        ARCHIVE_SEARCH_VECTOR_SQL + " WHERE search_vector IS NULL",
+        "CREATE INDEX IF NOT EXISTS archive_search_idx ON archive USING gin (search_vector)",
+    ]),
+    (11, "زیرمجموعه‌های مصاحبه سیاسی", [
+        # فهرستی که قبلا در کد ثابت بود؛ از این پس ادمین با /addcategory و /delcategory آن را تغییر می‌دهد
+        '''
+        CREATE TABLE IF NOT EXISTS political_subcategories (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO political_subcategories (name, position) VALUES
+            ('جمهوری اسلامی', 1), ('پهلوی', 2), ('قاجار', 3), ('عهَد باستان', 4), ('ایران پس از اسلام', 5),
+            ('نازیسم', 6), ('کمونیسم', 7), ('لیبرالیسم', 8), ('یهودیت', 9), ('ووکیسم', 10), ('سرمایه داری', 11)
+        ON CONFLICT (name) DO NOTHING
+        ''',
+    ]),
+    (12, "آمار پاسخ‌های سوالات آیین‌نامه", [
+        # هر ردیف یک پاسخ؛ answer برای «نمی‌دانم» NULL است. فقط اضافه می‌شود و برای بازسازی آمار نگه داشته می‌شود
+        '''
+        CREATE TABLE IF NOT EXISTS regulation_attempts (
+            question_id INTEGER NOT NULL,
+            user_id BIGINT NOT NULL,
+            answer SMALLINT,
+            is_correct BOOLEAN NOT NULL,
+            answered_at BIGINT NOT NULL
+        )
+        ''',
+        # مجموع‌های هر سوال که همراه با درج پاسخ‌ها به‌روز می‌شوند تا گزارش‌ها جدول پاسخ‌ها را پیمایش نکنند
+        '''
+        CREATE TABLE IF NOT EXISTS regulation_question_stats (
+            question_id INTEGER PRIMARY KEY REFERENCES regulation_questions (id) ON DELETE CASCADE,
+            attempts INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            dont_know INTEGER NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS regulation_question_stats_rate_idx "
+        "ON regulation_question_stats ((correct::real / attempts), attempts DESC)",
+    ]),
+    (13, "وزن سوالات آیین‌نامه از آمار پاسخ‌ها", [
+        f"UPDATE regulation_questions SET weight = {REGULATION_WEIGHT_SQL} "
+        "FROM regulation_question_stats stats WHERE regulation_questions.id = stats.question_id",
+    ]),
+    (14, "حذف entityهای HTML از سند جستجوی مصاحبه‌های قدیمی", [
+        ARCHIVE_SEARCH_VECTOR_SQL + " WHERE full_text LIKE '%&%;%'",
+    ]),
+]
+
+# شناسه قفل مشورتی (advisory lock) که اجرای هم‌زمان مهاجرت‌ها توسط چند نمونه ربات را سریالی می‌کند
+MIGRATION_LOCK_ID = 7_201_301
+
+
+def setup_database():
+    """مهاجرت‌های اجرا نشده را به ترتیب نسخه روی دیتابیس PostgreSQL اعمال می‌کند."""
+    with db_pool.connection() as conn:
+        applied = apply_migrations(conn)
+    if applied:
+        logger.info(f"پایگاه داده PostgreSQL به نسخه {applied[-1]} ارتقا یافت.")
+    else:
+        logger.info("پایگاه داده PostgreSQL به‌روز است.")
+
+
+def apply_migrations(conn):
+    """همه مهاجرت‌ها را در یک تراکنش و زیر قفل مشورتی اجرا می‌کند و نسخه‌های اعمال شده را برمی‌گرداند."""
+    applied = []
+    try:
+        with conn.cursor() as cursor:
+            # قفل تا پایان تراکنش نگه داشته می‌شود؛ نمونه‌های دیگر منتظر می‌مانند و بعد نسخه جدید را می‌بینند
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at BIGINT NOT NULL
+                )
+            ''')
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            current_version = cursor.fetchone()[0]
+            for version, description, statements in MIGRATIONS:
+                if version <= current_version:
+                    continue
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, %s)",
+                               (version, description, int(time.time())))
+                logger.info(f"مهاجرت {version} ({description}) اعمال شد.")
+                applied.append(version)
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    return applied
+
+
+def _execute_query(query, params=(), fetchone=False, fetchall=False):
+    """یک کوئری را با اتصالی از استخر روی دیتابیس PostgreSQL اجرا می‌کند."""
+    try:
+        with db_pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    # تغییر placeholder از ? به %s برای psycopg2
+                    cursor.execute(query, params)
+                    result = None
+                    if fetchone:
+                        result = cursor.fetchone()
+                    if fetchall:
+                        result = cursor.fetchall()
+                conn.commit()
+                return result
+            except psycopg2.Error:
+                conn.rollback()
+                raise
+    except psycopg2.Error as e:
+        logger.error(f"خطای دیتابیس: {e}")
+        return None
+
+
+async def run_in_db_executor(name, func, *args):
+    """func را در executor دیتابیس اجرا و زمان انتظار برای نخ آزاد و زمان اجرای آن را با برچسب name ثبت می‌کند."""
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        metrics.observe('bot_db_executor_wait_seconds', started - submitted, query=name)
+        try:
+            return func(*args)
+        finally:
+            metrics.observe('bot_db_query_duration_seconds', time.perf_counter() - started, query=name)
+
+    return await asyncio.get_running_loop().run_in_executor(db_executor, timed)
+
+
+async def db_query(query, params=(), fetchone=False, fetchall=False, *, name):
+    """کوئری را در executor اختصاصی دیتابیس اجرا می‌کند تا حلقه رویداد asyncio مسدود نشود.
+
+    name برچسب متریک زمان کوئری است و هر تابع دیتابیس نام ثابت خودش را می‌دهد (معمولا نام همان تابع، مثلا
+    get_archived_users_from_db) تا برچسب‌ها با تغییر نام توابع عوض نشوند.
+    """
+    return await run_in_db_executor(name, functools.partial(
+        _execute_query, query, params, fetchone=fetchone, fetchall=fetchall))
+
+
+def _execute_transaction(work):
+    with db_pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                result = work(cursor)
+            conn.commit()
+            return result
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+
+
+async def db_transaction(work, *, name):
+    """تابع work(cursor) را در یک تراکنش و در executor دیتابیس اجرا می‌کند.
+
+    برخلاف db_query خطاهای دیتابیس به فراخوان برگردانده می‌شوند تا بتواند تصمیم بگیرد.
+    """
+    return await run_in_db_executor(name, _execute_transaction, work)
+
+
+def _stream_query(query, params, consume, itersize):
+    with db_pool.connection() as conn:
+        try:
+            # cursor نام‌دار سمت سرور است؛ ردیف‌ها دسته‌دسته خوانده می‌شوند و کل نتیجه در حافظه نمی‌ماند
+            with conn.cursor(name=f"stream_{threading.get_ident()}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+                count = 0
+                for row in cursor:
+                    consume(row)
+                    count += 1
+            conn.commit()
+            return count
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+
+
+async def db_stream(query, params, consume, itersize=500, *, name):
+    """نتیجه کوئری را با cursor سمت سرور ردیف به ردیف به consume(row) می‌دهد و تعداد ردیف‌ها را برمی‌گرداند.
+
+    consume در نخ executor دیتابیس اجرا می‌شود و نباید با حلقه asyncio کار کند.
+    """
+    return await run_in_db_executor(name, _stream_query, query, params, consume, itersize)
@@ -0,0 +1 @@
+"""هندلرهای تلگرام، هر ماژول برای یک بخش از منوی ربات."""
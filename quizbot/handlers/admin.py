@@ -0,0 +1,42 @@
+"""دستورات وضعیت ربات برای ادمین."""
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from .. import config, db, notifications
+from ..processing import PerUserUpdateProcessor
+from ..questions import question_cache
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    pool_stats = db.db_pool.stats()
+    text = (f"<b>📊 وضعیت استخر دیتابیس</b>\n"
+            f"در حال استفاده: {pool_stats['in_use']} از {pool_stats['max_size']}\n"
+            f"بیکار: {pool_stats['idle']}\n"
+            f"اتصال‌های باز: {pool_stats['opened']}\n"
+            f"تعداد دریافت اتصال: {pool_stats['acquired']}\n"
+            f"میانگین انتظار: {pool_stats['avg_wait_ms']:.1f} ms\n"
+            f"بیشترین انتظار: {pool_stats['max_wait_ms']:.1f} ms\n"
+            f"تایم‌اوت‌ها: {pool_stats['timeouts']}")
+    notify_stats = notifications.notifier.stats()
+    text += (f"\n\n<b>📨 صف اعلان‌های ادمین</b>\n"
+             f"در صف: {notify_stats['queued']} | در انتظار digest: {notify_stats['digest_pending']}\n"
+             f"ارسال شده: {notify_stats['sent']} | ناموفق: {notify_stats['failed']}")
+    cache_stats = question_cache.stats()
+    text += (f"\n\n<b>🗃️ کش سوالات</b>\n"
+             f"برخورد: {cache_stats['hits']} | عدم برخورد: {cache_stats['misses']} "
+             f"({cache_stats['hit_rate']:.1f}%)\n"
+             f"بخش‌های مصاحبه: {cache_stats['interview_keys']} | انواع آزمون: {cache_stats['regulation_keys']}")
+    processor = context.application.update_processor
+    if isinstance(processor, PerUserUpdateProcessor):
+        update_stats = processor.stats()
+        text += (f"\n\n<b>⚙️ پردازش همزمان آپدیت‌ها</b>\n"
+                 f"صف ورودی: {context.application.update_queue.qsize()}\n"
+                 f"در حال اجرا: {update_stats['in_flight']} از {update_stats['max_concurrent']}\n"
+                 f"منتظر نوبت کاربر: {update_stats['waiting']}\n"
+                 f"کاربران فعال: {update_stats['active_users']}\n"
+                 f"میانگین انتظار هر کاربر: {update_stats['avg_user_wait_ms']:.1f} ms\n"
+                 f"بیشترین انتظار هر کاربر: {update_stats['max_user_wait_ms']:.1f} ms")
+    await update.message.reply_text(text, parse_mode=ParseMode.HTML)
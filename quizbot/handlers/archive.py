@@ -0,0 +1,362 @@
+"""مرور، جستجو و خروجی گرفتن از بایگانی مصاحبه‌ها."""
+import csv
+import datetime
+import gzip
+import io
+import json
+import logging
+import tempfile
+import time
+
+import psycopg2
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from .. import config
+from ..archive import (build_archive_export_query, get_archived_user_from_db, get_archived_users_from_db,
+                       get_interview_answers_from_db, get_user_interviews_page_from_db, search_archive_from_db,
+                       search_archived_users_from_db)
+from ..db import db_stream
+from ..rendering import escape_html, render_interview_html
+from ..states import (ARCHIVE_PASSWORD_PROMPT, LISTING_ARCHIVED_USERS, SEARCHING_ARCHIVED_USERS, SELECTING_ACTION,
+                      SELECTING_ARCHIVE_CATEGORY, SHOWING_USER_INTERVIEWS)
+from .common import check_admin, edit_long_html
+
+logger = logging.getLogger(__name__)
+
+
+# --- بخش بایگانی ---
+async def archive_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text("🔑 لطفا رمز عبور بخش بایگانی را وارد کنید:")
+    return ARCHIVE_PASSWORD_PROMPT
+
+
+async def archive_password_check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    if update.message.text == config.ARCHIVE_PASSWORD:
+        await update.message.reply_text("رمز عبور صحیح است. به بخش بایگانی خوش آمدید.")
+        context.user_data['archived_user_meta'] = {}
+        return await list_archived_users(update, context)
+    else:
+        await update.message.reply_text("❌ رمز عبور اشتباه است. لطفا دوباره تلاش کنید یا /cancel را بزنید.")
+        return ARCHIVE_PASSWORD_PROMPT
+
+
+async def list_archived_users(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    page = 0
+    if update.callback_query:
+        await update.callback_query.answer()
+        message = update.callback_query.message
+        if update.callback_query.data.startswith('arcu_p_'):
+            page = int(update.callback_query.data.split('_')[-1])
+    else:
+        message = update.message
+
+    # یک ردیف اضافه نشان می‌دهد که صفحه بعدی وجود دارد یا نه
+    archived_users = await get_archived_users_from_db(offset=page * config.ARCHIVED_USERS_PAGE_SIZE,
+                                                      limit=config.ARCHIVED_USERS_PAGE_SIZE + 1)
+    if not archived_users and page == 0:
+        text = "بایگانی خالی است."
+        keyboard = [[InlineKeyboardButton("بازگشت به منوی اصلی ⬅️", callback_data='back_to_main')]]
+        await message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+        return SELECTING_ACTION
+
+    has_next = len(archived_users) > config.ARCHIVED_USERS_PAGE_SIZE
+    keyboard = [[InlineKeyboardButton(name, callback_data=f"view_user_{uid}")]
+                for uid, name in archived_users[:config.ARCHIVED_USERS_PAGE_SIZE]]
+    nav_row = []
+    if page > 0:
+        nav_row.append(InlineKeyboardButton("➡️ قبلی", callback_data=f"arcu_p_{page - 1}"))
+    if has_next:
+        nav_row.append(InlineKeyboardButton("بعدی ⬅️", callback_data=f"arcu_p_{page + 1}"))
+    if nav_row:
+        keyboard.append(nav_row)
+    keyboard.append([InlineKeyboardButton("🔍 جستجوی نام کاربر", callback_data='arcu_search')])
+    keyboard.append([InlineKeyboardButton("بازگشت به منوی اصلی ⬅️", callback_data='back_to_main')])
+
+    text_to_send = f"لطفا کاربری که می‌خواهید مصاحبه‌هایش را ببینید انتخاب کنید (صفحه {page + 1}):"
+    try:
+        await message.edit_text(text_to_send, reply_markup=InlineKeyboardMarkup(keyboard))
+    except:
+        await message.reply_text(text_to_send, reply_markup=InlineKeyboardMarkup(keyboard))
+    return LISTING_ARCHIVED_USERS
+
+
+async def prompt_archived_user_search(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text("🔍 بخشی از نام کاربر را ارسال کنید:", reply_markup=InlineKeyboardMarkup(
+        [[InlineKeyboardButton("بازگشت به لیست کاربران ⬅️", callback_data='back_to_user_list')]]))
+    return SEARCHING_ARCHIVED_USERS
+
+
+async def search_archived_users(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    term = update.message.text.strip()
+    matches = await search_archived_users_from_db(term) or []
+    keyboard = [[InlineKeyboardButton(name, callback_data=f"view_user_{uid}")] for uid, name in matches]
+    keyboard.append([InlineKeyboardButton("🔍 جستجوی دوباره", callback_data='arcu_search')])
+    keyboard.append([InlineKeyboardButton("بازگشت به لیست کاربران ⬅️", callback_data='back_to_user_list')])
+    if matches:
+        text = f"نتایج جستجو برای «{escape_html(term)}»:"
+    else:
+        text = f"کاربری با نام «{escape_html(term)}» پیدا نشد."
+    await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode=ParseMode.HTML)
+    return LISTING_ARCHIVED_USERS
+
+
+async def show_archive_user_options(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    user_id = query.data.split('view_user_')[1]
+    context.user_data['selected_user_id'] = user_id
+    keyboard = [
+        [InlineKeyboardButton("شخصی", callback_data='view_cat_شخصی'),
+         InlineKeyboardButton("سیاسی", callback_data='view_cat_سیاسی')],
+        [InlineKeyboardButton("شغلی", callback_data='view_cat_شغلی'),
+         InlineKeyboardButton("نمایش همه", callback_data='view_cat_all')],
+        [InlineKeyboardButton("📦 خروجی کامل (JSONL)", callback_data=f'arcx_{user_id}')],
+        [InlineKeyboardButton("بازگشت ⬅️", callback_data='back_to_user_list')]
+    ]
+    user_meta = await get_archived_user_meta(context, user_id)
+    if not user_meta:
+        text = f"کدام دسته از مصاحبه‌های کاربر «{escape_html('کاربر یافت نشد')}» را می‌خواهید مشاهده کنید؟"
+    else:
+        last_seen = time.strftime('%Y-%m-%d %H:%M', time.localtime(user_meta['last_seen']))
+        type_counts = "، ".join(f"{escape_html(t)}: {c}" for t, c in user_meta['type_counts'].items())
+        text = (f"کدام دسته از مصاحبه‌های کاربر «{escape_html(user_meta['name'])}» را می‌خواهید مشاهده کنید؟\n\n"
+                f"تعداد مصاحبه‌ها: {user_meta['interview_count']} ({type_counts})\n"
+                f"آخرین مصاحبه: {last_seen}")
+    await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode=ParseMode.HTML)
+    return SELECTING_ARCHIVE_CATEGORY
+
+
+async def get_archived_user_meta(context: ContextTypes.DEFAULT_TYPE, user_id, refresh=False):
+    """مشخصات کاربر بایگانی را یک بار در هر جلسه ادمین از دیتابیس می‌خواند و بعد از حافظه جلسه برمی‌گرداند.
+
+    با refresh=True مقدار ذخیره شده نادیده گرفته و دوباره از دیتابیس خوانده می‌شود.
+    """
+    cache = context.user_data.setdefault('archived_user_meta', {})
+    if refresh or user_id not in cache:
+        user_meta = await get_archived_user_from_db(user_id)
+        if user_meta is None:
+            return None
+        cache[user_id] = user_meta
+    return cache[user_id]
+
+
+async def show_user_interviews_by_category(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    category_to_view = query.data.split('view_cat_')[1]
+    user_id = context.user_data['selected_user_id']
+    context.user_data['archive_category'] = category_to_view
+    # تعداد کل از شمارنده‌های نگهداری شده در جدول خلاصه خوانده می‌شود، نه با شمارش ردیف‌های بایگانی؛
+    # با هر انتخاب دسته دوباره خوانده می‌شود تا مصاحبه‌هایی که پس از شروع جلسه بایگانی شده‌اند هم شمرده شوند
+    user_meta = (await get_archived_user_meta(context, user_id, refresh=True)
+                 or {'interview_count': 0, 'type_counts': {}})
+    if category_to_view == 'all':
+        context.user_data['archive_total'] = user_meta['interview_count']
+    else:
+        context.user_data['archive_total'] = user_meta['type_counts'].get(category_to_view, 0)
+    return await show_user_interviews_page(update, context, page=1)
+
+
+async def paginate_user_interviews(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    # قالب: arcp_<n|p>_<page>_<timestamp>_<id>
+    _, direction, page, cursor_ts, cursor_id = query.data.split('_')
+    return await show_user_interviews_page(update, context, page=int(page),
+                                           cursor=(int(cursor_ts), int(cursor_id)), older=direction == 'n')
+
+
+async def render_archived_interviews(rows):
+    """متن HTML ردیف‌های بایگانی را فقط هنگام نمایش و از پاسخ‌های ساختاریافته می‌سازد."""
+    answers = await get_interview_answers_from_db([row[0] for row in rows if row[1] is None])
+    rendered = []
+    for archive_id, full_text, _, user_id, user_name, user_username, interview_type, subcategory in rows:
+        if full_text is None:
+            full_text = render_interview_html(user_id, user_name, user_username, interview_type, subcategory,
+                                              answers.get(archive_id, []))
+        rendered.append(full_text)
+    return rendered
+
+
+async def show_user_interviews_page(update: Update, context: ContextTypes.DEFAULT_TYPE, page, cursor=None,
+                                    older=True) -> int:
+    query = update.callback_query
+    user_id = context.user_data['selected_user_id']
+    category_to_view = context.user_data['archive_category']
+    total = context.user_data.get('archive_total', 0)
+
+    # دکمه‌های پیمایش از خود ردیف‌ها تعیین می‌شوند نه از تعداد کل: یک ردیف اضافه در جهت پیمایش نشان می‌دهد که
+    # صفحه دیگری در همان جهت وجود دارد و در جهت مخالف همیشه صفحه‌ای که از آن آمده‌ایم هست
+    page_size = config.ARCHIVE_PAGE_SIZE
+    rows = await get_user_interviews_page_from_db(user_id, category_to_view, cursor, older, limit=page_size + 1)
+    if not older and len(rows) <= page_size:
+        # به جدیدترین مصاحبه‌ها رسیده‌ایم؛ صفحه اول کامل از ابتدا خوانده می‌شود تا نیمه‌پر نماند
+        page, cursor, older = 1, None, True
+        rows = await get_user_interviews_page_from_db(user_id, category_to_view, None, True, limit=page_size + 1)
+    if older:
+        has_older, has_newer = len(rows) > page_size, cursor is not None
+        rows = rows[:page_size]
+    else:
+        # در جهت «جدیدتر» ردیف‌ها از جدید به قدیم برمی‌گردند و ردیف اضافه جدیدترین آن‌هاست
+        has_older, has_newer = True, True
+        rows = rows[-page_size:]
+
+    keyboard = []
+    if not rows:
+        final_text = f"هیچ مصاحبه‌ای از نوع «{escape_html(category_to_view)}» برای این کاربر یافت نشد."
+    else:
+        # تعداد کل فقط برای نمایش است و ممکن است از مصاحبه‌های تازه‌تر عقب باشد
+        total = max(total, (page - 1) * page_size + len(rows))
+        total_pages = max(page + has_older, -(-total // page_size))
+        final_text = f"<b>📄 صفحه {page} از {total_pages}</b> ({total} مصاحبه)\n\n"
+        final_text += "\n\n====================\n\n".join(await render_archived_interviews(rows))
+        first_id, _, first_ts = rows[0][:3]
+        last_id, _, last_ts = rows[-1][:3]
+        nav_row = []
+        if has_newer:
+            nav_row.append(InlineKeyboardButton("➡️ جدیدتر",
+                                                callback_data=f"arcp_p_{max(1, page - 1)}_{first_ts}_{first_id}"))
+        if has_older:
+            nav_row.append(InlineKeyboardButton("قدیمی‌تر ⬅️", callback_data=f"arcp_n_{page + 1}_{last_ts}_{last_id}"))
+        if nav_row:
+            keyboard.append(nav_row)
+
+    keyboard += [[InlineKeyboardButton("بازگشت به انتخاب دسته‌بندی ⬅️", callback_data=f'view_user_{user_id}')],
+                 [InlineKeyboardButton("بازگشت به لیست کاربران ⬅️", callback_data='back_to_user_list')]]
+
+    await edit_long_html(query, context.bot, final_text, reply_markup=InlineKeyboardMarkup(keyboard))
+    return SHOWING_USER_INTERVIEWS
+
+
+ARCHIVE_EXPORT_FORMATS = ('jsonl', 'csv')
+ARCHIVE_EXPORT_CSV_FIELDS = ('id', 'timestamp', 'user_id', 'user_name', 'user_username', 'interview_type',
+                             'subcategory', 'full_text', 'answers')
+# سقف حجم فایلی که Bot API اجازه ارسال آن را می‌دهد
+TELEGRAM_UPLOAD_LIMIT = 50 * 1024 * 1024
+
+
+async def write_archive_export(output, export_format, user_id=None, interview_type=None):
+    """بایگانی را با cursor سمت سرور و ردیف به ردیف به صورت gzip در output می‌نویسد و تعداد ردیف‌ها را برمی‌گرداند.
+
+    حافظه مصرفی به اندازه بایگانی بستگی ندارد؛ فقط یک دسته از ردیف‌ها در هر لحظه در حافظه است.
+    """
+    query, params = build_archive_export_query(user_id, interview_type)
+    with gzip.GzipFile(fileobj=output, mode='wb') as compressed, \
+            io.TextIOWrapper(compressed, encoding='utf-8', newline='') as text_output:
+        if export_format == 'csv':
+            writer = csv.writer(text_output)
+            writer.writerow(ARCHIVE_EXPORT_CSV_FIELDS)
+
+            def write_row(row):
+                *fields, answers = row
+                writer.writerow((*fields, json.dumps(answers, ensure_ascii=False)))
+        else:
+            def write_row(row):
+                text_output.write(json.dumps(dict(zip(ARCHIVE_EXPORT_CSV_FIELDS, row)), ensure_ascii=False))
+                text_output.write("\n")
+
+        return await db_stream(query, params, write_row, name='write_archive_export')
+
+
+async def send_archive_export(context: ContextTypes.DEFAULT_TYPE, chat_id, export_format='jsonl', user_id=None,
+                              interview_type=None):
+    scope = str(user_id) if user_id is not None else 'all'
+    if interview_type:
+        scope += f"_{interview_type}"
+    await context.bot.send_message(chat_id=chat_id, text="⏳ در حال آماده‌سازی خروجی بایگانی...")
+    with tempfile.TemporaryFile() as output:
+        try:
+            count = await write_archive_export(output, export_format, user_id, interview_type)
+        except psycopg2.Error as e:
+            logger.error(f"خطا در تهیه خروجی بایگانی: {e}")
+            await context.bot.send_message(chat_id=chat_id, text="❌ خطای دیتابیس در تهیه خروجی بایگانی.")
+            return
+        if not count:
+            await context.bot.send_message(chat_id=chat_id, text="هیچ مصاحبه‌ای برای خروجی پیدا نشد.")
+            return
+        if output.tell() > TELEGRAM_UPLOAD_LIMIT:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text="❌ حجم فایل خروجی از سقف ۵۰ مگابایت تلگرام بیشتر است؛ خروجی را به یک کاربر یا یک نوع محدود کنید.")
+            return
+        output.seek(0)
+        filename = f"archive_{scope}_{datetime.date.today().isoformat()}.{export_format}.gz"
+        await context.bot.send_document(chat_id=chat_id, document=output, filename=filename,
+                                        caption=f"📦 {count} مصاحبه")
+
+
+async def export_archive_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    # آرگومان‌ها به هر ترتیبی: شناسه کاربر یا all، نوع مصاحبه، قالب (jsonl یا csv)
+    export_format, user_id, interview_type = 'jsonl', None, None
+    for arg in context.args:
+        if arg in ARCHIVE_EXPORT_FORMATS:
+            export_format = arg
+        elif arg.isdigit():
+            user_id = int(arg)
+        elif arg != 'all':
+            interview_type = arg
+    await send_archive_export(context, update.effective_chat.id, export_format, user_id, interview_type)
+
+
+async def export_archived_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return SELECTING_ACTION
+    await send_archive_export(context, update.effective_chat.id, user_id=int(query.data.split('arcx_')[1]))
+    return SELECTING_ARCHIVE_CATEGORY
+
+
+# --- جستجوی تمام‌متن بایگانی (ادمین) ---
+async def search_archive_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    terms = " ".join(context.args).strip()
+    if not terms:
+        await update.message.reply_text("استفاده: /search عبارت مورد نظر\nمثال: /search آزادی بیان -سانسور")
+        return
+    context.user_data['archive_search_terms'] = terms
+    text, reply_markup = await build_archive_search_page(terms, 0)
+    await update.message.reply_text(text, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+
+async def paginate_archive_search(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return
+    terms = context.user_data.get('archive_search_terms')
+    if not terms:
+        await query.edit_message_text("این جستجو منقضی شده است؛ دوباره /search را بزنید.")
+        return
+    text, reply_markup = await build_archive_search_page(terms, int(query.data.split('_')[-1]))
+    await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+
+async def build_archive_search_page(terms, offset):
+    # یک ردیف اضافه نشان می‌دهد که صفحه بعدی وجود دارد یا نه
+    rows = await search_archive_from_db(terms, offset=offset, limit=config.ARCHIVE_SEARCH_PAGE_SIZE + 1) or []
+    has_next = len(rows) > config.ARCHIVE_SEARCH_PAGE_SIZE
+    rows = rows[:config.ARCHIVE_SEARCH_PAGE_SIZE]
+    if not rows:
+        return f"نتیجه‌ای برای «{escape_html(terms)}» پیدا نشد.", None
+
+    page = offset // config.ARCHIVE_SEARCH_PAGE_SIZE + 1
+    text = f"🔎 <b>نتایج جستجو برای «{escape_html(terms)}»</b> (صفحه {page})\n"
+    for i, (_, user_id, user_name, interview_type, timestamp, headline) in enumerate(rows, start=offset + 1):
+        date = time.strftime('%Y-%m-%d', time.localtime(timestamp))
+        text += (f"\n<b>{i}. {escape_html(user_name)}</b> (<code>{user_id}</code>) - {escape_html(interview_type)} - {date}\n"
+                 f"{escape_html(headline)}\n")
+    nav_row = []
+    if offset > 0:
+        nav_row.append(InlineKeyboardButton("➡️ قبلی",
+                                            callback_data=f"srch_{max(0, offset - config.ARCHIVE_SEARCH_PAGE_SIZE)}"))
+    if has_next:
+        nav_row.append(InlineKeyboardButton("بعدی ⬅️", callback_data=f"srch_{offset + config.ARCHIVE_SEARCH_PAGE_SIZE}"))
+    return text, InlineKeyboardMarkup([nav_row]) if nav_row else None
@@ -0,0 +1,75 @@
+"""منوی اصلی، لغو، بررسی دسترسی ادمین و ارسال پیام‌های HTML بلند."""
+import logging
+
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes, ConversationHandler
+
+from .. import config
+from ..keyboards import menus
+from ..rendering import split_html_message
+from ..states import SELECTING_ACTION
+
+logger = logging.getLogger(__name__)
+
+
+async def send_long_html(bot, chat_id, text, reply_markup=None):
+    """متن HTML بلند را در چند پیام پشت سر هم می‌فرستد؛ دکمه‌ها به پیام آخر متصل می‌شوند."""
+    chunks = split_html_message(text)
+    for i, chunk in enumerate(chunks):
+        await bot.send_message(chat_id=chat_id, text=chunk, parse_mode=ParseMode.HTML,
+                               reply_markup=reply_markup if i == len(chunks) - 1 else None)
+
+
+async def edit_long_html(query, bot, text, reply_markup=None):
+    """پیام callback را با تکه اول ویرایش و بقیه متن را به صورت پیام‌های جدید ارسال می‌کند."""
+    first, *rest = split_html_message(text) or [text]
+    await query.edit_message_text(first, parse_mode=ParseMode.HTML, reply_markup=None if rest else reply_markup)
+    if rest:
+        await send_long_html(bot, query.message.chat_id, "".join(rest), reply_markup=reply_markup)
+
+
+# --- توابع عمومی و منوی اصلی ---
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    reply_markup = menus.main
+    text = 'سلام! به ربات مصاحبه خوش آمدید. لطفا انتخاب کنید:'
+
+    if context.user_data.get('new_menu_message', False):
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="منوی اصلی:", reply_markup=reply_markup)
+        context.user_data['new_menu_message'] = False
+    elif update.message:
+        await update.message.reply_text(text, reply_markup=reply_markup)
+    elif update.callback_query:
+        await update.callback_query.answer()
+        try:
+            await update.callback_query.edit_message_text('منوی اصلی:', reply_markup=reply_markup)
+        except Exception:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text='منوی اصلی:',
+                                           reply_markup=reply_markup)
+    return SELECTING_ACTION
+
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await update.message.reply_text('کاربر گرامی، پاسخ شما به سوالات برای مدیر ارسال خواهد شد.')
+
+
+async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    message = update.message or update.callback_query.message
+    await message.reply_text('عملیات لغو شد. برای شروع مجدد /start را بزنید.')
+    context.user_data.clear()
+    return ConversationHandler.END
+
+
+# --- توابع کمکی ادمین ---
+async def check_admin(update: Update) -> bool:
+    user_id = update.effective_user.id
+    if user_id != config.ADMIN_ID:
+        if update.callback_query: await update.callback_query.answer("🚫 شما دسترسی لازم برای این بخش را ندارید.",
+                                                                     show_alert=True)
+        return False
+    return True
+
+
+# --- مدیریت خطا ---
+async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+    logger.error(f"خطا در پردازش آپدیت: {context.error}", exc_info=context.error)
@@ -0,0 +1,517 @@
+"""مدیریت سوالات مصاحبه و آیین‌نامه توسط ادمین، شامل ورود و خروج گروهی."""
+import csv
+import io
+import json
+import logging
+import tempfile
+
+import psycopg2
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from .. import config
+from ..db import db_stream
+from ..keyboards import menus, political_subcategory_error
+from ..questions import (add_interview_question_to_db, add_political_subcategory_to_db, add_regulation_question_to_db,
+                         bulk_add_regulation_questions_to_db, delete_interview_question_from_db,
+                         delete_political_subcategory_from_db, question_cache)
+from ..rendering import escape_html
+from ..states import (ADDING_QUESTION_TEXT, ADDING_REGULATION_OPTION_1, ADDING_REGULATION_OPTION_2,
+                      ADDING_REGULATION_OPTION_3, ADDING_REGULATION_OPTION_4, ADDING_REGULATION_QUESTION_TEXT,
+                      ASK_ADD_ANOTHER, IMPORTING_REGULATION_QUESTIONS, LISTING_QUESTIONS_FOR_DELETE, SELECT_ADD_CAT,
+                      SELECT_ADD_POLITICAL_CAT, SELECT_DEL_CAT, SELECT_DEL_POLITICAL_CAT,
+                      SELECT_REGULATION_TYPE_FOR_ADD, SELECTING_ACTION, SELECTING_DESIGN_ACTION,
+                      SELECTING_REGULATION_CORRECT_ANSWER)
+from .common import check_admin, edit_long_html, send_long_html, start
+
+logger = logging.getLogger(__name__)
+
+
+# --- بخش مدیریت سوالات (ادمین) ---
+async def show_design_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return SELECTING_ACTION
+    await query.edit_message_text("بخش مدیریت سوالات:", reply_markup=menus.design)
+    return SELECTING_DESIGN_ACTION
+
+
+async def select_category_for_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await update.callback_query.edit_message_text("برای کدام بخش می‌خواهید سوال جدیدی طراحی کنید؟",
+                                                  reply_markup=menus.add_sections)
+    return SELECT_ADD_CAT
+
+
+async def select_political_category_for_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await menus.refresh_if_stale()
+    await update.callback_query.edit_message_text("برای کدام زیرمجموعه سیاسی سوال اضافه می‌کنید؟",
+                                                  reply_markup=menus.political_add)
+    return SELECT_ADD_POLITICAL_CAT
+
+
+async def prompt_for_new_question(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if query.data.startswith('add_cat_'):
+        category = query.data.split('_')[2]
+        if category in ["شخصی", "شغلی"]:
+            context.user_data.update({'design_category': category, 'design_subcategory': None})
+            prompt_text = f"لطفا متن کامل سوال جدید برای بخش «{category}» را ارسال کنید."
+            await query.edit_message_text(prompt_text)
+            return ADDING_QUESTION_TEXT
+        else:
+            return await select_political_category_for_add(update, context)
+    elif query.data.startswith('add_subcat_'):
+        subcategory = query.data.split('_', 2)[2]
+        context.user_data.update({'design_category': "سیاسی", 'design_subcategory': subcategory})
+        prompt_text = f"لطفا متن کامل سوال جدید برای بخش «سیاسی - {subcategory}» را ارسال کنید."
+        await query.edit_message_text(prompt_text)
+        return ADDING_QUESTION_TEXT
+
+
+async def add_question_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await add_interview_question_to_db(context.user_data['design_category'], context.user_data.get('design_subcategory'),
+                                 update.message.text)
+    await update.message.reply_text("✅ سوال شما با موفقیت اضافه شد!")
+    return await ask_add_another(update, context)
+
+
+async def ask_add_another(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await update.message.reply_text("آیا می‌خواهید سوال دیگری در همین بخش اضافه کنید؟",
+                                    reply_markup=menus.add_another)
+    return ASK_ADD_ANOTHER
+
+
+async def handle_add_another(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if query.data == 'add_another_yes':
+        category_name = context.user_data['design_category']
+        subcategory_name = context.user_data.get('design_subcategory')
+        prompt_text = f"لطفا متن سوال بعدی برای بخش «{category_name}{f' - {subcategory_name}' if subcategory_name else ''}» را ارسال کنید."
+        await query.edit_message_text(prompt_text)
+        return ADDING_QUESTION_TEXT
+    else:
+        await query.edit_message_text("عملیات طراحی سوال به پایان رسید.")
+        context.user_data.clear()
+        context.user_data['new_menu_message'] = True
+        return await start(update, context)
+
+
+async def select_category_for_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await update.callback_query.edit_message_text("از کدام بخش می‌خواهید سوالی را حذف کنید؟",
+                                                  reply_markup=menus.delete_sections)
+    return SELECT_DEL_CAT
+
+
+async def select_political_category_for_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    await menus.refresh_if_stale()
+    await update.callback_query.edit_message_text("از کدام زیرمجموعه سیاسی سوال حذف می‌کنید؟",
+                                                  reply_markup=menus.political_delete)
+    return SELECT_DEL_POLITICAL_CAT
+
+
+async def list_questions_for_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    category, subcategory = None, None
+    category_display_name = ""
+    if query.data.startswith('del_cat_'):
+        category = query.data.split('_')[2]
+        if category in ["شخصی", "شغلی"]:
+            category_display_name = category
+            context.user_data.update({'delete_category': category, 'delete_subcategory': None})
+        else:
+            return await select_political_category_for_delete(update, context)
+    elif query.data.startswith('del_subcat_'):
+        category = "سیاسی"
+        subcategory = query.data.split('_', 2)[2]
+        category_display_name = f"سیاسی - {subcategory}"
+        context.user_data.update({'delete_category': category, 'delete_subcategory': subcategory})
+
+    questions = list(await question_cache.interview_questions(category, subcategory))
+    context.user_data['questions_for_deletion'] = questions
+
+    if not questions:
+        await query.edit_message_text("در این بخش سوالی برای حذف وجود ندارد.", reply_markup=menus.back_to_delete)
+        return SELECT_DEL_CAT
+
+    question_list_text = f"لیست سوالات بخش «{escape_html(category_display_name)}»:\n\n"
+    for i, (q_id, q_text) in enumerate(questions):
+        question_list_text += f"{i + 1}. {escape_html(q_text)}\n"
+    # فهرست یک بخش پرسوال ممکن است از سقف طول یک پیام تلگرام بیشتر شود
+    await edit_long_html(query, context.bot,
+                         f"{question_list_text}\nلطفا شماره سوالی که می‌خواهید حذف شود را ارسال کنید.",
+                         reply_markup=menus.back_to_delete_sections)
+    return LISTING_QUESTIONS_FOR_DELETE
+
+
+async def delete_question_by_number(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    try:
+        index_to_delete = int(update.message.text) - 1
+        questions_for_deletion = context.user_data.get('questions_for_deletion', [])
+        if 0 <= index_to_delete < len(questions_for_deletion):
+            question_id_to_delete = questions_for_deletion[index_to_delete][0]
+            deleted_question_text = questions_for_deletion[index_to_delete][1]
+            await delete_interview_question_from_db(question_id_to_delete)
+            await update.message.reply_text(f"✅ سوال زیر با موفقیت حذف شد:\n'{deleted_question_text}'")
+
+            # Refresh the list
+            context.user_data['questions_for_deletion'].pop(index_to_delete)
+            questions = context.user_data['questions_for_deletion']
+            if not questions:
+                await update.message.reply_text("دیگر سوالی در این بخش وجود ندارد.")
+                return await select_category_for_delete(update, context)  # Or back to a higher menu
+
+            question_list_text = ""
+            for i, (q_id, q_text) in enumerate(questions):
+                question_list_text += f"{i + 1}. {escape_html(q_text)}\n"
+            await send_long_html(
+                context.bot, update.effective_chat.id,
+                f"{question_list_text}\nلطفا شماره سوال بعدی برای حذف را ارسال کنید یا /cancel را بزنید.")
+            return LISTING_QUESTIONS_FOR_DELETE
+
+        else:
+            await update.message.reply_text("❌ شماره نامعتبر است. لطفا دوباره تلاش کنید.")
+            return LISTING_QUESTIONS_FOR_DELETE
+    except (ValueError, IndexError):
+        await update.message.reply_text("❌ ورودی نامعتبر. لطفا فقط شماره سوال را ارسال کنید.")
+        return LISTING_QUESTIONS_FOR_DELETE
+
+
+# --- بخش جدید: جریان افزودن سوال آیین‌نامه ---
+async def select_regulation_type_for_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text("برای کدام آزمون آیین‌نامه سوال طراحی می‌کنید؟",
+                                  reply_markup=menus.regulation_add_types)
+    return SELECT_REGULATION_TYPE_FOR_ADD
+
+
+async def prompt_for_regulation_question_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    test_type = query.data.split('_')[-1]
+    context.user_data['new_regulation_question'] = {'test_type': test_type, 'options': []}
+    await query.edit_message_text(f"✍️ لطفاً متن کامل سوال برای آزمون «{test_type}» را ارسال کنید:")
+    return ADDING_REGULATION_QUESTION_TEXT
+
+
+async def get_regulation_question_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['new_regulation_question']['question'] = update.message.text
+    await update.message.reply_text("✅ سوال ثبت شد.\n\n1️⃣ لطفاً متن **گزینه اول** را ارسال کنید:")
+    return ADDING_REGULATION_OPTION_1
+
+
+async def get_regulation_option_1(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['new_regulation_question']['options'].append(update.message.text)
+    await update.message.reply_text("2️⃣ لطفاً متن **گزینه دوم** را ارسال کنید:")
+    return ADDING_REGULATION_OPTION_2
+
+
+async def get_regulation_option_2(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['new_regulation_question']['options'].append(update.message.text)
+    await update.message.reply_text("3️⃣ لطفاً متن **گزینه سوم** را ارسال کنید:")
+    return ADDING_REGULATION_OPTION_3
+
+
+async def get_regulation_option_3(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['new_regulation_question']['options'].append(update.message.text)
+    await update.message.reply_text("4️⃣ لطفاً متن **گزینه چهارم** را ارسال کنید:")
+    return ADDING_REGULATION_OPTION_4
+
+
+async def get_regulation_option_4(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['new_regulation_question']['options'].append(update.message.text)
+
+    question_data = context.user_data['new_regulation_question']
+    options_text = ""
+    keyboard_buttons = []
+    for i, option in enumerate(question_data['options']):
+        options_text += f"{i + 1}. {escape_html(option)}\n"
+        keyboard_buttons.append([InlineKeyboardButton(f"گزینه {i + 1}", callback_data=f"select_correct_ans_{i}")])
+
+    final_prompt = (
+        f"🔍 پیش‌نمایش سوال:\n\n"
+        f"<b>سوال:</b> {escape_html(question_data['question'])}\n"
+        f"<b>گزینه‌ها:</b>\n{options_text}\n"
+        f"❓ لطفاً **گزینه صحیح** را انتخاب کنید:"
+    )
+
+    await update.message.reply_text(
+        final_prompt,
+        reply_markup=InlineKeyboardMarkup(keyboard_buttons),
+        parse_mode=ParseMode.HTML
+    )
+    return SELECTING_REGULATION_CORRECT_ANSWER
+
+
+async def save_regulation_question(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+
+    correct_answer_index = int(query.data.split('_')[-1])
+    question_data = context.user_data['new_regulation_question']
+
+    await add_regulation_question_to_db(
+        test_type=question_data['test_type'],
+        question=question_data['question'],
+        options=question_data['options'],
+        answer=correct_answer_index
+    )
+
+    await query.edit_message_text("✅ سوال آیین‌نامه با موفقیت در پایگاه داده ذخیره شد!")
+
+    context.user_data.clear()
+    context.user_data['new_menu_message'] = True
+    return await start(update, context)
+
+
+# --- ورود و خروج گروهی سوالات آیین‌نامه ---
+REGULATION_TEST_TYPES = ('کلی', 'جزئی')
+REGULATION_CSV_FIELDS = ('test_type', 'question', 'option_1', 'option_2', 'option_3', 'option_4', 'answer')
+
+
+def iter_json_array(text_stream, chunk_size=64 * 1024):
+    """عناصر آرایه JSON را تکه به تکه از text_stream می‌خواند تا کل فایل یک‌جا در حافظه بارگذاری نشود."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = text_stream.read(chunk_size)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+    def peek():
+        # اولین کاراکتر غیر فاصله را بدون مصرف آن برمی‌گرداند؛ رشته خالی یعنی پایان فایل
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            fill()
+
+    if peek() != '[':
+        raise ValueError("ساختار اصلی فایل JSON باید آرایه‌ای از سوالات باشد.")
+    pos += 1
+    if peek() == ']':
+        pos += 1
+    else:
+        while True:
+            while True:
+                peek()
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # عددی که در انتهای تکه بریده شده (مثلا «1.» از «1.5») فقط وقتی کامل است که پس از آن جداکننده بیاید
+                if not eof and (end == len(buffer) or buffer[end] not in ' \t\n\r,]'):
+                    fill()
+                    continue
+                break
+            pos = end
+            yield item
+            separator = peek()
+            pos += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise ValueError("عناصر آرایه JSON باید با کاما از هم جدا شوند.")
+    if peek():
+        raise ValueError("پس از پایان آرایه JSON داده اضافی وجود دارد.")
+
+
+def iter_regulation_import_rows(stream, file_name):
+    """ردیف‌های فایل CSV، JSON Lines یا آرایه JSON را به صورت جریانی و به شکل (شماره ردیف، دیکشنری) برمی‌گرداند."""
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if file_name.endswith('.csv'):
+            # ردیف ۱ سرستون‌هاست
+            yield from enumerate(csv.DictReader(text_stream), start=2)
+        elif file_name.endswith('.json'):
+            yield from enumerate(iter_json_array(text_stream), start=1)
+        else:
+            for row_number, line in enumerate(text_stream, start=1):
+                if line.strip():
+                    try:
+                        yield row_number, json.loads(line)
+                    except ValueError:
+                        yield row_number, None
+    finally:
+        # بستن wrapper فایل زیرین را هم می‌بندد؛ فایل متعلق به فراخوان است
+        text_stream.detach()
+
+
+def validate_regulation_import_row(row):
+    """یک ردیف ورودی را بررسی و (test_type, question, options, answer) یا پیام خطا برمی‌گرداند."""
+    if not isinstance(row, dict):
+        return None, "ردیف JSON معتبر نیست."
+    test_type = str(row.get('test_type') or '').strip()
+    question = str(row.get('question') or '').strip()
+    options = row.get('options')
+    if options is None:
+        options = [row.get(f'option_{i}') for i in range(1, 5)]
+    options = [str(option or '').strip() for option in options] if isinstance(options, list) else []
+    if test_type not in REGULATION_TEST_TYPES:
+        return None, f"نوع آزمون «{test_type}» نامعتبر است (مجاز: {'، '.join(REGULATION_TEST_TYPES)})."
+    if not question:
+        return None, "متن سوال خالی است."
+    if len(options) != 4 or not all(options):
+        return None, "سوال باید دقیقا ۴ گزینه غیرخالی داشته باشد."
+    try:
+        answer = int(str(row.get('answer')).strip())
+    except ValueError:
+        return None, "شماره گزینه صحیح عدد نیست."
+    if not 1 <= answer <= 4:
+        return None, "شماره گزینه صحیح باید بین ۱ تا ۴ باشد."
+    return (test_type, question, options, answer - 1), None
+
+
+async def prompt_regulation_import(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text(
+        "📥 فایل سوالات آیین‌نامه را به صورت CSV، JSON Lines یا آرایه JSON ارسال کنید.\n\n"
+        f"ستون‌های CSV: {', '.join(REGULATION_CSV_FIELDS)}\n"
+        "نوع آزمون «کلی» یا «جزئی» و شماره گزینه صحیح بین ۱ تا ۴ است.\n"
+        "در JSON Lines می‌توانید به جای option_1..option_4 کلید options را با آرایه ۴ گزینه بفرستید.\n\n"
+        "برای انصراف /cancel را بزنید.")
+    return IMPORTING_REGULATION_QUESTIONS
+
+
+async def import_regulation_questions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    document = update.message.document
+    file_name = (document.file_name or '').lower()
+    if not file_name.endswith(('.csv', '.jsonl', '.json')):
+        await update.message.reply_text("❌ فقط فایل‌های .csv، .jsonl یا .json پذیرفته می‌شوند.")
+        return IMPORTING_REGULATION_QUESTIONS
+
+    valid, errors, seen = [], [], set()
+    # فایل در یک فایل موقت روی دیسک دریافت و از همان‌جا ردیف به ردیف خوانده می‌شود تا کل آن در حافظه نماند
+    with tempfile.TemporaryFile() as downloaded:
+        await (await document.get_file()).download_to_memory(downloaded)
+        downloaded.seek(0)
+        try:
+            for row_number, row in iter_regulation_import_rows(downloaded, file_name):
+                question, error = validate_regulation_import_row(row)
+                if question and question[1] in seen:
+                    question, error = None, "این سوال در همین فایل تکرار شده است."
+                if error:
+                    errors.append((row_number, error))
+                else:
+                    seen.add(question[1])
+                    valid.append(question)
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            await update.message.reply_text(f"❌ فایل قابل خواندن نیست: {escape_html(str(e))}",
+                                            parse_mode=ParseMode.HTML)
+            return IMPORTING_REGULATION_QUESTIONS
+
+    inserted = set()
+    if valid:
+        try:
+            inserted = await bulk_add_regulation_questions_to_db(valid)
+        except psycopg2.Error as e:
+            logger.error(f"خطای دیتابیس در ورود گروهی سوالات: {e}")
+            await update.message.reply_text("❌ خطای دیتابیس؛ هیچ سوالی ذخیره نشد.")
+            return IMPORTING_REGULATION_QUESTIONS
+
+    report = (f"📥 <b>نتیجه ورود گروهی</b>\n"
+              f"✅ اضافه شده: {len(inserted)}\n"
+              f"↩️ تکراری (از قبل در بانک): {len(valid) - len(inserted)}\n"
+              f"❌ ردیف‌های نامعتبر: {len(errors)}")
+    if errors:
+        report += "\n\n" + "\n".join(f"ردیف {n}: {escape_html(e)}" for n, e in errors[:20])
+        if len(errors) > 20:
+            report += f"\n... و {len(errors) - 20} خطای دیگر (گزارش کامل پیوست شده است)."
+    await update.message.reply_text(report, parse_mode=ParseMode.HTML)
+    if len(errors) > 20:
+        error_report = io.StringIO()
+        writer = csv.writer(error_report)
+        writer.writerow(('row', 'error'))
+        writer.writerows(errors)
+        await update.message.reply_document(io.BytesIO(error_report.getvalue().encode('utf-8-sig')),
+                                            filename='import_errors.csv')
+
+    context.user_data.clear()
+    context.user_data['new_menu_message'] = True
+    return await start(update, context)
+
+
+async def export_regulation_questions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return SELECTING_ACTION
+
+    with tempfile.TemporaryFile() as output:
+        text_output = io.TextIOWrapper(output, encoding='utf-8-sig', newline='')
+        writer = csv.writer(text_output)
+        writer.writerow(REGULATION_CSV_FIELDS)
+
+        def write_row(row):
+            test_type, question, options, answer = row
+            writer.writerow((test_type, question, *options, answer + 1))
+
+        count = await db_stream("SELECT test_type, question, options, answer FROM regulation_questions ORDER BY id",
+                                (), write_row, name='export_regulation_questions')
+        # بدون detach، wrapper هنگام پاک شدن فایل موقت را که قبلا بسته شده دوباره می‌بندد
+        text_output.detach()
+        output.seek(0)
+        await context.bot.send_document(chat_id=update.effective_chat.id, document=output,
+                                        filename='regulation_questions.csv',
+                                        caption=f"📤 {count} سوال آیین‌نامه")
+    return SELECTING_DESIGN_ACTION
+
+
+# --- مدیریت زیرمجموعه‌های مصاحبه سیاسی (ادمین) ---
+def political_subcategories_text():
+    lines = [f"{i}. {escape_html(name)}" for i, name in enumerate(menus.political_subcategories, start=1)]
+    return "<b>🏛 زیرمجموعه‌های مصاحبه سیاسی</b>\n" + ("\n".join(lines) or "هیچ زیرمجموعه‌ای تعریف نشده است.")
+
+
+async def list_political_subcategories_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    await menus.refresh_if_stale()
+    await update.message.reply_text(
+        f"{political_subcategories_text()}\n\nافزودن: /addcategory نام\nحذف: /delcategory نام",
+        parse_mode=ParseMode.HTML)
+
+
+async def add_political_subcategory_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    name = " ".join(context.args).strip()
+    if not name:
+        await update.message.reply_text("استفاده: /addcategory نام زیرمجموعه\nمثال: /addcategory مشروطه")
+        return
+    error = political_subcategory_error(name)
+    if error:
+        await update.message.reply_text(f"❌ {error}")
+        return
+    if not await add_political_subcategory_to_db(name):
+        await update.message.reply_text(f"❌ زیرمجموعه «{name}» اضافه نشد؛ از قبل وجود دارد یا خطای دیتابیس رخ داد.")
+        return
+    await menus.load()
+    await update.message.reply_text(f"✅ زیرمجموعه «{escape_html(name)}» اضافه شد.\n\n{political_subcategories_text()}",
+                                    parse_mode=ParseMode.HTML)
+
+
+async def delete_political_subcategory_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    name = " ".join(context.args).strip()
+    if not name:
+        await update.message.reply_text("استفاده: /delcategory نام زیرمجموعه")
+        return
+    if not await delete_political_subcategory_from_db(name):
+        await update.message.reply_text(f"❌ زیرمجموعه «{name}» پیدا نشد.")
+        return
+    await menus.load()
+    await update.message.reply_text(
+        f"✅ زیرمجموعه «{escape_html(name)}» از منوها حذف شد؛ سوالات آن در دیتابیس باقی می‌مانند.\n\n"
+        f"{political_subcategories_text()}", parse_mode=ParseMode.HTML)
@@ -0,0 +1,141 @@
+"""انجام مصاحبه توسط کاربر و تصمیم ادمین درباره بایگانی پاسخ‌ها."""
+import time
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from .. import config, notifications
+from ..archive import (add_pending_submission_to_db, archive_pending_submission_in_db,
+                       delete_pending_submission_from_db)
+from ..keyboards import menus
+from ..questions import question_cache
+from ..rendering import TELEGRAM_MESSAGE_LIMIT, render_interview_html, utf16_len
+from ..states import ANSWERING_QUESTIONS, CONFIRM_SUBMISSION, SELECTING_INTERVIEW, SELECTING_POLITICAL_CATEGORY
+from .common import check_admin, start
+
+
+# --- بخش مصاحبه کاربر ---
+async def show_interview_options(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    reply_markup = menus.interview
+    await query.edit_message_text(text="لطفا نوع مصاحبه را انتخاب کنید:", reply_markup=reply_markup)
+    return SELECTING_INTERVIEW
+
+
+async def show_political_categories(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await menus.refresh_if_stale()
+    reply_markup = menus.political_interview
+    await query.edit_message_text(text="لطفا یکی از موضوعات مصاحبه سیاسی را انتخاب کنید:", reply_markup=reply_markup)
+    return SELECTING_POLITICAL_CATEGORY
+
+
+async def start_questions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    category_data = query.data
+    questions_from_db = []
+    category, subcategory = None, None
+    if category_data in ['personal', 'job']:
+        category = "شخصی" if category_data == 'personal' else "شغلی"
+        questions_from_db = await question_cache.interview_questions(category)
+        context.user_data.update({'category': category, 'subcategory': None})
+    elif category_data.startswith('political_'):
+        category = "سیاسی"
+        subcategory = category_data.split('_', 1)[1]
+        questions_from_db = await question_cache.interview_questions(category, subcategory)
+        context.user_data.update({'category': category, 'subcategory': subcategory})
+    if not questions_from_db:
+        await query.edit_message_text("در این بخش سوالی وجود ندارد.", reply_markup=menus.back_to_interview)
+        return SELECTING_POLITICAL_CATEGORY
+    context.user_data['questions'] = [{"id": q_id, "text": q_text} for q_id, q_text in questions_from_db]
+    context.user_data.update({'current_question_index': 0, 'answers': []})
+    await query.edit_message_text(text=f"سوال ۱:\n\n{context.user_data['questions'][0]['text']}")
+    return ANSWERING_QUESTIONS
+
+
+async def handle_answer(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    context.user_data['answers'].append(update.message.text)
+    current_index = context.user_data.get('current_question_index', 0) + 1
+    context.user_data['current_question_index'] = current_index
+    questions = context.user_data['questions']
+    if current_index < len(questions):
+        await update.message.reply_text(f"سوال {current_index + 1}:\n\n{questions[current_index]['text']}")
+        return ANSWERING_QUESTIONS
+    else:
+        await update.message.reply_text("✅ سوالات تمام شد. آیا پاسخ‌ها برای مدیر ارسال شود؟",
+                                        reply_markup=menus.confirm_submission)
+        return CONFIRM_SUBMISSION
+
+
+async def confirm_submission(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    if query.data == 'confirm_yes':
+        user = query.from_user
+        user_name = f"{user.first_name} {user.last_name or ''}".strip()
+        questions = context.user_data['questions']
+        answers = context.user_data['answers']
+        final_text = render_interview_html(user.id, user_name, user.username, context.user_data['category'],
+                                           context.user_data.get('subcategory'),
+                                           [(q_data['text'], answer) for q_data, answer in zip(questions, answers)])
+
+        unique_id = f"{user.id}_{int(time.time())}"
+        await add_pending_submission_to_db(unique_id, {
+            'user_info': {'id': user.id, 'name': user_name, 'username': user.username},
+            'interview_type': context.user_data['category'],
+            'subcategory': context.user_data.get('subcategory'),
+            'answers': [[q_data['id'], answer] for q_data, answer in zip(questions, answers)],
+        })
+
+        keyboard = [[
+            InlineKeyboardButton("➕ افزودن به بایگانی", callback_data=f"archive_add_{unique_id}"),
+            InlineKeyboardButton("❌ نادیده گرفتن", callback_data=f"archive_ignore_{unique_id}")
+        ]]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text("✅ پاسخ‌های شما با موفقیت برای مدیر ارسال شد.")
+        notifications.notifier.enqueue(config.ADMIN_ID, final_text, reply_markup=reply_markup)
+    else:
+        await query.edit_message_text("ارسال پاسخ‌ها لغو شد.")
+    context.user_data.clear()
+    context.user_data['new_menu_message'] = True
+    return await start(update, context)
+
+
+# --- توابع مدیریت بایگانی ---
+async def add_to_archive_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return
+
+    unique_id = query.data.split('archive_add_')[1]
+    archive_id = await archive_pending_submission_in_db(unique_id)
+    if archive_id is None:
+        # تراکنش برگشت خورده و مورد در انتظار باقی مانده است؛ دکمه‌ها می‌مانند تا ادمین دوباره تلاش کند
+        await query.message.reply_text("❌ خطا در ذخیره بایگانی؛ این مورد بایگانی نشد. لطفا دوباره تلاش کنید.")
+    elif archive_id:
+        await append_admin_decision(query, "<b>✅ با موفقیت به بایگانی اضافه شد.</b>")
+    else:
+        await append_admin_decision(query, "<b>⚠️ خطا: این مورد قبلا بایگانی شده یا منقضی شده است.</b>")
+
+
+async def ignore_archive_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    query = update.callback_query
+    await query.answer()
+    if not await check_admin(update): return
+    unique_id = query.data.split('archive_ignore_')[1]
+    await delete_pending_submission_from_db(unique_id)
+    await append_admin_decision(query, "--- 🚮 نادیده گرفته شد ---")
+
+
+async def append_admin_decision(query, status):
+    """نتیجه تصمیم ادمین را به پیام اعلان اضافه می‌کند؛ اگر جا نشود دکمه‌ها حذف و نتیجه جداگانه ارسال می‌شود."""
+    text = f"{query.message.text_html}\n\n{status}"
+    if utf16_len(text) <= TELEGRAM_MESSAGE_LIMIT:
+        await query.edit_message_text(text, parse_mode=ParseMode.HTML)
+    else:
+        await query.edit_message_reply_markup(reply_markup=None)
+        await query.message.reply_text(status, parse_mode=ParseMode.HTML)
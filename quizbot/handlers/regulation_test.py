@@ -0,0 +1,213 @@
+"""برگزاری آزمون آیین‌نامه انجمن."""
+import time
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from .. import config, notifications
+from ..keyboards import menus
+from ..questions import (RegulationTestSession, clear_user_attempt_in_db, get_hardest_regulation_questions_from_db,
+                         get_user_attempt_from_db, question_cache, record_regulation_attempts_in_db,
+                         set_user_attempt_in_db)
+from ..rendering import escape_html
+from ..states import REGULATIONS_TEST_ANSWERING, SELECTING_ACTION, SELECTING_REGULATIONS_TEST_TYPE
+from .common import edit_long_html, send_long_html, start
+
+
+# --- بخش آزمون آیین‌نامه انجمن ---
+async def show_regulations_test_options(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text("لطفا نوع آزمون آیین‌نامه را انتخاب کنید:",
+                                  reply_markup=menus.regulation_test_types)
+    return SELECTING_REGULATIONS_TEST_TYPE
+
+
+def get_regulation_test_size(test_type, bank_size):
+    size = int(config.REGULATION_TEST_SIZES.get(test_type, config.REGULATION_TEST_SIZE_DEFAULT))
+    return min(size, bank_size) if size > 0 else bank_size
+
+
+async def regulations_test_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    user_id = str(query.from_user.id)
+    test_type = query.data.split('_')[-1]
+
+    last_attempt = await get_user_attempt_from_db(user_id, test_type)
+    if last_attempt and time.time() - last_attempt < 24 * 60 * 60:
+        remaining_time = 24 * 60 * 60 - (time.time() - last_attempt)
+        hours, rem = divmod(remaining_time, 3600)
+        minutes, _ = divmod(rem, 60)
+        await query.edit_message_text(
+            f"شما در آزمون قبلی «{escape_html(test_type)}» قبول نشده‌اید.\n"
+            f"⏳ لطفا پس از **{int(hours)} ساعت و {int(minutes)} دقیقه** دیگر دوباره تلاش کنید.",
+            parse_mode=ParseMode.HTML
+        )
+        context.user_data.clear()
+        context.user_data['new_menu_message'] = True
+        return await start(update, context)
+
+    bank = await question_cache.regulation_bank(test_type)
+    # بانک خالی یا نمونه وزن‌دار خالی (همه وزن‌ها صفر یا منفی) هر دو آزمون بدون سوال می‌سازند
+    question_ids = bank.sample(get_regulation_test_size(test_type, len(bank)),
+                               weighted=config.REGULATION_SAMPLING == 'weighted')
+    if not question_ids:
+        await query.edit_message_text(f"در حال حاضر سوالی برای آزمون «{escape_html(test_type)}» وجود ندارد.",
+                                      parse_mode=ParseMode.HTML)
+        return SELECTING_ACTION
+
+    context.user_data['regulation_session'] = RegulationTestSession(test_type, question_ids)
+    return await ask_regulations_test_question(update, context)
+
+
+# نحوه اعلام پاسخ صحیح برای پاسخ‌های غلط در هر نوع آزمون:
+# immediate: پیام جداگانه بلافاصله پس از پاسخ (دو درخواست به تلگرام برای هر سوال)
+# inline: اعلام در بالای پیام ویرایش شده سوال بعدی یا نتیجه نهایی
+# summary: اعلام همه پاسخ‌های غلط در پیام نتیجه نهایی
+REGULATION_FEEDBACK_MODES = ('immediate', 'inline', 'summary')
+
+
+def get_regulation_feedback_mode(test_type):
+    mode = config.REGULATION_FEEDBACK_BY_TYPE.get(test_type, config.REGULATION_FEEDBACK_DEFAULT)
+    return mode if mode in REGULATION_FEEDBACK_MODES else 'inline'
+
+
+def wrong_answer_feedback_text(question):
+    correct_answer_text = escape_html(question.options[question.answer])
+    return f"❌ پاسخ شما اشتباه بود.\n<b>پاسخ صحیح:</b> {correct_answer_text}"
+
+
+async def ask_regulations_test_question(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    session = context.user_data['regulation_session']
+    question = await question_cache.regulation_question(session.test_type, session.current_question_id)
+    options = list(question.options) + ["نمی‌دانم"]
+    keyboard = [[InlineKeyboardButton(option, callback_data=f"rt_answer_{i}")] for i, option in enumerate(options)]
+    question_text = (f"<b>سوال {session.index + 1} از {session.total} "
+                     f"(آزمون {escape_html(session.test_type)}):</b>\n\n"
+                     f"{escape_html(question.question)}")
+    feedback = context.user_data.pop('pending_feedback', None)
+    if feedback:
+        question_text = f"{feedback}\n\n{question_text}"
+    await update.callback_query.edit_message_text(question_text, reply_markup=InlineKeyboardMarkup(keyboard),
+                                                  parse_mode=ParseMode.HTML)
+    return REGULATIONS_TEST_ANSWERING
+
+
+async def handle_regulations_test_answer(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    selected_option_index = int(query.data.split('_')[-1])
+    session = context.user_data['regulation_session']
+    question = await question_cache.regulation_question(session.test_type, session.current_question_id)
+    is_correct = selected_option_index == question.answer
+    session.record_answer(selected_option_index, is_correct)
+
+    if not is_correct:
+        feedback_mode = get_regulation_feedback_mode(session.test_type)
+        if feedback_mode == 'immediate':
+            await context.bot.send_message(chat_id=query.from_user.id, text=wrong_answer_feedback_text(question),
+                                           parse_mode=ParseMode.HTML)
+        elif feedback_mode == 'inline':
+            # به جای یک sendMessage جداگانه، در ویرایش بعدی همین پیام نمایش داده می‌شود
+            context.user_data['pending_feedback'] = wrong_answer_feedback_text(question)
+
+    if not session.finished:
+        return await ask_regulations_test_question(update, context)
+    else:
+        return await finish_regulations_test(update, context)
+
+
+async def finish_regulations_test(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    user = update.effective_user
+    session = context.user_data['regulation_session']
+    test_type, total_questions, correct, incorrect = (
+        session.test_type, session.total, session.correct, session.incorrect
+    )
+
+    negative_points = incorrect // 3
+    final_score = max(0, ((correct - negative_points) / total_questions) * 100)
+    passed = final_score >= 90
+
+    result_text = f"--- 🏁 <b>نتیجه آزمون آیین‌نامه {escape_html(test_type)}</b> 🏁 ---\n\n" \
+                  f"تعداد کل سوالات: {total_questions}\n" \
+                  f"✅ پاسخ‌های صحیح: {correct}\n" \
+                  f"❌ پاسخ‌های غلط/نمی‌دانم: {incorrect}\n" \
+                  f"📉 نمره منفی کسر شده (معادل): {negative_points} پاسخ صحیح\n" \
+                  f"💯 <b>نمره نهایی شما: {final_score:.2f}%</b>\n\n"
+
+    if passed:
+        result_text += "🎉 تبریک! شما در آزمون قبول شدید. 🎉"
+        await clear_user_attempt_in_db(user.id, test_type)
+    else:
+        result_text += "😔 متاسفانه شما در آزمون قبول نشدید. 😔\nشما تا ۲۴ ساعت آینده نمی‌توانید در این آزمون شرکت کنید."
+        await set_user_attempt_in_db(user.id, test_type)
+
+    responses = [(await question_cache.regulation_question(test_type, question_id), answer)
+                 for question_id, answer in zip(session.question_ids, session.answers)]
+    await record_regulation_attempts_in_db(user.id, responses)
+
+    user_result_text = result_text
+    feedback = context.user_data.pop('pending_feedback', None)
+    if feedback:
+        user_result_text = f"{feedback}\n\n{user_result_text}"
+    if get_regulation_feedback_mode(test_type) == 'summary':
+        wrong_answers = [(i, question) for i, (question, answer) in enumerate(responses) if answer != question.answer]
+        if wrong_answers:
+            user_result_text += "\n\n--- <b>پاسخ صحیح سوالاتی که اشتباه پاسخ دادید</b> ---\n"
+            for i, question in wrong_answers:
+                user_result_text += f"\n<b>{i + 1}. {escape_html(question.question)}</b>\n" \
+                                    f"   - پاسخ صحیح: {escape_html(question.options[question.answer])}\n"
+    await edit_long_html(update.callback_query, context.bot, user_result_text)
+
+    user_first_name = escape_html(user.first_name)
+    user_username = escape_html(user.username or 'N/A')
+    admin_report = f"--- <b>نتیجه آزمون کاربر: {user_first_name} (@{user_username})</b> ---\n"
+    admin_report += f"<b>شناسه کاربر:</b> <code>{user.id}</code>\n" + result_text + "\n\n--- <b>جزئیات پاسخ‌ها</b> ---\n"
+    for i, (question, answer) in enumerate(responses):
+        user_ans = question.options[answer] if answer < len(question.options) else "نمی‌دانم"
+        correct_ans = question.options[question.answer]
+        admin_report += f"\n<b>{i + 1}. {escape_html(question.question)}</b>\n" \
+                        f"   - پاسخ کاربر: {escape_html(user_ans)}\n" \
+                        f"   - پاسخ صحیح: {escape_html(correct_ans)} {'✅' if user_ans == correct_ans else '❌'}\n"
+    notifications.notifier.enqueue(config.ADMIN_ID, admin_report, digest=True)
+
+    context.user_data.clear()
+    context.user_data['new_menu_message'] = True
+    return await start(update, context)
+
+
+# --- سخت‌ترین سوالات آیین‌نامه (ادمین) ---
+HARDEST_QUESTIONS_DEFAULT = 10
+HARDEST_QUESTIONS_MAX = 50
+
+
+async def hardest_questions_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user.id != config.ADMIN_ID:
+        return
+    limit, test_type = HARDEST_QUESTIONS_DEFAULT, None
+    for arg in context.args:
+        if arg.isdigit():
+            limit = max(1, min(int(arg), HARDEST_QUESTIONS_MAX))
+        elif arg in ('کلی', 'جزئی'):
+            test_type = arg
+        else:
+            await update.message.reply_text("استفاده: /hardest [تعداد] [کلی|جزئی]\nمثال: /hardest 20 جزئی")
+            return
+    min_attempts = config.REGULATION_STATS_MIN_ATTEMPTS
+    rows = await get_hardest_regulation_questions_from_db(limit, min_attempts, test_type)
+    if rows is None:
+        await update.message.reply_text("❌ خطا در خواندن آمار سوالات.")
+        return
+    if not rows:
+        await update.message.reply_text(f"هنوز سوالی با حداقل {min_attempts} پاسخ ثبت نشده است.")
+        return
+
+    title = f"آزمون {escape_html(test_type)}" if test_type else "همه آزمون‌ها"
+    text = f"<b>📉 سخت‌ترین سوالات آیین‌نامه ({title})</b>\n<i>حداقل {min_attempts} پاسخ برای هر سوال</i>\n"
+    for i, (q_id, q_type, question, attempts, correct, dont_know) in enumerate(rows, start=1):
+        text += (f"\n<b>{i}. {escape_html(question)}</b>\n"
+                 f"   {escape_html(q_type)} | شناسه {q_id} | {attempts} پاسخ | "
+                 f"✅ {correct / attempts:.0%} | 🤷 نمی‌دانم {dont_know / attempts:.0%}\n")
+    await send_long_html(context.bot, update.effective_chat.id, text)
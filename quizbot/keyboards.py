@@ -0,0 +1,128 @@
+"""کیبوردهای منوهای ربات که یک بار ساخته و بین همه آپدیت‌ها به اشتراک گذاشته می‌شوند."""
+import logging
+import time
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from . import config
+from .questions import get_political_subcategories_from_db
+
+logger = logging.getLogger(__name__)
+
+# سقف طول callback_data در Bot API به بایت
+CALLBACK_DATA_LIMIT = 64
+# پیشوند callback_data دکمه‌های زیرمجموعه سیاسی در منوی مصاحبه، افزودن سوال و حذف سوال
+POLITICAL_CALLBACK_PREFIXES = ('political_', 'add_subcat_', 'del_subcat_')
+
+
+def _back(callback_data, text="بازگشت ⬅️"):
+    return InlineKeyboardMarkup([[InlineKeyboardButton(text, callback_data=callback_data)]])
+
+
+def _interview_sections(prefix):
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("👤 شخصی", callback_data=f'{prefix}شخصی')],
+        [InlineKeyboardButton("🏛 سیاسی", callback_data=f'{prefix}سیاسی')],
+        [InlineKeyboardButton("💼 شغلی", callback_data=f'{prefix}شغلی')],
+        [InlineKeyboardButton("بازگشت ⬅️", callback_data='back_to_design_menu')],
+    ])
+
+
+def _regulation_types(prefix, back_data):
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("آیین‌نامه کلی", callback_data=f'{prefix}کلی')],
+        [InlineKeyboardButton("آیین‌نامه جزئی", callback_data=f'{prefix}جزئی')],
+        [InlineKeyboardButton("بازگشت ⬅️", callback_data=back_data)]
+    ])
+
+
+def _political_categories(subcategories, prefix, back_data):
+    keyboard = [[InlineKeyboardButton(cat, callback_data=f"{prefix}{cat}")] for cat in subcategories]
+    keyboard.append([InlineKeyboardButton("بازگشت ⬅️", callback_data=back_data)])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def political_subcategory_error(name):
+    """اگر name به عنوان زیرمجموعه سیاسی قابل استفاده نباشد متن خطا و در غیر این صورت None برمی‌گرداند."""
+    if not name:
+        return "نام زیرمجموعه خالی است."
+    longest = max(len(prefix.encode('utf-8')) for prefix in POLITICAL_CALLBACK_PREFIXES)
+    if longest + len(name.encode('utf-8')) > CALLBACK_DATA_LIMIT:
+        return f"نام زیرمجموعه طولانی است؛ حداکثر {CALLBACK_DATA_LIMIT - longest} بایت (حدود نصف آن حرف فارسی) مجاز است."
+    return None
+
+
+class MenuRegistry:
+    """منوهای ثابت هنگام ساخت و منوهای زیرمجموعه سیاسی هنگام load() ساخته می‌شوند.
+
+    InlineKeyboardMarkup در python-telegram-bot تغییرناپذیر است، پس هندلرها همین نمونه‌ها را مستقیما به تلگرام
+    می‌فرستند. زیرمجموعه‌های سیاسی از جدول political_subcategories خوانده می‌شوند؛ منوهای آن هنگام شروع ربات و
+    پس از تغییر زیرمجموعه‌ها توسط ادمین ساخته می‌شوند و refresh_if_stale آن‌ها را پس از QUESTION_CACHE_TTL ثانیه
+    دوباره می‌خواند تا تغییری که در نمونه دیگری از ربات انجام شده هم دیده شود.
+    """
+
+    def __init__(self, ttl=None):
+        # None یعنی QUESTION_CACHE_TTL تنظیمات هنگام اولین استفاده خوانده شود
+        self._ttl = ttl
+        # زمان آخرین بارگذاری موفق؛ None یعنی منوهای سیاسی هنوز از دیتابیس خوانده نشده‌اند
+        self._loaded_at = None
+        self.main = InlineKeyboardMarkup([
+            [InlineKeyboardButton("📝 انجام مصاحبه", callback_data='interview')],
+            [InlineKeyboardButton("✍️ مدیریت سوالات (ادمین)", callback_data='design_question')],
+            [InlineKeyboardButton("🗄️ بایگانی", callback_data='archive')],
+            [InlineKeyboardButton("📜 آزمون آیین‌نامه انجمن", callback_data='regulations_test')],
+        ])
+        self.interview = InlineKeyboardMarkup([
+            [InlineKeyboardButton("👤 شخصی", callback_data='personal'),
+             InlineKeyboardButton("💼 شغلی", callback_data='job')],
+            [InlineKeyboardButton("🏛 سیاسی", callback_data='political')],
+            [InlineKeyboardButton("بازگشت ⬅️", callback_data='back_to_main')],
+        ])
+        self.confirm_submission = InlineKeyboardMarkup([[
+            InlineKeyboardButton("✅ بله، ارسال کن", callback_data='confirm_yes'),
+            InlineKeyboardButton("❌ خیر، لغو کن", callback_data='confirm_no')]])
+        self.back_to_interview = _back('back_to_interview_menu')
+        self.design = InlineKeyboardMarkup([
+            [InlineKeyboardButton("➕ ایجاد سوال مصاحبه", callback_data='design_create_interview')],
+            [InlineKeyboardButton("🗑️ پاک کردن سوال مصاحبه", callback_data='design_delete_interview')],
+            [InlineKeyboardButton("➕ ایجاد سوال آیین‌نامه", callback_data='design_create_regulation')],
+            [InlineKeyboardButton("📥 ورود گروهی سوالات آیین‌نامه", callback_data='design_import_regulation'),
+             InlineKeyboardButton("📤 خروجی سوالات آیین‌نامه", callback_data='design_export_regulation')],
+            [InlineKeyboardButton("بازگشت ⬅️", callback_data='back_to_main')],
+        ])
+        self.add_sections = _interview_sections('add_cat_')
+        self.delete_sections = _interview_sections('del_cat_')
+        self.add_another = InlineKeyboardMarkup([[InlineKeyboardButton("✅ بله", callback_data='add_another_yes'),
+                                                  InlineKeyboardButton("❌ خیر", callback_data='add_another_no')]])
+        self.back_to_delete = _back('back_to_delete_menu')
+        self.back_to_delete_sections = _back('back_to_delete_menu', "بازگشت به انتخاب بخش ⬅️")
+        self.regulation_test_types = _regulation_types('start_test_', 'back_to_main')
+        self.regulation_add_types = _regulation_types('add_reg_type_', 'back_to_design_menu')
+        self.set_political_subcategories(())
+
+    def set_political_subcategories(self, subcategories):
+        """سه منوی زیرمجموعه سیاسی را از فهرست داده شده می‌سازد و با نسخه قبلی جایگزین می‌کند."""
+        subcategories = tuple(subcategories)
+        self.political_interview = _political_categories(subcategories, 'political_', 'back_to_interview_menu')
+        self.political_add = _political_categories(subcategories, 'add_subcat_', 'back_to_add_menu')
+        self.political_delete = _political_categories(subcategories, 'del_subcat_', 'back_to_delete_menu')
+        self.political_subcategories = subcategories
+
+    async def load(self):
+        """زیرمجموعه‌های سیاسی را از دیتابیس می‌خواند؛ در صورت خطا منوهای فعلی دست‌نخورده می‌مانند."""
+        subcategories = await get_political_subcategories_from_db()
+        if subcategories is None:
+            logger.warning("خواندن زیرمجموعه‌های سیاسی ناموفق بود؛ منوهای قبلی استفاده می‌شوند.")
+            return
+        self.set_political_subcategories(subcategories)
+        self._loaded_at = time.monotonic()
+        logger.info(f"منوها ساخته شدند: {len(subcategories)} زیرمجموعه سیاسی.")
+
+    async def refresh_if_stale(self):
+        """اگر منوهای سیاسی هرگز بارگذاری نشده یا قدیمی‌تر از TTL باشند آن‌ها را دوباره می‌خواند."""
+        ttl = self._ttl if self._ttl is not None else config.QUESTION_CACHE_TTL
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= ttl:
+            await self.load()
+
+
+menus = MenuRegistry()
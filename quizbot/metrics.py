@@ -0,0 +1,211 @@
+"""متریک‌های عملکرد ربات با قالب متنی Prometheus و سرور HTTP حداقلی /metrics."""
+import asyncio
+import bisect
+import collections
+import functools
+import logging
+import threading
+import time
+
+from .states import CONVERSATION_STATE_NAMES
+
+logger = logging.getLogger(__name__)
+
+# مرز سطل‌های هیستوگرام به ثانیه
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """شمارنده‌ها و هیستوگرام‌های درون‌حافظه که با قالب متنی Prometheus روی /metrics منتشر می‌شوند.
+
+    ثبت هر مقدار فقط یک جستجوی دیکشنری و یک bisect زیر قفل است؛ گیج‌هایی مثل تعداد مکالمه‌های فعال
+    هم فقط هنگام درخواست /metrics با collectorها محاسبه می‌شوند و هزینه‌ای روی مسیر پردازش آپدیت ندارند.
+    """
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self._buckets = tuple(buckets)
+        # ثبت از نخ‌های executor دیتابیس هم انجام می‌شود
+        self._lock = threading.Lock()
+        # (نام، برچسب‌ها) -> مقدار
+        self._counters = {}
+        # (نام، برچسب‌ها) -> [تعداد هر سطل (غیرتجمعی)، مجموع، تعداد]
+        self._histograms = {}
+        # نام -> (نوع، توضیح)
+        self._descriptions = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._descriptions[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * (len(self._buckets) + 1), 0.0, 0]
+            entry[0][bisect.bisect_left(self._buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def totals(self, name):
+        """برای هر مجموعه برچسب متریک name مقدار شمارنده یا تعداد ثبت‌های هیستوگرام را برمی‌گرداند."""
+        with self._lock:
+            totals = {labels: value for (metric, labels), value in self._counters.items() if metric == name}
+            totals.update({labels: entry[2] for (metric, labels), entry in self._histograms.items() if metric == name})
+        return totals
+
+    def add_collector(self, collect):
+        """collect() هنگام هر درخواست /metrics فراخوانی می‌شود و (نام، نوع، توضیح، [(برچسب‌ها، مقدار)]) برمی‌گرداند."""
+        self._collectors.append(collect)
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                   for _, value in labels)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(counts), total, count) for key, (counts, total, count) in self._histograms.items()}
+        families = collections.defaultdict(list)
+        for (name, labels), value in counters.items():
+            families[name].append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), (counts, total, count) in histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self._buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                families[name].append(f"{name}_bucket{self._format_labels((*labels, ('le', bound)))} {cumulative}")
+            families[name].append(f"{name}_sum{self._format_labels(labels)} {total}")
+            families[name].append(f"{name}_count{self._format_labels(labels)} {count}")
+        descriptions = dict(self._descriptions)
+        for collect in self._collectors:
+            try:
+                for name, kind, help_text, samples in collect():
+                    descriptions.setdefault(name, (kind, help_text))
+                    families[name].extend(f"{name}{self._format_labels(tuple(sorted(labels.items())))} {value}"
+                                          for labels, value in samples)
+            except Exception as e:
+                logger.error(f"خطا در جمع‌آوری متریک‌ها: {e}")
+        lines = []
+        for name in sorted(families):
+            if name in descriptions:
+                kind, help_text = descriptions[name]
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += families[name]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe('bot_handler_duration_seconds', 'histogram', "Time spent in each update handler callback.")
+metrics.describe('bot_handler_errors_total', 'counter', "Handler callbacks that raised an exception.")
+metrics.describe('bot_db_query_duration_seconds', 'histogram',
+                 "Database call time in the executor thread (pool acquire and query), by query name.")
+metrics.describe('bot_db_executor_wait_seconds', 'histogram',
+                 "Time a database call waited for a free executor thread, by query name.")
+metrics.describe('bot_telegram_api_duration_seconds', 'histogram', "Telegram Bot API request latency by method.")
+metrics.describe('bot_telegram_api_errors_total', 'counter', "Failed Telegram Bot API requests by method.")
+
+
+def instrument_handler(handler, conversation=None):
+    """callback هندلر را با نسخه‌ای جایگزین می‌کند که زمان اجرا و خطاهایش را با نام تابع ثبت می‌کند.
+
+    برای هندلرهای یک ConversationHandler، conversation (یک ConversationStateTracker) حالت برگردانده شده را ثبت می‌کند.
+    """
+    callback = handler.callback
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def timed(update, context):
+        started = time.perf_counter()
+        try:
+            result = await callback(update, context)
+        except Exception:
+            metrics.inc('bot_handler_errors_total', handler=name)
+            raise
+        finally:
+            metrics.observe('bot_handler_duration_seconds', time.perf_counter() - started, handler=name)
+        if conversation is not None:
+            conversation.record(update, result)
+        return result
+
+    handler.callback = timed
+    return handler
+
+
+# مقدار ConversationHandler.END؛ این ماژول به telegram وابسته نیست
+CONVERSATION_END = -1
+
+
+class ConversationStateTracker:
+    """حالت هر مکالمه را از مقدار برگردانده شده callbackها دنبال می‌کند تا به داده‌های داخلی PTB نیازی نباشد.
+
+    کلید هر مکالمه مثل ConversationHandler با per_chat و per_user برابر (chat_id, user_id) است. مکالمه‌هایی که
+    از ذخیره پایدار بازیابی می‌شوند با load() در شروع ربات اضافه می‌شوند.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._states = {}
+
+    async def load(self, persistence):
+        if persistence is not None:
+            self._states.update(await persistence.get_conversations(self.name))
+
+    def record(self, update, new_state):
+        chat, user = getattr(update, 'effective_chat', None), getattr(update, 'effective_user', None)
+        if chat is None or user is None or new_state is None:
+            # None یعنی حالت مکالمه تغییر نکرده است
+            return
+        if new_state == CONVERSATION_END:
+            self._states.pop((chat.id, user.id), None)
+        else:
+            self._states[(chat.id, user.id)] = new_state
+
+    def collect(self):
+        """collector تعداد مکالمه‌های فعال در هر حالت را فقط هنگام درخواست /metrics می‌شمارد."""
+        counts = collections.Counter()
+        for state in list(self._states.values()):
+            if isinstance(state, int) and 0 <= state < len(CONVERSATION_STATE_NAMES):
+                counts[CONVERSATION_STATE_NAMES[state]] += 1
+            else:
+                counts['unknown'] += 1
+        yield ('bot_conversations_active', 'gauge', "Active conversations by state.",
+               [({'conversation': self.name, 'state': state}, count) for state, count in counts.items()])
+
+
+conversation_states = ConversationStateTracker('main_conversation')
+
+
+async def serve_metrics(host, port):
+    """یک سرور HTTP حداقلی که فقط GET /metrics را پاسخ می‌دهد؛ به چرخه عمر uvicorn و سیگنال‌هایش وابسته نیست."""
+    async def handle(reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # بقیه سرآیندهای درخواست خوانده و نادیده گرفته می‌شوند
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = "200 OK", metrics.render().encode('utf-8')
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"متریک‌ها روی http://{host}:{port}/metrics در دسترس هستند.")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,138 @@
+"""صف ارسال اعلان‌های ادمین با رعایت محدودیت نرخ تلگرام."""
+import asyncio
+import collections
+import datetime
+import logging
+import time
+
+from telegram.constants import ParseMode
+from telegram.error import NetworkError, RetryAfter, TelegramError
+
+from .rendering import TELEGRAM_MESSAGE_LIMIT, split_html_message, utf16_len
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDispatcher:
+    """پیام‌های ادمین را در پس‌زمینه و با رعایت محدودیت نرخ تلگرام ارسال می‌کند.
+
+    هندلرها فقط پیام را در صف می‌گذارند و منتظر ارسال نمی‌مانند؛ خطاهای تلگرام هم به آن‌ها نمی‌رسد.
+    """
+
+    def __init__(self, bot, global_rate=25, per_chat_interval=1.0, digest_window=0.0, max_retries=5):
+        self._bot = bot
+        self._global_rate = global_rate
+        self._per_chat_interval = per_chat_interval
+        self._digest_window = digest_window
+        self._max_retries = max_retries
+        self._queue = asyncio.Queue()
+        self._recent_sends = collections.deque()
+        self._last_sent_per_chat = {}
+        # پیام‌های قابل تجمیع هر چت تا پایان پنجره digest
+        self._digests = {}
+        self._digest_tasks = {}
+        self.sent = 0
+        self.failed = 0
+
+    def enqueue(self, chat_id, text, reply_markup=None, parse_mode=ParseMode.HTML, digest=False):
+        """پیام را برای ارسال در صف می‌گذارد؛ پیام‌های digest در پنجره زمانی با هم یک پیام می‌شوند."""
+        if digest and self._digest_window > 0 and reply_markup is None:
+            self._digests.setdefault(chat_id, []).append(text)
+            if chat_id not in self._digest_tasks:
+                self._digest_tasks[chat_id] = asyncio.get_running_loop().create_task(self._flush_digest_later(chat_id))
+            return
+        chunks = split_html_message(text) if parse_mode == ParseMode.HTML else [text]
+        for i, chunk in enumerate(chunks):
+            # دکمه‌ها فقط به تکه آخر پیام متصل می‌شوند
+            self._queue.put_nowait((chat_id, chunk, reply_markup if i == len(chunks) - 1 else None, parse_mode))
+
+    async def _flush_digest_later(self, chat_id):
+        await asyncio.sleep(self._digest_window)
+        self._flush_digest(chat_id)
+
+    def _flush_digest(self, chat_id):
+        self._digest_tasks.pop(chat_id, None)
+        texts = self._digests.pop(chat_id, [])
+        separator = "\n\n====================\n\n"
+        chunk = ""
+        for text in (part for text in texts for part in split_html_message(text)):
+            # پیام‌ها تا سقف طول پیام تلگرام در یک پیام بسته‌بندی می‌شوند
+            if chunk and utf16_len(chunk) + utf16_len(separator) + utf16_len(text) > TELEGRAM_MESSAGE_LIMIT:
+                self._queue.put_nowait((chat_id, chunk, None, ParseMode.HTML))
+                chunk = ""
+            chunk = chunk + separator + text if chunk else text
+        if chunk:
+            self._queue.put_nowait((chat_id, chunk, None, ParseMode.HTML))
+
+    async def _wait_for_rate_limits(self, chat_id):
+        while True:
+            now = time.monotonic()
+            while self._recent_sends and now - self._recent_sends[0] >= 1.0:
+                self._recent_sends.popleft()
+            delay = self._last_sent_per_chat.get(chat_id, 0.0) + self._per_chat_interval - now
+            if len(self._recent_sends) >= self._global_rate:
+                delay = max(delay, self._recent_sends[0] + 1.0 - now)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _send(self, chat_id, text, reply_markup, parse_mode):
+        for attempt in range(self._max_retries + 1):
+            await self._wait_for_rate_limits(chat_id)
+            now = time.monotonic()
+            self._recent_sends.append(now)
+            self._last_sent_per_chat[chat_id] = now
+            try:
+                await self._bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode,
+                                             reply_markup=reply_markup)
+                self.sent += 1
+                return
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if isinstance(retry_after, datetime.timedelta) else retry_after
+                logger.warning(f"محدودیت نرخ تلگرام؛ ارسال اعلان {delay} ثانیه به تعویق افتاد.")
+                self._last_sent_per_chat[chat_id] = time.monotonic() + delay - self._per_chat_interval
+            except NetworkError as e:
+                # شامل TimedOut؛ با تاخیر نمایی دوباره تلاش می‌شود
+                delay = min(2 ** attempt, 60)
+                logger.warning(f"خطای شبکه در ارسال اعلان ({e})؛ تلاش دوباره پس از {delay} ثانیه.")
+                await asyncio.sleep(delay)
+            except TelegramError as e:
+                logger.error(f"ارسال اعلان به {chat_id} ناموفق بود: {e}")
+                break
+        self.failed += 1
+
+    async def run(self):
+        """حلقه کارگر پس‌زمینه که پیام‌های صف را یکی‌یکی ارسال می‌کند."""
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._send(*item)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"خطای غیرمنتظره در ارسال اعلان: {e}", exc_info=e)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self, timeout):
+        """پیام‌های digest و صف را تا حداکثر timeout ثانیه پیش از خاموشی ارسال می‌کند."""
+        for task in list(self._digest_tasks.values()):
+            task.cancel()
+        for chat_id in list(self._digests):
+            self._flush_digest(chat_id)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._queue.qsize()} اعلان پیش از خاموشی ارسال نشد.")
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'digest_pending': sum(len(texts) for texts in self._digests.values()),
+            'sent': self.sent,
+            'failed': self.failed,
+        }
+
+
+# در post_init ساخته می‌شود؛ هندلرها از notifications.notifier استفاده می‌کنند
+notifier = None
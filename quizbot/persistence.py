@@ -0,0 +1,149 @@
+"""ذخیره پایدار وضعیت مکالمه‌ها، user_data، chat_data و bot_data."""
+import asyncio
+import json
+import logging
+import pickle
+
+import psycopg2
+import psycopg2.extras
+from telegram.ext import Application, BasePersistence, PersistenceInput, PicklePersistence
+
+from . import config
+from .db import db_query, db_transaction
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresPersistence(BasePersistence):
+    """وضعیت مکالمه‌ها، user_data، chat_data و bot_data را در جدول bot_persistence نگه می‌دارد.
+
+    خود Application تغییرات را هر update_interval ثانیه یک بار به این کلاس می‌دهد؛ متدهای update_* فقط تغییرات
+    را جمع می‌کنند و PersistenceApplication پس از پایان هر دوره write_pending را صدا می‌زند تا همه در یک تراکنش
+    نوشته شوند، پس هر پیام کاربر یک نوشتن در دیتابیس ندارد. تغییراتی که نوشتنشان شکست بخورد در دوره بعد
+    دوباره نوشته می‌شوند.
+    """
+
+    # تعداد تلاش‌های flush هنگام خاموشی و فاصله بین آن‌ها به ثانیه
+    FLUSH_ATTEMPTS = 3
+    FLUSH_RETRY_DELAY = 1.0
+
+    def __init__(self, update_interval=30):
+        super().__init__(store_data=PersistenceInput(callback_data=False), update_interval=update_interval)
+        # (kind, key) -> داده pickle شده؛ None یعنی حذف ردیف
+        self._pending = {}
+
+    @staticmethod
+    async def _load(kind):
+        rows = await db_query("SELECT key, data FROM bot_persistence WHERE kind = %s", (kind,), fetchall=True,
+                              name='persistence_load')
+        return [(key, pickle.loads(data)) for key, data in rows or []]
+
+    async def get_user_data(self):
+        return {int(key): data for key, data in await self._load('user')}
+
+    async def get_chat_data(self):
+        return {int(key): data for key, data in await self._load('chat')}
+
+    async def get_bot_data(self):
+        rows = await self._load('bot')
+        return rows[0][1] if rows else {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {tuple(json.loads(key)): state for key, state in await self._load(f'conversation:{name}')}
+
+    def _stage(self, kind, key, data):
+        self._pending[(kind, str(key))] = data
+
+    async def update_conversation(self, name, key, new_state):
+        self._stage(f'conversation:{name}', json.dumps(list(key)),
+                    None if new_state is None else pickle.dumps(new_state))
+
+    async def update_user_data(self, user_id, data):
+        self._stage('user', user_id, pickle.dumps(data))
+
+    async def update_chat_data(self, chat_id, data):
+        self._stage('chat', chat_id, pickle.dumps(data))
+
+    async def update_bot_data(self, data):
+        self._stage('bot', 'bot', pickle.dumps(data))
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_user_data(self, user_id):
+        self._stage('user', user_id, None)
+
+    async def drop_chat_data(self, chat_id):
+        self._stage('chat', chat_id, None)
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def write_pending(self):
+        """همه تغییرات جمع شده را در یک تراکنش می‌نویسد؛ در صورت خطا تغییرات برای تلاش بعدی نگه داشته می‌شوند.
+
+        True یعنی چیزی برای نوشتن باقی نمانده است.
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return True
+        upserts = [(kind, key, psycopg2.Binary(data)) for (kind, key), data in pending.items() if data is not None]
+        deletes = [(kind, key) for (kind, key), data in pending.items() if data is None]
+
+        def write(cursor):
+            if upserts:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    "INSERT INTO bot_persistence (kind, key, data) VALUES %s "
+                    "ON CONFLICT (kind, key) DO UPDATE SET data = EXCLUDED.data",
+                    upserts)
+            if deletes:
+                psycopg2.extras.execute_values(
+                    cursor, "DELETE FROM bot_persistence WHERE (kind, key) IN (VALUES %s)", deletes)
+
+        try:
+            await db_transaction(write, name='persistence_write')
+        except psycopg2.Error as e:
+            logger.error(f"ذخیره وضعیت مکالمه‌ها ناموفق بود و در دوره بعد تکرار می‌شود: {e}")
+            # تغییرات جدیدتری که در این فاصله رسیده‌اند بر نسخه قدیمی اولویت دارند
+            self._pending = {**pending, **self._pending}
+            return False
+        return True
+
+    async def flush(self):
+        for attempt in range(self.FLUSH_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(self.FLUSH_RETRY_DELAY)
+            if await self.write_pending():
+                return
+        logger.critical(f"{len(self._pending)} تغییر وضعیت مکالمه‌ها هنگام خاموشی ذخیره نشد و از دست رفت.")
+
+
+class PersistenceApplication(Application):
+    """Application که پس از هر دوره update_persistence تغییرات جمع شده PostgresPersistence را یک‌جا می‌نویسد."""
+
+    async def update_persistence(self):
+        await super().update_persistence()
+        if isinstance(self.persistence, PostgresPersistence):
+            await self.persistence.write_pending()
+
+
+def build_persistence():
+    """بر اساس PERSISTENCE_BACKEND (postgres، file یا none) لایه ذخیره پایدار را می‌سازد."""
+    backend = config.PERSISTENCE_BACKEND
+    update_interval = config.PERSISTENCE_UPDATE_INTERVAL
+    if backend == 'postgres':
+        return PostgresPersistence(update_interval=update_interval)
+    if backend == 'file':
+        return PicklePersistence(config.PERSISTENCE_FILE,
+                                 store_data=PersistenceInput(callback_data=False), update_interval=update_interval)
+    return None
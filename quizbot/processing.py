@@ -0,0 +1,100 @@
+"""پردازش همزمان آپدیت‌ها با حفظ ترتیب آپدیت‌های هر کاربر."""
+import asyncio
+import time
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from . import config
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """آپدیت‌های کاربران مختلف را موازی و آپدیت‌های یک کاربر را به ترتیب ورود پردازش می‌کند."""
+
+    # سقف همزمانی BaseUpdateProcessor عملا بی‌اثر است؛ سقف واقعی با semaphore خود این کلاس و فقط پس از نوبت
+    # گرفتن در صف کاربر اعمال می‌شود تا رگبار آپدیت‌های یک کاربر همه ظرفیت را اشغال نکند و کاربران دیگر معطل نمانند
+    _BASE_CONCURRENCY = 2 ** 31 - 1
+
+    def __init__(self, max_concurrent_updates):
+        if max_concurrent_updates < 1:
+            raise ValueError("`max_concurrent_updates` must be a positive integer!")
+        super().__init__(self._BASE_CONCURRENCY)
+        self._concurrency = max_concurrent_updates
+        self._user_semaphore = asyncio.Semaphore(max_concurrent_updates)
+        # قفل هر کاربر همراه با تعداد آپدیت‌هایی که منتظر یا در حال اجرای آن هستند
+        self._user_locks = {}
+        self._in_flight = 0
+        self._waiting = 0
+        self._processed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @staticmethod
+    def _ordering_key(update):
+        if isinstance(update, Update):
+            if update.effective_user:
+                return update.effective_user.id
+            if update.effective_chat:
+                return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        key = self._ordering_key(update)
+        if key is None:
+            async with self._user_semaphore:
+                await self._run(coroutine)
+            return
+
+        entry = self._user_locks.get(key)
+        if entry is None:
+            entry = self._user_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            # asyncio.Lock به ترتیب درخواست آزاد می‌شود، پس ترتیب آپدیت‌های هر کاربر حفظ می‌شود
+            async with entry[0]:
+                self._waiting -= 1
+                waited = time.monotonic() - started
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                async with self._user_semaphore:
+                    await self._run(coroutine)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._user_locks[key]
+
+    async def _run(self, coroutine):
+        self._in_flight += 1
+        try:
+            await coroutine
+        finally:
+            self._in_flight -= 1
+            self._processed += 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def stats(self):
+        """عمق صف و زمان انتظار آپدیت‌ها پشت آپدیت‌های قبلی همان کاربر را برمی‌گرداند."""
+        return {
+            'max_concurrent': self._concurrency,
+            'in_flight': self._in_flight,
+            'waiting': self._waiting,
+            'active_users': len(self._user_locks),
+            'processed': self._processed,
+            'avg_user_wait_ms': (self._wait_total / self._processed * 1000) if self._processed else 0.0,
+            'max_user_wait_ms': self._wait_max * 1000,
+        }
+
+
+def build_update_processor():
+    """اگر UPDATE_CONCURRENCY بزرگ‌تر از صفر باشد پردازشگر همزمان را می‌سازد؛ در غیر این صورت پردازش ترتیبی است."""
+    concurrency = config.UPDATE_CONCURRENCY
+    if concurrency <= 0:
+        return None
+    return PerUserUpdateProcessor(concurrency)
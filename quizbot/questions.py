@@ -0,0 +1,356 @@
+"""بانک سوالات مصاحبه و آیین‌نامه: توابع دیتابیس، ساختارهای فشرده آزمون و کش درون پروسه."""
+import array
+import heapq
+import json
+import logging
+import random
+import time
+
+import psycopg2.extras
+
+from . import config
+from .db import REGULATION_WEIGHT_SQL, db_query, db_transaction
+
+logger = logging.getLogger(__name__)
+
+
+# --- توابع کار با سوالات مصاحبه (بدون تغییر در منطق) ---
+async def add_interview_question_to_db(category, subcategory, question_text):
+    # سوال حذف شده با همین متن دوباره فعال می‌شود؛ سوال فعال تکراری نادیده گرفته می‌شود
+    await db_query(
+        "INSERT INTO interview_questions (category, subcategory, question_text) VALUES (%s, %s, %s) "
+        "ON CONFLICT (question_text) DO UPDATE SET category = EXCLUDED.category, subcategory = EXCLUDED.subcategory, "
+        "is_active = TRUE WHERE NOT interview_questions.is_active",
+        (category, subcategory, question_text), name='add_interview_question_to_db')
+    question_cache.invalidate_interview(category, subcategory)
+
+
+async def get_interview_questions_from_db(category, subcategory=None):
+    if subcategory:
+        return await db_query("SELECT id, question_text FROM interview_questions WHERE category = %s AND subcategory = %s "
+                              "AND is_active ORDER BY id", (category, subcategory), fetchall=True,
+                              name='get_interview_questions_from_db')
+    else:
+        return await db_query("SELECT id, question_text FROM interview_questions WHERE category = %s AND subcategory IS NULL "
+                              "AND is_active ORDER BY id", (category,), fetchall=True,
+                              name='get_interview_questions_from_db')
+
+
+async def delete_interview_question_from_db(question_id):
+    # حذف نرم: پاسخ‌های بایگانی شده همچنان به متن سوال نیاز دارند
+    deleted = await db_query("UPDATE interview_questions SET is_active = FALSE WHERE id = %s RETURNING category, subcategory",
+                             (question_id,), fetchone=True, name='delete_interview_question_from_db')
+    if deleted:
+        question_cache.invalidate_interview(*deleted)
+
+
+# --- زیرمجموعه‌های مصاحبه سیاسی ---
+async def get_political_subcategories_from_db():
+    rows = await db_query("SELECT name FROM political_subcategories ORDER BY position, name", fetchall=True,
+                          name='get_political_subcategories_from_db')
+    return None if rows is None else [name for name, in rows]
+
+
+async def add_political_subcategory_to_db(name):
+    """زیرمجموعه را به انتهای فهرست اضافه می‌کند؛ اگر از قبل وجود داشته باشد False برمی‌گرداند."""
+    inserted = await db_query(
+        "INSERT INTO political_subcategories (name, position) "
+        "SELECT %s, COALESCE(MAX(position), 0) + 1 FROM political_subcategories "
+        "ON CONFLICT (name) DO NOTHING RETURNING name", (name,), fetchone=True, name='add_political_subcategory_to_db')
+    return inserted is not None
+
+
+async def delete_political_subcategory_from_db(name):
+    # سوالات و پاسخ‌های بایگانی شده این زیرمجموعه حذف نمی‌شوند و با اضافه کردن دوباره آن در دسترس قرار می‌گیرند
+    deleted = await db_query("DELETE FROM political_subcategories WHERE name = %s RETURNING name", (name,),
+                             fetchone=True, name='delete_political_subcategory_from_db')
+    return deleted is not None
+
+
+# --- توابع کار با سوالات آیین‌نامه (تغییر در نحوه ذخیره JSON) ---
+async def add_regulation_question_to_db(test_type, question, options, answer):
+    options_json = json.dumps(options, ensure_ascii=False)
+    await db_query(
+        "INSERT INTO regulation_questions (test_type, question, options, answer) VALUES (%s, %s, %s, %s) ON CONFLICT (question) DO NOTHING",
+        (test_type, question, options_json, answer), name='add_regulation_question_to_db')
+    question_cache.invalidate_regulation(test_type)
+
+
+async def bulk_add_regulation_questions_to_db(questions):
+    """سوالات معتبر (test_type, question, options, answer) را در یک تراکنش با درج چندردیفی اضافه می‌کند.
+
+    متن سوالاتی را که واقعا درج شدند برمی‌گرداند؛ بقیه از قبل در بانک وجود داشته‌اند.
+    """
+    def write(cursor):
+        return psycopg2.extras.execute_values(
+            cursor,
+            "INSERT INTO regulation_questions (test_type, question, options, answer) VALUES %s "
+            "ON CONFLICT (question) DO NOTHING RETURNING question",
+            [(test_type, question, json.dumps(options, ensure_ascii=False), answer)
+             for test_type, question, options, answer in questions],
+            page_size=1000, fetch=True)
+
+    inserted = {row[0] for row in await db_transaction(write, name='bulk_add_regulation_questions_to_db')}
+    for test_type in {q[0] for q in questions}:
+        question_cache.invalidate_regulation(test_type)
+    return inserted
+
+
+async def get_regulation_questions_from_db(test_type):
+    results = await db_query(
+        "SELECT id, test_type, question, options, answer, weight FROM regulation_questions WHERE test_type = %s ORDER BY id",
+        (test_type,), fetchall=True, name='get_regulation_questions_from_db')
+    if results is None:
+        return None
+    # گزینه‌ها در PostgreSQL به صورت دیکشنری/لیست خوانده می‌شوند
+    return [RegulationQuestion(*row) for row in results]
+
+
+async def get_regulation_question_from_db(question_id):
+    result = await db_query("SELECT id, test_type, question, options, answer, weight FROM regulation_questions WHERE id = %s",
+                            (question_id,), fetchone=True, name='get_regulation_question_from_db')
+    return RegulationQuestion(*result) if result else None
+
+
+# --- ساختارهای فشرده آزمون آیین‌نامه ---
+class RegulationQuestion:
+    """یک سوال آیین‌نامه؛ نمونه‌ها بین همه آزمون‌ها مشترک هستند و نباید تغییر کنند."""
+    __slots__ = ('id', 'test_type', 'question', 'options', 'answer', 'weight')
+
+    def __init__(self, id, test_type, question, options, answer, weight=1.0):
+        self.id = id
+        self.test_type = test_type
+        self.question = question
+        self.options = tuple(options)
+        self.answer = answer
+        self.weight = weight
+
+
+class RegulationBank:
+    """بانک تغییرناپذیر سوالات یک نوع آزمون: سوالات، نگاشت شناسه به سوال و آرایه‌های شناسه و وزن."""
+    __slots__ = ('questions', 'by_id', 'ids', 'weights')
+
+    def __init__(self, questions):
+        self.questions = tuple(questions)
+        self.by_id = {q.id: q for q in self.questions}
+        self.ids = array.array('i', (q.id for q in self.questions))
+        self.weights = array.array('d', (q.weight for q in self.questions))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def sample(self, k, weighted=False):
+        """k شناسه بدون تکرار و به ترتیب تصادفی برمی‌گرداند؛ بانک کامل برای هر کاربر ساخته نمی‌شود.
+
+        در حالت وزن‌دار از روش Efraimidis–Spirakis استفاده می‌شود: هر سوال کلید u^(1/w) می‌گیرد و
+        k کلید بزرگ‌تر انتخاب می‌شوند. سوالات با وزن صفر یا منفی هرگز انتخاب نمی‌شوند.
+        """
+        if not weighted:
+            return random.sample(self.ids, min(k, len(self.ids)))
+        keyed = ((random.random() ** (1.0 / w), q_id) for q_id, w in zip(self.ids, self.weights) if w > 0)
+        chosen = [q_id for _, q_id in heapq.nlargest(k, keyed)]
+        random.shuffle(chosen)
+        return chosen
+
+
+class RegulationTestSession:
+    """وضعیت آزمون یک کاربر: فقط شناسه سوالات و شماره گزینه‌های انتخاب شده در آرایه‌های فشرده.
+
+    متن سوال و گزینه‌ها هنگام نیاز از بانک مشترک خوانده می‌شوند و در user_data کپی نمی‌شوند.
+    """
+    __slots__ = ('test_type', 'question_ids', 'answers', 'correct', 'incorrect')
+
+    def __init__(self, test_type, question_ids):
+        self.test_type = test_type
+        self.question_ids = array.array('i', question_ids)
+        # شماره گزینه انتخاب شده برای هر سوال؛ len(options) یعنی «نمی‌دانم»
+        self.answers = array.array('b')
+        self.correct = 0
+        self.incorrect = 0
+
+    @property
+    def index(self):
+        return len(self.answers)
+
+    @property
+    def total(self):
+        return len(self.question_ids)
+
+    @property
+    def finished(self):
+        return self.index >= self.total
+
+    @property
+    def current_question_id(self):
+        return self.question_ids[self.index]
+
+    def record_answer(self, selected_option_index, is_correct):
+        self.answers.append(selected_option_index)
+        if is_correct:
+            self.correct += 1
+        else:
+            self.incorrect += 1
+
+
+# --- کش سوالات در حافظه پروسه ---
+class QuestionCache:
+    """بانک سوالات مصاحبه و آیین‌نامه را نگه می‌دارد تا شروع هر مصاحبه یا آزمون به دیتابیس نرود."""
+
+    def __init__(self, ttl=None):
+        # None یعنی QUESTION_CACHE_TTL تنظیمات هنگام اولین استفاده خوانده شود
+        self._ttl = ttl
+        # کلید -> (زمان بارگذاری، سوالات)
+        self._interview = {}
+        self._regulation = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, entry):
+        ttl = self._ttl if self._ttl is not None else config.QUESTION_CACHE_TTL
+        return entry is not None and time.monotonic() - entry[0] < ttl
+
+    async def warm(self):
+        """کل بانک سوالات را با دو کوئری بارگذاری می‌کند."""
+        interview_rows = await db_query(
+            "SELECT id, category, subcategory, question_text FROM interview_questions WHERE is_active ORDER BY id",
+            fetchall=True, name='warm_interview_questions')
+        regulation_rows = await db_query(
+            "SELECT id, test_type, question, options, answer, weight FROM regulation_questions ORDER BY id", fetchall=True,
+            name='warm_regulation_questions')
+        now = time.monotonic()
+        if interview_rows is not None:
+            grouped = {}
+            for q_id, category, subcategory, q_text in interview_rows:
+                grouped.setdefault((category, subcategory), []).append((q_id, q_text))
+            self._interview = {key: (now, tuple(rows)) for key, rows in grouped.items()}
+        if regulation_rows is not None:
+            grouped = {}
+            for row in regulation_rows:
+                question = RegulationQuestion(*row)
+                grouped.setdefault(question.test_type, []).append(question)
+            self._regulation = {key: (now, RegulationBank(rows)) for key, rows in grouped.items()}
+        logger.info(f"کش سوالات گرم شد: {len(self._interview)} بخش مصاحبه، {len(self._regulation)} نوع آزمون.")
+
+    async def interview_questions(self, category, subcategory=None):
+        key = (category, subcategory or None)
+        entry = self._interview.get(key)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        rows = await get_interview_questions_from_db(category, subcategory)
+        if rows is None:
+            return entry[1] if entry else ()
+        questions = tuple(rows)
+        self._interview[key] = (time.monotonic(), questions)
+        return questions
+
+    async def regulation_bank(self, test_type):
+        entry = self._regulation.get(test_type)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        questions = await get_regulation_questions_from_db(test_type)
+        if questions is None:
+            return entry[1] if entry else RegulationBank(())
+        bank = RegulationBank(questions)
+        self._regulation[test_type] = (time.monotonic(), bank)
+        return bank
+
+    async def regulation_question(self, test_type, question_id):
+        """سوال را با شناسه از بانک مشترک برمی‌گرداند؛ اگر در بانک فعلی نباشد از دیتابیس خوانده می‌شود."""
+        question = (await self.regulation_bank(test_type)).by_id.get(question_id)
+        if question is None:
+            question = await get_regulation_question_from_db(question_id)
+        return question
+
+    def invalidate_interview(self, category, subcategory=None):
+        self._interview.pop((category, subcategory or None), None)
+
+    def invalidate_regulation(self, test_type):
+        self._regulation.pop(test_type, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0,
+            'interview_keys': len(self._interview),
+            'regulation_keys': len(self._regulation),
+        }
+
+
+question_cache = QuestionCache()
+
+
+async def get_user_attempt_from_db(user_id, test_type):
+    result = await db_query("SELECT timestamp FROM user_attempts WHERE user_id = %s AND test_type = %s",
+                            (user_id, test_type), fetchone=True, name='get_user_attempt_from_db')
+    return result[0] if result else None
+
+
+async def set_user_attempt_in_db(user_id, test_type):
+    # استفاده از ON CONFLICT برای PostgreSQL
+    query = """
+    INSERT INTO user_attempts (user_id, test_type, timestamp) VALUES (%s, %s, %s)
+    ON CONFLICT (user_id, test_type) DO UPDATE SET timestamp = EXCLUDED.timestamp;
+    """
+    await db_query(query, (user_id, test_type, int(time.time())), name='set_user_attempt_in_db')
+
+
+async def clear_user_attempt_in_db(user_id, test_type):
+    await db_query("DELETE FROM user_attempts WHERE user_id = %s AND test_type = %s", (user_id, test_type),
+                   name='clear_user_attempt_in_db')
+
+
+# --- آمار پاسخ‌های آزمون آیین‌نامه ---
+REGULATION_ATTEMPTS_SQL = f"""
+WITH events AS (
+    INSERT INTO regulation_attempts (question_id, user_id, answer, is_correct, answered_at)
+    SELECT question_id, %s, answer, is_correct, %s
+    FROM unnest(%s::integer[], %s::smallint[], %s::boolean[]) AS event (question_id, answer, is_correct)
+    RETURNING question_id, answer, is_correct
+), stats AS (
+    INSERT INTO regulation_question_stats (question_id, attempts, correct, dont_know)
+    SELECT question_id, COUNT(*), COUNT(*) FILTER (WHERE is_correct), COUNT(*) FILTER (WHERE answer IS NULL)
+    FROM events
+    GROUP BY question_id
+    ORDER BY question_id
+    ON CONFLICT (question_id) DO UPDATE SET
+        attempts = regulation_question_stats.attempts + EXCLUDED.attempts,
+        correct = regulation_question_stats.correct + EXCLUDED.correct,
+        dont_know = regulation_question_stats.dont_know + EXCLUDED.dont_know
+    RETURNING question_id, attempts, correct
+)
+UPDATE regulation_questions SET weight = {REGULATION_WEIGHT_SQL}
+FROM stats WHERE regulation_questions.id = stats.question_id
+"""
+
+
+async def record_regulation_attempts_in_db(user_id, responses):
+    """پاسخ‌های یک آزمون [(question, answer)] را ثبت و آمار و وزن سوالات را در همان کوئری به‌روز می‌کند.
+
+    answer شماره گزینه انتخاب شده است و len(question.options) یعنی «نمی‌دانم». وزن‌های جدید پس از انقضای
+    کش سوالات (QUESTION_CACHE_TTL) در نمونه‌گیری وزن‌دار استفاده می‌شوند.
+    """
+    question_ids, answers, correct = [], [], []
+    for question, answer in responses:
+        question_ids.append(question.id)
+        answers.append(answer if answer < len(question.options) else None)
+        correct.append(answer == question.answer)
+    await db_query(REGULATION_ATTEMPTS_SQL, (user_id, int(time.time()), question_ids, answers, correct),
+                   name='record_regulation_attempts_in_db')
+
+
+async def get_hardest_regulation_questions_from_db(limit, min_attempts, test_type=None):
+    """سوالات با کمترین نرخ پاسخ صحیح را فقط از جدول مجموع‌ها برمی‌گرداند."""
+    type_filter = "AND q.test_type = %s " if test_type else ""
+    params = (min_attempts, test_type, limit) if test_type else (min_attempts, limit)
+    return await db_query(
+        "SELECT q.id, q.test_type, q.question, s.attempts, s.correct, s.dont_know "
+        "FROM regulation_question_stats s JOIN regulation_questions q ON q.id = s.question_id "
+        f"WHERE s.attempts >= %s {type_filter}"
+        "ORDER BY s.correct::real / s.attempts, s.attempts DESC, q.id LIMIT %s", params, fetchall=True,
+        name='get_hardest_regulation_questions_from_db')
@@ -0,0 +1,127 @@
+"""ساخت و تقسیم متن HTML پیام‌ها؛ به تلگرام یا دیتابیس وابسته نیست."""
+import collections
+import re
+
+
+def escape_html(text: str) -> str:
+    if not text:
+        return ""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+_HTML_TOKEN_RE = re.compile(r'<[^>]*>|&#?\w+;|\n|[^\S\n]+|[^<&\s]+|[<&]')
+_HTML_TAG_RE = re.compile(r'<\s*(/?)\s*([a-zA-Z0-9-]+)')
+
+
+def utf16_len(text):
+    # تلگرام طول پیام را با واحدهای UTF-16 می‌شمارد، نه با تعداد کاراکترهای پایتون
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _closing_tags(open_tags):
+    return "".join(f"</{name}>" for name, _ in reversed(open_tags))
+
+
+def split_html_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """متن HTML را به چند پیام معتبر با حداکثر طول limit (به واحد UTF-16) تقسیم می‌کند.
+
+    برش ترجیحا روی خط جدید و بعد روی فاصله انجام می‌شود و هیچ‌وقت وسط تگ یا entity نمی‌افتد؛
+    تگ‌های باز در انتهای هر تکه بسته و در ابتدای تکه بعد دوباره باز می‌شوند.
+    طول روی خود HTML سنجیده می‌شود که همیشه از طول متن نهایی تلگرام بیشتر یا مساوی آن است.
+    """
+    if utf16_len(text) <= limit:
+        return [text] if text.strip() else []
+
+    chunks = []
+    tokens = collections.deque(_HTML_TOKEN_RE.findall(text))
+    open_tags = []
+    # هر تکه با باز کردن دوباره تگ‌های باز تکه قبل شروع می‌شود
+    pieces, size, prefix_len = [], 0, 0
+    # (اندیس در pieces، تگ‌های باز در آن نقطه) برای آخرین خط جدید و آخرین فاصله
+    newline_break = space_break = None
+
+    def emit(end, tags):
+        body = "".join(pieces[:end]) + _closing_tags(tags)
+        if re.sub(r'<[^>]*>', '', body).strip():
+            chunks.append(body)
+
+    def start_chunk(tags):
+        nonlocal pieces, size, prefix_len, open_tags, newline_break, space_break
+        open_tags = list(tags)
+        pieces = [opening for _, opening in open_tags]
+        prefix_len = len(pieces)
+        size = sum(utf16_len(piece) for piece in pieces)
+        newline_break = space_break = None
+
+    while tokens:
+        token = tokens.popleft()
+        tags_after = open_tags
+        tag = _HTML_TAG_RE.match(token) if token.startswith('<') else None
+        if tag:
+            closing, name = tag.group(1), tag.group(2).lower()
+            tags_after = list(open_tags)
+            if closing:
+                for i in range(len(tags_after) - 1, -1, -1):
+                    if tags_after[i][0] == name:
+                        del tags_after[i]
+                        break
+            else:
+                tags_after.append((name, token))
+        token_len = utf16_len(token)
+
+        if size + token_len + utf16_len(_closing_tags(tags_after)) <= limit:
+            pieces.append(token)
+            size += token_len
+            open_tags = tags_after
+            if token == "\n":
+                newline_break = (len(pieces), list(open_tags))
+            elif not tag and token.isspace():
+                space_break = (len(pieces), list(open_tags))
+            continue
+
+        # خط جدیدی که خیلی زود در تکه آمده باشد به برش روی فاصله بعدی نمی‌ارزد
+        breakpoint_ = newline_break
+        if space_break and (not newline_break or newline_break[0] < len(pieces) // 2 < space_break[0]):
+            breakpoint_ = space_break
+        if breakpoint_ and breakpoint_[0] < len(pieces):
+            end, tags = breakpoint_
+            tokens.appendleft(token)
+            tokens.extendleft(reversed(pieces[end:]))
+            emit(end, tags)
+            start_chunk(tags)
+        elif len(pieces) > prefix_len:
+            tokens.appendleft(token)
+            emit(len(pieces), open_tags)
+            start_chunk(open_tags)
+        else:
+            # یک کلمه به تنهایی از یک پیام بلندتر است؛ روی مرز کاراکتر (نه وسط جفت UTF-16) بریده می‌شود
+            room = limit - size - utf16_len(_closing_tags(open_tags))
+            cut = 0
+            while cut < len(token) and room - utf16_len(token[cut]) >= 0:
+                room -= utf16_len(token[cut])
+                cut += 1
+            if tag or cut == 0:
+                raise ValueError("limit برای تگ‌های باز پیام بیش از حد کوچک است.")
+            tokens.appendleft(token[cut:])
+            pieces.append(token[:cut])
+            emit(len(pieces), open_tags)
+            start_chunk(open_tags)
+
+    emit(len(pieces), open_tags)
+    return chunks
+
+
+def render_interview_html(user_id, user_name, user_username, category, subcategory, qa_pairs):
+    """متن HTML یک مصاحبه را از اجزای ساختاریافته آن می‌سازد؛ qa_pairs شامل (متن سوال، پاسخ) است."""
+    subcategory = escape_html(subcategory or "")
+    parts = [
+        "📝 <b>پاسخ مصاحبه از کاربر:</b>\n",
+        f"<b>نام:</b> {escape_html(user_name)}\n<b>نام کاربری:</b> @{escape_html(user_username or 'N/A')}\n"
+        f"<b>شناسه:</b> <code>{user_id}</code>\n",
+        f"<b>نوع مصاحبه:</b> {escape_html(category)}" + (f" - {subcategory}" if subcategory else "")
+        + "\n------------------------------------\n\n",
+    ]
+    for i, (question_text, answer_text) in enumerate(qa_pairs):
+        parts.append(f"<b>❓ سوال {i + 1}:</b> {escape_html(question_text)}\n<b>🗣️ پاسخ:</b> {escape_html(answer_text)}\n\n")
+    return "".join(parts)
@@ -0,0 +1,42 @@
+"""حالت‌های ConversationHandler اصلی ربات."""
+
+# نام حالت‌ها به ترتیب مقدار؛ برای برچسب متریک‌ها استفاده می‌شود و باید با تعریف زیر هم‌ترتیب بماند
+CONVERSATION_STATE_NAMES = (
+    'SELECTING_ACTION',
+    'SELECTING_INTERVIEW', 'SELECTING_POLITICAL_CATEGORY', 'ANSWERING_QUESTIONS', 'CONFIRM_SUBMISSION',
+    'SELECTING_DESIGN_ACTION',
+    'SELECT_ADD_CAT', 'SELECT_ADD_POLITICAL_CAT', 'ADDING_QUESTION_TEXT', 'ASK_ADD_ANOTHER',
+    'SELECT_DEL_CAT', 'SELECT_DEL_POLITICAL_CAT', 'LISTING_QUESTIONS_FOR_DELETE', 'DELETING_QUESTION_BY_NUMBER',
+    'ARCHIVE_PASSWORD_PROMPT',
+    'LISTING_ARCHIVED_USERS', 'SELECTING_ARCHIVE_CATEGORY', 'SHOWING_USER_INTERVIEWS',
+    'SELECTING_REGULATIONS_TEST_TYPE',
+    'REGULATIONS_TEST_ANSWERING',
+    'SELECT_REGULATION_TYPE_FOR_ADD',
+    'ADDING_REGULATION_QUESTION_TEXT',
+    'ADDING_REGULATION_OPTION_1',
+    'ADDING_REGULATION_OPTION_2',
+    'ADDING_REGULATION_OPTION_3',
+    'ADDING_REGULATION_OPTION_4',
+    'SELECTING_REGULATION_CORRECT_ANSWER',
+    'SEARCHING_ARCHIVED_USERS',
+    'IMPORTING_REGULATION_QUESTIONS',
+)
+(SELECTING_ACTION,
+ SELECTING_INTERVIEW, SELECTING_POLITICAL_CATEGORY, ANSWERING_QUESTIONS, CONFIRM_SUBMISSION,
+ SELECTING_DESIGN_ACTION,
+ SELECT_ADD_CAT, SELECT_ADD_POLITICAL_CAT, ADDING_QUESTION_TEXT, ASK_ADD_ANOTHER,
+ SELECT_DEL_CAT, SELECT_DEL_POLITICAL_CAT, LISTING_QUESTIONS_FOR_DELETE, DELETING_QUESTION_BY_NUMBER,
+ ARCHIVE_PASSWORD_PROMPT,
+ LISTING_ARCHIVED_USERS, SELECTING_ARCHIVE_CATEGORY, SHOWING_USER_INTERVIEWS,
+ SELECTING_REGULATIONS_TEST_TYPE,
+ REGULATIONS_TEST_ANSWERING,
+ SELECT_REGULATION_TYPE_FOR_ADD,
+ ADDING_REGULATION_QUESTION_TEXT,
+ ADDING_REGULATION_OPTION_1,
+ ADDING_REGULATION_OPTION_2,
+ ADDING_REGULATION_OPTION_3,
+ ADDING_REGULATION_OPTION_4,
+ SELECTING_REGULATION_CORRECT_ANSWER,
+ SEARCHING_ARCHIVED_USERS,
+ IMPORTING_REGULATION_QUESTIONS
+ ) = range(len(CONVERSATION_STATE_NAMES))
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import types
+
+import pytest
+
+from quizbot import config
+from quizbot.handlers import archive as archive_handlers
+
+PAGE_SIZE = 3
+
+
+class FakeArchive:
+    """جایگزین get_user_interviews_page_from_db با همان صفحه‌بندی keyset روی (timestamp, id)."""
+
+    def __init__(self, count):
+        self.rows = []
+        for _ in range(count):
+            self.add()
+
+    def add(self):
+        archive_id = len(self.rows) + 1
+        self.rows.append((archive_id, f"مصاحبه {archive_id}", 1000 + archive_id, 7, "کاربر", None, 'شخصی', None))
+
+    async def page(self, user_id, interview_type=None, cursor=None, older=True, limit=3):
+        rows = sorted(self.rows, key=lambda row: (row[2], row[0]), reverse=older)
+        if cursor:
+            rows = [row for row in rows if ((row[2], row[0]) < cursor if older else (row[2], row[0]) > cursor)]
+        rows = rows[:limit]
+        return rows if older else rows[::-1]
+
+
+class FakeQuery:
+    def __init__(self):
+        self.text = None
+        self.buttons = []
+
+    async def edit_message_text(self, text, parse_mode=None, reply_markup=None):
+        self.text = text
+        self.buttons = [button for row in reply_markup.inline_keyboard for button in row
+                        if button.callback_data.startswith('arcp_')]
+
+
+@pytest.fixture
+def archive(monkeypatch):
+    fake = FakeArchive(7)
+    monkeypatch.setitem(vars(config), 'ARCHIVE_PAGE_SIZE', PAGE_SIZE)
+    monkeypatch.setattr(archive_handlers, 'get_user_interviews_page_from_db', fake.page)
+
+    async def render(rows):
+        return [row[1] for row in rows]
+
+    monkeypatch.setattr(archive_handlers, 'render_archived_interviews', render)
+    return fake
+
+
+def show(context, page, cursor=None, older=True):
+    query = FakeQuery()
+    update = types.SimpleNamespace(callback_query=query)
+    asyncio.run(archive_handlers.show_user_interviews_page(update, context, page, cursor, older))
+    return query
+
+
+def follow(context, query, label):
+    data = next(button.callback_data for button in query.buttons if label in button.text)
+    _, direction, page, cursor_ts, cursor_id = data.split('_')
+    return show(context, int(page), (int(cursor_ts), int(cursor_id)), older=direction == 'n')
+
+
+def shown_ids(query):
+    return [int(part.split()[-1]) for part in query.text.split("\n\n") if part.startswith("مصاحبه")]
+
+
+def test_navigation_uses_rows_not_a_stale_total(archive):
+    # تعداد کل ذخیره شده در جلسه از ۷ مصاحبه واقعی عقب است
+    context = types.SimpleNamespace(user_data={'selected_user_id': '7', 'archive_category': 'all',
+                                               'archive_total': 4}, bot=None)
+    first = show(context, 1)
+    assert shown_ids(first) == [7, 6, 5]
+    assert [button.text for button in first.buttons] == ["قدیمی‌تر ⬅️"]
+
+    second = follow(context, first, "قدیمی‌تر")
+    assert shown_ids(second) == [4, 3, 2]
+    third = follow(context, second, "قدیمی‌تر")
+    assert shown_ids(third) == [1]
+    assert "صفحه 3 از 3" in third.text
+    assert [button.text for button in third.buttons] == ["➡️ جدیدتر"]
+
+
+def test_newer_navigation_sees_interviews_archived_during_the_session(archive):
+    context = types.SimpleNamespace(user_data={'selected_user_id': '7', 'archive_category': 'all',
+                                               'archive_total': 7}, bot=None)
+    second = follow(context, show(context, 1), "قدیمی‌تر")
+    archive.add()
+    archive.add()
+    back = follow(context, second, "جدیدتر")
+    assert shown_ids(back) == [7, 6, 5]
+    # دو مصاحبه تازه‌تر هنوز بالای این صفحه هستند
+    top = follow(context, back, "جدیدتر")
+    assert shown_ids(top) == [9, 8, 7]
+    assert "صفحه 1 از" in top.text
+    assert [button.text for button in top.buttons] == ["قدیمی‌تر ⬅️"]
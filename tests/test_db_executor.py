@@ -0,0 +1,72 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import time
+
+from quizbot import db
+
+
+class SleepingCursor:
+    def __init__(self):
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=()):
+        # کوئری SLOW نخ executor را مثل یک کوئری کند واقعی مسدود می‌کند
+        if query == "SLOW":
+            time.sleep(0.5)
+        self._rows = [(query,)]
+
+    def fetchone(self):
+        return self._rows[0]
+
+
+class StubConnection:
+    def cursor(self, name=None):
+        return SleepingCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class StubPool:
+    @contextlib.contextmanager
+    def connection(self):
+        yield StubConnection()
+
+
+def test_slow_query_does_not_block_other_updates(monkeypatch):
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(db, 'db_pool', StubPool())
+    monkeypatch.setattr(db, 'db_executor', executor)
+
+    async def scenario():
+        started = time.monotonic()
+        finished = {}
+
+        async def slow_handler():
+            await db.db_query("SLOW", fetchone=True, name='slow_handler')
+            finished['slow'] = time.monotonic() - started
+
+        async def other_handler():
+            await asyncio.sleep(0.01)
+            assert await db.db_query("FAST", fetchone=True, name='other_handler') == ("FAST",)
+            finished['other'] = time.monotonic() - started
+
+        await asyncio.gather(slow_handler(), other_handler())
+        return finished
+
+    try:
+        finished = asyncio.run(scenario())
+    finally:
+        executor.shutdown(wait=True)
+    assert finished['other'] < 0.25
+    assert finished['other'] < finished['slow']
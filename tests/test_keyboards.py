@@ -0,0 +1,58 @@
+import asyncio
+
+from quizbot import keyboards
+from quizbot.keyboards import MenuRegistry
+
+
+def buttons(markup):
+    return [row[0].text for row in markup.inline_keyboard[:-1]]
+
+
+def test_political_menus_reload_after_ttl(monkeypatch):
+    stored = ["مشروطه"]
+    loads = []
+    now = [1000.0]
+
+    async def fake_get_political_subcategories_from_db():
+        loads.append(now[0])
+        return list(stored)
+
+    monkeypatch.setattr(keyboards, 'get_political_subcategories_from_db', fake_get_political_subcategories_from_db)
+    monkeypatch.setattr(keyboards.time, 'monotonic', lambda: now[0])
+    menus = MenuRegistry(ttl=60)
+
+    async def scenario():
+        await menus.refresh_if_stale()
+        assert buttons(menus.political_interview) == ["مشروطه"]
+        # نمونه دیگری از ربات زیرمجموعه‌ای اضافه می‌کند
+        stored.append("انقلاب")
+        now[0] += 59
+        await menus.refresh_if_stale()
+        assert buttons(menus.political_add) == ["مشروطه"]
+        now[0] += 1
+        await menus.refresh_if_stale()
+        for markup in (menus.political_interview, menus.political_add, menus.political_delete):
+            assert buttons(markup) == ["مشروطه", "انقلاب"]
+
+    asyncio.run(scenario())
+    assert loads == [1000.0, 1060.0]
+
+
+def test_failed_reload_keeps_menus_and_retries(monkeypatch):
+    results = [["مشروطه"], None, ["پهلوی"]]
+
+    async def fake_get_political_subcategories_from_db():
+        return results.pop(0)
+
+    monkeypatch.setattr(keyboards, 'get_political_subcategories_from_db', fake_get_political_subcategories_from_db)
+    menus = MenuRegistry(ttl=0)
+
+    async def scenario():
+        await menus.refresh_if_stale()
+        await menus.refresh_if_stale()
+        assert menus.political_subcategories == ("مشروطه",)
+        await menus.refresh_if_stale()
+        assert menus.political_subcategories == ("پهلوی",)
+
+    asyncio.run(scenario())
+    assert results == []
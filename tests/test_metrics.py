@@ -0,0 +1,57 @@
+import asyncio
+import types
+
+from quizbot.metrics import CONVERSATION_END, ConversationStateTracker, instrument_handler
+from quizbot.states import CONVERSATION_STATE_NAMES, REGULATIONS_TEST_ANSWERING, SELECTING_ACTION
+
+
+def make_update(user_id):
+    return types.SimpleNamespace(effective_chat=types.SimpleNamespace(id=user_id),
+                                 effective_user=types.SimpleNamespace(id=user_id))
+
+
+def active(tracker):
+    (name, _, _, samples), = tracker.collect()
+    assert name == 'bot_conversations_active'
+    return {labels['state']: count for labels, count in samples}
+
+
+def run_handler(tracker, callback, update):
+    handler = instrument_handler(types.SimpleNamespace(callback=callback), conversation=tracker)
+    return asyncio.run(handler.callback(update, None))
+
+
+def test_states_follow_callback_results():
+    tracker = ConversationStateTracker('main_conversation')
+
+    async def start(update, context):
+        return SELECTING_ACTION
+
+    async def answer(update, context):
+        return REGULATIONS_TEST_ANSWERING
+
+    async def unchanged(update, context):
+        return None
+
+    async def cancel(update, context):
+        return CONVERSATION_END
+
+    for user_id in (1, 2, 3):
+        assert run_handler(tracker, start, make_update(user_id)) == SELECTING_ACTION
+    run_handler(tracker, answer, make_update(2))
+    run_handler(tracker, unchanged, make_update(2))
+    run_handler(tracker, cancel, make_update(3))
+    assert active(tracker) == {CONVERSATION_STATE_NAMES[SELECTING_ACTION]: 1,
+                               CONVERSATION_STATE_NAMES[REGULATIONS_TEST_ANSWERING]: 1}
+
+
+def test_restored_conversations_are_counted():
+    class Persistence:
+        async def get_conversations(self, name):
+            assert name == 'main_conversation'
+            return {(5, 5): SELECTING_ACTION, (6, 6): SELECTING_ACTION}
+
+    tracker = ConversationStateTracker('main_conversation')
+    asyncio.run(tracker.load(Persistence()))
+    assert active(tracker) == {CONVERSATION_STATE_NAMES[SELECTING_ACTION]: 2}
+    asyncio.run(tracker.load(None))
@@ -0,0 +1,84 @@
+import asyncio
+
+import psycopg2
+from telegram.ext import ApplicationBuilder
+
+from quizbot import persistence
+from quizbot.persistence import PersistenceApplication, PostgresPersistence
+
+
+class RecordingTransactions:
+    """به جای db_transaction؛ هر فراخوانی یک تراکنش است و failures تراکنش اول را شکست می‌دهد."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.succeeded = 0
+
+    async def __call__(self, work, *, name):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise psycopg2.OperationalError("connection lost")
+        self.succeeded += 1
+
+
+def build_application(store):
+    return (ApplicationBuilder().token("123:TEST").updater(None).persistence(store)
+            .application_class(PersistenceApplication).build())
+
+
+def test_one_persistence_cycle_is_one_transaction(monkeypatch):
+    transactions = RecordingTransactions()
+    monkeypatch.setattr(persistence, 'db_transaction', transactions)
+    store = PostgresPersistence()
+    application = build_application(store)
+
+    async def scenario():
+        for user_id in range(1, 6):
+            application.user_data[user_id]['answers'] = [user_id]
+        for chat_id in range(1, 4):
+            application.chat_data[chat_id]['seen'] = True
+        application.mark_data_for_update_persistence(chat_ids=range(1, 4), user_ids=range(1, 6))
+        await application.update_persistence()
+
+    asyncio.run(scenario())
+    assert transactions.calls == 1
+    assert store._pending == {}
+
+
+def test_failed_write_is_retried_in_the_next_cycle(monkeypatch):
+    transactions = RecordingTransactions(failures=1)
+    monkeypatch.setattr(persistence, 'db_transaction', transactions)
+    store = PostgresPersistence()
+    application = build_application(store)
+
+    async def scenario():
+        application.user_data[1]['answers'] = [1]
+        application.mark_data_for_update_persistence(user_ids=[1])
+        await application.update_persistence()
+        assert transactions.succeeded == 0
+        assert ('user', '1') in store._pending
+        # دوره بعد هیچ تغییر تازه‌ای ندارد ولی نوشتن ناموفق قبلی را تکرار می‌کند
+        await application.update_persistence()
+
+    asyncio.run(scenario())
+    assert transactions.calls == 2
+    assert transactions.succeeded == 1
+    assert store._pending == {}
+
+
+def test_flush_retries_before_giving_up(monkeypatch):
+    transactions = RecordingTransactions(failures=2)
+    monkeypatch.setattr(persistence, 'db_transaction', transactions)
+    monkeypatch.setattr(PostgresPersistence, 'FLUSH_RETRY_DELAY', 0)
+    store = PostgresPersistence()
+
+    async def scenario():
+        await store.update_bot_data({'version': 1})
+        await store.flush()
+
+    asyncio.run(scenario())
+    assert transactions.calls == 3
+    assert transactions.succeeded == 1
+    assert store._pending == {}
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from telegram import Update
+
+from quizbot.processing import PerUserUpdateProcessor
+
+
+def make_update(update_id, user_id):
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {'message_id': update_id, 'date': 0, 'text': "x",
+                    'chat': {'id': user_id, 'type': 'private'},
+                    'from': {'id': user_id, 'is_bot': False, 'first_name': "u"}},
+    }, None)
+
+
+def test_burst_from_one_user_does_not_block_other_users():
+    async def scenario():
+        processor = PerUserUpdateProcessor(2)
+        started = time.monotonic()
+        finished = {}
+
+        async def handler(name, duration):
+            await asyncio.sleep(duration)
+            finished[name] = time.monotonic() - started
+
+        tasks = [asyncio.create_task(processor.process_update(make_update(i, 1), handler(f"A{i}", 0.3)))
+                 for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(processor.process_update(make_update(3, 2), handler("B", 0.01))))
+        await asyncio.gather(*tasks)
+        return finished
+
+    finished = asyncio.run(scenario())
+    assert finished['B'] < 0.2
+    assert finished['B'] < finished['A0']
+
+
+def test_updates_of_one_user_run_in_order():
+    async def scenario():
+        processor = PerUserUpdateProcessor(4)
+        order = []
+
+        async def handler(index):
+            # آپدیت‌های اول کندترند؛ اگر ترتیب حفظ نشود آپدیت‌های بعدی زودتر تمام می‌شوند
+            await asyncio.sleep(0.05 * (3 - index))
+            order.append(index)
+
+        await asyncio.gather(*(processor.process_update(make_update(i, 1), handler(i)) for i in range(4)))
+        return order, processor.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == [0, 1, 2, 3]
+    assert stats['active_users'] == 0
+    assert stats['processed'] == 4
+
+
+def test_concurrency_limit_applies_across_users():
+    async def scenario():
+        processor = PerUserUpdateProcessor(2)
+        running, peak = 0, 0
+
+        async def handler():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        await asyncio.gather(*(processor.process_update(make_update(i, i), handler()) for i in range(6)))
+        return peak, processor.stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert stats['max_concurrent'] == 2
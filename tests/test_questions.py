@@ -0,0 +1,69 @@
+import asyncio
+import random
+
+from quizbot import questions
+from quizbot.db import regulation_weight
+from quizbot.questions import RegulationBank, RegulationQuestion
+
+
+def make_bank(weights):
+    return RegulationBank(RegulationQuestion(i, 'کلی', f"سوال {i}", ["الف", "ب"], 0, weight)
+                          for i, weight in enumerate(weights, start=1))
+
+
+def test_sample_returns_distinct_ids_from_the_bank():
+    bank = make_bank([1.0] * 10)
+    for weighted in (False, True):
+        ids = bank.sample(4, weighted=weighted)
+        assert len(ids) == len(set(ids)) == 4
+        assert set(ids) <= set(bank.by_id)
+
+
+def test_weighted_sample_of_empty_bank_is_empty():
+    assert make_bank([]).sample(0, weighted=True) == []
+    assert make_bank([]).sample(3, weighted=True) == []
+
+
+def test_regulation_weight_stays_positive_and_grows_with_error_rate():
+    # سوال بدون پاسخ وزن پیش‌فرض جدول را دارد
+    assert regulation_weight(0, 0) == 1.0
+    for attempts in (1, 10, 1000):
+        weights = [regulation_weight(attempts, correct) for correct in range(attempts, -1, -1)]
+        assert all(0.5 < w < 1.5 for w in weights)
+        assert weights == sorted(weights)
+        assert weights[0] < regulation_weight(0, 0) < weights[-1]
+
+
+def test_weighted_sample_prefers_questions_answered_wrongly():
+    easy = [regulation_weight(100, 95)] * 10
+    hard = [regulation_weight(100, 10)] * 10
+    bank = make_bank(easy + hard)
+    hard_ids = set(range(len(easy) + 1, len(easy) + len(hard) + 1))
+    rng_state = random.getstate()
+    random.seed(1234)
+    try:
+        picks = [q_id for _ in range(2000) for q_id in bank.sample(5, weighted=True)]
+    finally:
+        random.setstate(rng_state)
+    hard_share = sum(q_id in hard_ids for q_id in picks) / len(picks)
+    assert 0.6 < hard_share < 0.85
+
+
+def test_record_regulation_attempts_sends_one_upsert_per_test(monkeypatch):
+    calls = []
+
+    async def fake_db_query(query, params=(), fetchone=False, fetchall=False, *, name):
+        calls.append((query, params, name))
+
+    monkeypatch.setattr(questions, 'db_query', fake_db_query)
+    bank = make_bank([1.0] * 3)
+    # پاسخ درست، پاسخ غلط و «نمی‌دانم» (len(options))
+    responses = [(bank.by_id[1], 0), (bank.by_id[2], 1), (bank.by_id[3], 2)]
+    asyncio.run(questions.record_regulation_attempts_in_db(42, responses))
+
+    assert len(calls) == 1
+    query, (user_id, _timestamp, question_ids, answers, correct), name = calls[0]
+    assert query == questions.REGULATION_ATTEMPTS_SQL
+    assert "UPDATE regulation_questions SET weight" in query
+    assert name == 'record_regulation_attempts_in_db'
+    assert (user_id, question_ids, answers, correct) == (42, [1, 2, 3], [0, 1, None], [True, False, False])
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from quizbot.handlers.design import iter_json_array, iter_regulation_import_rows, validate_regulation_import_row
+
+ROW = {'test_type': 'کلی', 'question': "سوال", 'options': ["الف", "ب", "ج", "د"], 'answer': 2}
+
+
+def rows(data, file_name):
+    return list(iter_regulation_import_rows(io.BytesIO(data.encode('utf-8')), file_name))
+
+
+def test_json_lines_are_parsed_line_by_line():
+    parsed = rows('{"test_type": "کلی"}\n\nnot json\n', 'questions.jsonl')
+    assert parsed == [(1, {'test_type': 'کلی'}), (3, None)]
+
+
+def test_csv_rows_are_numbered_after_the_header():
+    parsed = rows("test_type,question\nجزئی,سوال\n", 'questions.csv')
+    assert parsed == [(2, {'test_type': 'جزئی', 'question': "سوال"})]
+
+
+@pytest.mark.parametrize('data', ['{"questions": []}', '5', '"text"'])
+def test_json_top_level_must_be_a_list(data):
+    with pytest.raises(ValueError):
+        rows(data, 'questions.json')
+
+
+def test_valid_row_uses_zero_based_answer():
+    assert validate_regulation_import_row(ROW) == (('کلی', "سوال", ["الف", "ب", "ج", "د"], 1), None)
+
+
+def test_invalid_rows_report_an_error():
+    assert validate_regulation_import_row(None)[1]
+    assert validate_regulation_import_row({**ROW, 'test_type': "دیگر"})[1]
+    assert validate_regulation_import_row({**ROW, 'answer': 5})[1]
+    assert validate_regulation_import_row({**ROW, 'options': ["الف", "ب"]})[1]
+
+
+def test_json_array_is_parsed_incrementally_across_chunk_boundaries():
+    items = [ROW, {'value': 1.5e-3}, -20, "a, ]", [], None]
+    text = json.dumps(items, ensure_ascii=False, indent=2)
+    for chunk_size in range(1, 12):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == items
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.unread = len(text)
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.unread -= len(chunk)
+        return chunk
+
+
+def test_json_array_yields_items_before_the_whole_file_is_read():
+    reader = CountingReader(json.dumps([{'index': i} for i in range(1000)]))
+    items = iter_json_array(reader, chunk_size=100)
+    assert next(items) == {'index': 0}
+    assert reader.unread > 10000
+
+
+@pytest.mark.parametrize('data', ['[1 2]', '[1,', '[1,]', '[1] extra'])
+def test_malformed_json_array_raises_value_error(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(data), 2))
+
+
+def test_import_rows_leave_the_stream_open():
+    stream = io.BytesIO(b'[{"test_type": "x"}]')
+    assert list(iter_regulation_import_rows(stream, 'questions.json')) == [(1, {'test_type': 'x'})]
+    assert not stream.closed
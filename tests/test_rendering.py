@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from quizbot.rendering import TELEGRAM_MESSAGE_LIMIT, split_html_message, utf16_len
+
+
+def strip_tags(text):
+    return re.sub(r'<[^>]*>', '', text)
+
+
+def test_short_text_is_not_split():
+    assert split_html_message("سلام") == ["سلام"]
+    assert split_html_message(" \n ") == []
+
+
+def test_limit_is_counted_in_utf16_units():
+    # هر ایموجی خارج از BMP دو واحد UTF-16 است، پس 4096 ایموجی دو برابر سقف پیام است
+    text = "😀" * TELEGRAM_MESSAGE_LIMIT
+    chunks = split_html_message(text)
+    assert len(chunks) == 2
+    assert all(utf16_len(chunk) <= TELEGRAM_MESSAGE_LIMIT for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_emoji_text_splits_on_spaces_within_limit():
+    text = "😀 " * 20
+    chunks = split_html_message(text, limit=10)
+    assert all(utf16_len(chunk) <= 10 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_prefers_newline_over_space():
+    text = "line one\nline two is here"
+    assert split_html_message(text, limit=20) == ["line one\n", "line two is here"]
+
+
+def test_open_tags_are_closed_and_reopened_across_chunks():
+    chunks = split_html_message("<b><i>" + "word " * 10 + "</i></b>", limit=30)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert utf16_len(chunk) <= 30
+        assert chunk.startswith("<b><i>")
+        assert chunk.endswith("</i></b>")
+    assert "".join(strip_tags(chunk) for chunk in chunks) == "word " * 10
+
+
+def test_tag_with_attributes_is_reopened_as_written():
+    link = '<a href="https://example.com">'
+    chunks = split_html_message(link + "click here please " * 5 + "</a> tail", limit=60)
+    assert len(chunks) > 1
+    assert all(chunk.startswith(link) for chunk in chunks[1:-1])
+
+
+def test_entities_and_tags_are_never_cut():
+    text = "a &amp; <b>b</b> " * 10
+    for limit in range(8, 30):
+        for chunk in split_html_message(text, limit=limit):
+            assert utf16_len(chunk) <= limit
+            # برش وسط entity یا تگ یک & یا < بدون پایان باقی می‌گذارد
+            assert not re.search(r'&(?!#?\w+;)', chunk)
+            assert re.sub(r'<[^<>]*>', '', chunk).count('<') == 0
+            assert chunk.count('<b>') == chunk.count('</b>')
+
+
+def test_single_token_longer_than_limit_is_cut_on_characters():
+    assert split_html_message("x" * 25, limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_single_token_fallback_does_not_split_surrogate_pairs():
+    chunks = split_html_message("<b>" + "😀" * 12 + "</b>", limit=12)
+    assert chunks == ["<b>😀😀</b>"] * 6
+
+
+def test_limit_too_small_for_open_tags_raises():
+    with pytest.raises(ValueError):
+        split_html_message("<b>" + "x" * 20 + "</b>", limit=7)
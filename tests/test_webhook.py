@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+from telegram import Bot
+
+from quizbot import config
+from quizbot.app import build_webhook_app
+
+SECRET = "webhook-secret"
+
+
+class FakeApplication:
+    def __init__(self):
+        self.bot = Bot("123:TEST")
+        self.update_queue = asyncio.Queue(maxsize=1)
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    # setattr مقدار قبلی را می‌خواند و تنظیمات را از محیط بارگذاری می‌کند؛ مقدار مستقیما در ماژول قرار می‌گیرد
+    monkeypatch.setitem(vars(config), 'WEBHOOK_SECRET_TOKEN', SECRET)
+    monkeypatch.setitem(vars(config), 'WEBHOOK_PATH', '/telegram')
+    application = FakeApplication()
+    return application, TestClient(build_webhook_app(application))
+
+
+def post(client, body, secret=SECRET):
+    return client.post('/telegram', content=body if isinstance(body, bytes) else json.dumps(body),
+                       headers={'X-Telegram-Bot-Api-Secret-Token': secret, 'Content-Type': 'application/json'})
+
+
+def test_valid_update_is_queued(webhook):
+    application, client = webhook
+    assert post(client, {'update_id': 1}).status_code == 200
+    assert application.update_queue.get_nowait().update_id == 1
+
+
+@pytest.mark.parametrize('secret', ["wrong", "", "سلام".encode('utf-8')])
+def test_wrong_or_non_ascii_secret_is_forbidden(webhook, secret):
+    application, client = webhook
+    assert post(client, {'update_id': 1}, secret=secret).status_code == 403
+    assert application.update_queue.empty()
+
+
+@pytest.mark.parametrize('body', [b"not json", [], 1, "x", {}, {'update_id': 1, 'message': 5}])
+def test_malformed_update_is_rejected(webhook, body):
+    application, client = webhook
+    assert post(client, body).status_code == 400
+    assert application.update_queue.empty()
+
+
+def test_full_queue_asks_telegram_to_retry(webhook):
+    application, client = webhook
+    assert post(client, {'update_id': 1}).status_code == 200
+    assert post(client, {'update_id': 2}).status_code == 503
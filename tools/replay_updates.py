@@ -0,0 +1,69 @@
+"""آپدیت‌های ضبط شده تلگرام را به سرور webhook محلی ربات ارسال می‌کند.
+
+ربات را با BOT_MODE=webhook و WEBHOOK_SKIP_SET_WEBHOOK=1 اجرا کنید تا webhook در تلگرام ثبت نشود، سپس:
+
+    python tools/replay_updates.py updates.jsonl --secret "$WEBHOOK_SECRET_TOKEN"
+
+هر فایل می‌تواند یک آپدیت JSON، آرایه‌ای از آپدیت‌ها یا فایل JSONL (هر خط یک آپدیت) باشد.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import time
+
+import httpx
+
+
+def load_updates(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+                continue
+            data = json.load(f)
+            yield from (data if isinstance(data, list) else [data])
+
+
+async def replay(url, secret, updates, concurrency):
+    statuses = collections.Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret}
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        async def post(update):
+            async with semaphore:
+                try:
+                    response = await client.post(url, json=update, headers=headers)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(update) for update in updates))
+        elapsed = time.perf_counter() - started
+    return statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='+', help="فایل‌های JSON یا JSONL آپدیت‌ها")
+    parser.add_argument('--url', default=f"http://127.0.0.1:{os.environ.get('PORT', '8000')}"
+                                         f"{os.environ.get('WEBHOOK_PATH', '/telegram')}")
+    parser.add_argument('--secret', default=os.environ.get('WEBHOOK_SECRET_TOKEN', ''))
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="تعداد درخواست‌های هم‌زمان (۱ ترتیب آپدیت‌ها را حفظ می‌کند)")
+    args = parser.parse_args()
+
+    updates = list(load_updates(args.files))
+    statuses, elapsed = asyncio.run(replay(args.url, args.secret, updates, args.concurrency))
+    print(f"{len(updates)} آپدیت در {elapsed:.2f} ثانیه ارسال شد.")
+    for status, count in sorted(statuses.items(), key=lambda item: str(item[0])):
+        print(f"  {status}: {count}")
+
+
+if __name__ == '__main__':
+    main()